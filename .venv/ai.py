@@ -0,0 +1,460 @@
+"""Computer opponent for the "Against" menu mode.
+
+Iterative-deepening alpha-beta (negamax) over the headless GameEngine, with
+Zobrist-keyed transposition table, TT/capture/killer/history move ordering
+and a hard per-move time budget. AIPlayer runs the search in a worker thread
+so the pygame loop keeps drawing while the computer thinks.
+"""
+import argparse
+import queue
+import random
+import threading
+import time
+
+from constants import EMPTY, PLAYER_2
+from engine import GameEngine, MOVE, MOVE_ACTIONS, iter_bits, opponent, BITS
+
+WIN_SCORE = 1_000_000
+MATE_THRESHOLD = WIN_SCORE - 1000
+INFINITY = WIN_SCORE + 1
+
+PIECE_VALUES = {"Monarch": 0, "Official": 100, "Advisor": 300, "Palace": 250}
+RESERVE_FACTOR = 0.9  # A piece in hand is slightly less useful than one on the board
+PROMOTION_BONUS = 25
+MOBILITY_WEIGHT = 4
+MONARCH_DANGER = 150
+
+MAX_DEPTH = 64
+QUIESCENCE_DEPTH = 4
+TIME_CHECK_INTERVAL = 256
+
+EXACT, LOWER_BOUND, UPPER_BOUND = 0, 1, 2
+
+
+class SearchTimeout(Exception):
+    pass
+
+
+class SearchResult:
+    __slots__ = ("action", "score", "depth", "nodes", "elapsed")
+
+    def __init__(self, action, score, depth, nodes, elapsed):
+        self.action = action
+        self.score = score
+        self.depth = depth
+        self.nodes = nodes
+        self.elapsed = elapsed
+
+    @property
+    def nodes_per_second(self):
+        return self.nodes / self.elapsed if self.elapsed > 0 else 0.0
+
+    def __repr__(self):
+        return (f"SearchResult(action={self.action}, score={self.score}, depth={self.depth}, "
+                f"nodes={self.nodes}, elapsed={self.elapsed:.3f}s, nps={self.nodes_per_second:.0f})")
+
+
+class TranspositionTable:
+    """Fixed-size table indexed by the low bits of the Zobrist key.
+
+    A slot is replaced when it belongs to an older search or the new entry
+    was searched at least as deep, so memory stays bounded.
+    """
+
+    def __init__(self, size_bits=18):
+        self.mask = (1 << size_bits) - 1
+        self.slots = [None] * (1 << size_bits)
+        self.generation = 0
+
+    def new_search(self):
+        self.generation += 1
+
+    def clear(self):
+        self.slots = [None] * len(self.slots)
+
+    def probe(self, key):
+        entry = self.slots[key & self.mask]
+        if entry is not None and entry[0] == key:
+            return entry
+        return None
+
+    def store(self, key, depth, flag, score, action):
+        slot = key & self.mask
+        entry = self.slots[slot]
+        if entry is None or entry[5] != self.generation or depth >= entry[1]:
+            self.slots[slot] = (key, depth, flag, score, action, self.generation)
+
+
+def _score_to_table(score, ply):
+    # Mate scores are stored relative to the node so they stay valid at other plies
+    if score >= MATE_THRESHOLD:
+        return score + ply
+    if score <= -MATE_THRESHOLD:
+        return score - ply
+    return score
+
+
+def _score_from_table(score, ply):
+    if score >= MATE_THRESHOLD:
+        return score - ply
+    if score <= -MATE_THRESHOLD:
+        return score + ply
+    return score
+
+
+class Searcher:
+    def __init__(self, table_bits=18):
+        self.table = TranspositionTable(table_bits)
+        self.engine = None
+        self.nodes = 0
+        self.deadline = 0.0
+        self.stop_event = None
+        self.killers = {}
+        self.history = {}
+        self._partial = None
+
+    # --- Evaluation ---
+
+    def attack_map(self, player):
+        """Union of every square player's pieces can move to"""
+        engine = self.engine
+        attacks = 0
+        for index in iter_bits(engine.occupancy[player]):
+            attacks |= engine.movement_mask(index)
+        return attacks
+
+    def capture_actions(self, player):
+        """Every move by player that takes an enemy piece, straight from the move masks"""
+        engine = self.engine
+        enemy_pieces = engine.occupancy[opponent(player)]
+        captures = []
+        for index in iter_bits(engine.occupancy[player]):
+            moves = MOVE_ACTIONS[index]
+            captures.extend([moves[target] for target in iter_bits(engine.movement_mask(index) & enemy_pieces)])
+        return captures
+
+    def evaluate(self, own_attacks=None):
+        """Static score from the point of view of the side to move"""
+        engine = self.engine
+        player = engine.current_player
+        enemy = opponent(player)
+        if own_attacks is None:
+            own_attacks = self.attack_map(player)
+        enemy_attacks = self.attack_map(enemy)
+
+        score = 0
+        for side, sign in ((player, 1), (enemy, -1)):
+            material = 0
+            for index in iter_bits(engine.occupancy[side]):
+                piece = engine.cells[index]
+                material += PIECE_VALUES[piece.name]
+                if piece.promoted:
+                    material += PROMOTION_BONUS
+            for section in engine.reserve_for(side):
+                if section:
+                    material += RESERVE_FACTOR * PIECE_VALUES[section[0]] * len(section)
+            score += sign * material
+
+        score += MOBILITY_WEIGHT * (own_attacks.bit_count() - enemy_attacks.bit_count())
+
+        monarch = engine.find_monarch(player)
+        if monarch is not None and enemy_attacks & BITS[monarch]:
+            score -= MONARCH_DANGER
+        return int(score)
+
+    # --- Move ordering ---
+
+    def order_actions(self, actions, tt_action, ply):
+        cells = self.engine.cells
+        killers = self.killers.get(ply, ())
+        history = self.history
+
+        def priority(action):
+            if action == tt_action:
+                return 10_000_000
+            if action[0] == MOVE:
+                victim = cells[action[2]]
+                if victim != EMPTY:
+                    return 1_000_000 + PIECE_VALUES[victim.name]
+            if action in killers:
+                return 500_000
+            return history.get(action, 0)
+
+        actions.sort(key=priority, reverse=True)
+        return actions
+
+    def _remember_cutoff(self, action, depth, ply):
+        if action[0] == MOVE and self.engine.cells[action[2]] != EMPTY:
+            return  # Captures are already ordered first
+        killers = self.killers.setdefault(ply, [])
+        if action not in killers:
+            killers.insert(0, action)
+            del killers[2:]
+        self.history[action] = self.history.get(action, 0) + depth * depth
+
+    # --- Search ---
+
+    def _check_time(self):
+        if time.perf_counter() >= self.deadline or (self.stop_event is not None and self.stop_event.is_set()):
+            raise SearchTimeout
+
+    def _terminal_score(self, ply):
+        # The side to move just had its monarch captured (or resigned)
+        engine = self.engine
+        if engine.winner == engine.current_player:
+            return WIN_SCORE - ply
+        return -(WIN_SCORE - ply)
+
+    def _monarch_capture(self, attacks):
+        """True if the side to move can take the enemy monarch right now"""
+        engine = self.engine
+        if engine.monarch_placement_phase:
+            return False
+        monarch = engine.find_monarch(opponent(engine.current_player))
+        return monarch is not None and bool(attacks & BITS[monarch])
+
+    def quiescence(self, alpha, beta, ply, depth):
+        self.nodes += 1
+        if self.nodes % TIME_CHECK_INTERVAL == 0:
+            self._check_time()
+
+        engine = self.engine
+        if engine.game_over:
+            return self._terminal_score(ply)
+
+        attacks = self.attack_map(engine.current_player)
+        if self._monarch_capture(attacks):
+            return WIN_SCORE - ply - 1
+
+        stand_pat = self.evaluate(attacks)
+        if stand_pat >= beta or depth <= 0 or engine.monarch_placement_phase:
+            return stand_pat
+        alpha = max(alpha, stand_pat)
+
+        captures = self.capture_actions(engine.current_player)
+        if not captures:
+            return stand_pat
+
+        snapshot = engine.snapshot()
+        for action in self.order_actions(captures, None, ply):
+            engine.apply_action(action)
+            score = -self.quiescence(-beta, -alpha, ply + 1, depth - 1)
+            engine.restore(snapshot)
+            if score >= beta:
+                return score
+            alpha = max(alpha, score)
+        return alpha
+
+    def negamax(self, depth, alpha, beta, ply):
+        self.nodes += 1
+        if self.nodes % TIME_CHECK_INTERVAL == 0:
+            self._check_time()
+
+        engine = self.engine
+        if engine.game_over:
+            return self._terminal_score(ply)
+
+        if not engine.monarch_placement_phase:
+            if self._monarch_capture(self.attack_map(engine.current_player)):
+                return WIN_SCORE - ply - 1
+
+        if depth <= 0:
+            return self.quiescence(alpha, beta, ply, QUIESCENCE_DEPTH)
+
+        key = engine.key
+        original_alpha = alpha
+        tt_action = None
+        entry = self.table.probe(key)
+        if entry is not None:
+            tt_action = entry[4]
+            if entry[1] >= depth:
+                score = _score_from_table(entry[3], ply)
+                flag = entry[2]
+                if flag == EXACT:
+                    return score
+                if flag == LOWER_BOUND:
+                    alpha = max(alpha, score)
+                elif flag == UPPER_BOUND:
+                    beta = min(beta, score)
+                if alpha >= beta:
+                    return score
+
+        actions = engine.legal_actions()
+        if not actions:
+            return self.evaluate()
+
+        best_score = -INFINITY
+        best_action = None
+        snapshot = engine.snapshot()
+        for action in self.order_actions(actions, tt_action, ply):
+            engine.apply_action(action)
+            score = -self.negamax(depth - 1, -beta, -alpha, ply + 1)
+            engine.restore(snapshot)
+
+            if score > best_score:
+                best_score, best_action = score, action
+            if score > alpha:
+                alpha = score
+            if alpha >= beta:
+                self._remember_cutoff(action, depth, ply)
+                break
+
+        if best_score <= original_alpha:
+            flag = UPPER_BOUND
+        elif best_score >= beta:
+            flag = LOWER_BOUND
+        else:
+            flag = EXACT
+        self.table.store(key, depth, flag, _score_to_table(best_score, ply), best_action)
+        return best_score
+
+    def _search_root(self, depth, actions):
+        engine = self.engine
+        alpha, beta = -INFINITY, INFINITY
+        best_action, best_score = None, -INFINITY
+        snapshot = engine.snapshot()
+        for action in actions:
+            engine.apply_action(action)
+            score = -self.negamax(depth - 1, -beta, -alpha, 1)
+            engine.restore(snapshot)
+            if score > best_score:
+                best_score, best_action = score, action
+                self._partial = (best_action, best_score)
+            alpha = max(alpha, score)
+        self.table.store(engine.key, depth, EXACT, best_score, best_action)
+        return best_action, best_score
+
+    def search(self, engine, time_budget=1.0, max_depth=MAX_DEPTH, stop_event=None):
+        """Search engine's position for at most time_budget seconds and return a SearchResult.
+
+        The engine is restored to its original position before returning.
+        """
+        start = time.perf_counter()
+        self.engine = engine
+        self.deadline = start + time_budget
+        self.stop_event = stop_event
+        self.nodes = 0
+        self.killers = {}
+        self.table.new_search()
+
+        actions = engine.legal_actions()
+        if not actions:
+            return SearchResult(None, self.evaluate(), 0, 0, time.perf_counter() - start)
+        if len(actions) == 1:
+            return SearchResult(actions[0], 0, 0, 0, time.perf_counter() - start)
+
+        entry = self.table.probe(engine.key)
+        actions = self.order_actions(actions, entry[4] if entry else None, 0)
+        best_action, best_score, completed = actions[0], None, 0
+
+        snapshot = engine.snapshot()
+        try:
+            for depth in range(1, max_depth + 1):
+                self._partial = None
+                best_action, best_score = self._search_root(depth, actions)
+                completed = depth
+
+                # Search the best move first next iteration
+                actions.remove(best_action)
+                actions.insert(0, best_action)
+
+                if abs(best_score) >= MATE_THRESHOLD:
+                    break
+                # The next iteration costs several times this one, so don't start what can't finish
+                if time.perf_counter() - start > time_budget * 0.5:
+                    break
+        except SearchTimeout:
+            # The previous best is searched first, so any improvement found so far is trustworthy
+            if self._partial is not None and (best_score is None or self._partial[1] > best_score):
+                best_action, best_score = self._partial
+        finally:
+            engine.restore(snapshot)
+
+        return SearchResult(best_action, best_score, completed, self.nodes, time.perf_counter() - start)
+
+
+class AIPlayer:
+    """Plays one side by searching in a background thread"""
+
+    def __init__(self, player=PLAYER_2, time_budget=1.0, table_bits=18):
+        self.player = player
+        self.time_budget = time_budget
+        self.searcher = Searcher(table_bits)
+        self.results: queue.Queue = queue.Queue()
+        self.search_lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.thinking = False
+        self.request = 0
+        self.last_result = None
+
+    def start_thinking(self, engine):
+        """Begin searching a copy of engine's position; collect the answer with poll()"""
+        self.request += 1
+        self.stop_event = threading.Event()
+        self.thinking = True
+        threading.Thread(target=self._think, args=(engine.copy(), self.request, self.stop_event),
+                         daemon=True).start()
+
+    def _think(self, engine, request, stop_event):
+        # Only one search at a time may use the shared transposition table
+        with self.search_lock:
+            if stop_event.is_set():
+                return
+            result = self.searcher.search(engine, self.time_budget, stop_event=stop_event)
+        self.results.put((request, result))
+
+    def poll(self):
+        """Return the finished SearchResult, or None while still thinking"""
+        while True:
+            try:
+                request, result = self.results.get_nowait()
+            except queue.Empty:
+                return None
+            if request == self.request:
+                self.thinking = False
+                self.last_result = result
+                return result
+
+    def cancel(self):
+        """Abandon the current search (e.g. on reset); its result will be ignored"""
+        self.stop_event.set()
+        self.request += 1
+        self.thinking = False
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure the AI by letting it play itself")
+    parser.add_argument("--time", type=float, default=1.0, help="Seconds per move")
+    parser.add_argument("--moves", type=int, default=20, help="Moves to play")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the random opening monarchs")
+    args = parser.parse_args()
+
+    engine = GameEngine()
+    rng = random.Random(args.seed)
+    # Random monarch placement so runs start from varied positions
+    while engine.monarch_placement_phase:
+        engine.apply_action(rng.choice(engine.legal_actions()))
+
+    searcher = Searcher()
+    total_nodes = total_time = 0
+    for move in range(args.moves):
+        if engine.game_over:
+            break
+        result = searcher.search(engine, args.time)
+        if result.action is None:
+            break
+        total_nodes += result.nodes
+        total_time += result.elapsed
+        print(f"{move + 1:3d} P{engine.current_player} {result.action} depth={result.depth} "
+              f"score={result.score} nodes={result.nodes} time={result.elapsed:.2f}s "
+              f"nps={result.nodes_per_second:.0f}")
+        engine.apply_action(result.action)
+
+    if total_time:
+        print(f"Total: {total_nodes} nodes in {total_time:.2f}s = {total_nodes / total_time:.0f} nodes/sec")
+    if engine.game_over:
+        print(f"Player {engine.winner} wins")
+
+
+if __name__ == "__main__":
+    main()
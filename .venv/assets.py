@@ -0,0 +1,252 @@
+"""Central asset manager.
+
+Every sound and texture goes through the shared `assets` manager, so each file
+is loaded once, the first time something asks for it, whichever thread that
+is. After the first menu frame a background thread preloads the assets a game
+needs while the menu is already running; the endgame sound and anything else
+marked preload=False only load if the session actually gets there.
+
+Decoded sounds and loaded (and scaled) textures are written to CACHE_DIR,
+keyed by a hash of the source file and the target size or mixer format, so
+later starts skip MP3 decoding and image scaling altogether.
+"""
+import hashlib
+import os
+import struct
+import threading
+import time
+
+import pygame
+
+CACHE_DIR = ".asset_cache"
+IMAGE_HEADER = struct.Struct("!II")  # Width and height ahead of the raw RGBA pixels
+
+
+class SilentSound:
+    """Stands in for a sound that couldn't be loaded"""
+
+    def __init__(self):
+        self.volume = 1.0
+
+    def play(self, *args, **kwargs):
+        return None
+
+    def stop(self):
+        pass
+
+    def set_volume(self, volume):
+        self.volume = volume
+
+    def get_volume(self):
+        return self.volume
+
+
+class AssetManager:
+    def __init__(self, cache_dir=CACHE_DIR, verbose=False):
+        self.cache_dir = cache_dir
+        self.verbose = verbose  # Print startup and preload timings
+        self.lock = threading.Lock()
+        self.assets = {}  # key -> loaded asset
+        self.loading = {}  # key -> Event set when the thread loading it is done
+        self.hashes = {}  # path -> hash of the file's contents
+        self.volumes = {}  # sound path -> volume to apply once it loads
+
+        # Startup timing
+        self.start_time = time.perf_counter()
+        self.timings = []  # (label, seconds since start_time)
+        self.load_times = {}  # key -> seconds spent loading
+
+        # Background preloading
+        self.preload_thread = None
+        self.preload_done = 0
+        self.preload_total = 0
+
+    def log(self, message):
+        if self.verbose:
+            print(message)
+
+    def mark(self, label):
+        """Record how long after start_time something happened"""
+        elapsed = time.perf_counter() - self.start_time
+        self.timings.append((label, elapsed))
+        return elapsed
+
+    def sound(self, path):
+        return self._get(("sound", path), lambda: self._load_sound(path))
+
+    def image(self, path, size=None, alpha=False):
+        """A texture, scaled to size if given and converted for per-pixel alpha if alpha is set"""
+        return self._get(("image", path, size, alpha), lambda: self._load_image(path, size, alpha))
+
+    def set_volume(self, path, volume):
+        """Set a sound's volume now if it is loaded, otherwise as soon as it loads"""
+        with self.lock:
+            self.volumes[path] = volume
+            sound = self.assets.get(("sound", path))
+        if sound is not None:
+            sound.set_volume(volume)
+
+    def preload(self, entries):
+        """Load entries (anything with a load() method) on a background thread"""
+        self.preload_done, self.preload_total = 0, len(entries)
+
+        def run():
+            start = time.perf_counter()
+            for entry in entries:
+                entry.load()
+                self.preload_done += 1
+            self.log(f"Preloaded {len(entries)} assets in {(time.perf_counter() - start) * 1000:.0f} ms")
+
+        self.preload_thread = threading.Thread(target=run, daemon=True)
+        self.preload_thread.start()
+
+    def progress(self):
+        """(loaded, total) for the current preload"""
+        return self.preload_done, self.preload_total
+
+    def _get(self, key, load):
+        asset = self.assets.get(key)
+        if asset is not None:
+            return asset
+
+        while True:
+            with self.lock:
+                if key in self.assets:
+                    return self.assets[key]
+                event = self.loading.get(key)
+                if event is None:
+                    event = self.loading[key] = threading.Event()
+                    break
+            # Someone else is loading it; wait for them instead of loading it twice
+            event.wait()
+
+        try:
+            start = time.perf_counter()
+            asset = load()
+            self.load_times[key] = time.perf_counter() - start
+            with self.lock:
+                self.assets[key] = asset
+                volume = self.volumes.get(key[1]) if key[0] == "sound" else None
+            if volume is not None:
+                asset.set_volume(volume)
+            return asset
+        finally:
+            with self.lock:
+                del self.loading[key]
+            event.set()
+
+    def _cache_path(self, path, variant):
+        """Where the processed copy of path is cached, named after a hash of its contents"""
+        digest = self.hashes.get(path)
+        if digest is None:
+            with open(path, "rb") as source:
+                digest = self.hashes[path] = hashlib.sha1(source.read()).hexdigest()
+        return os.path.join(self.cache_dir, f"{digest}_{variant}")
+
+    def _read_cache(self, cache_path):
+        try:
+            with open(cache_path, "rb") as cached:
+                return cached.read()
+        except OSError:
+            return None
+
+    def _write_cache(self, cache_path, data):
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            # Write then rename, so a crash never leaves a truncated entry behind
+            temp_path = f"{cache_path}.{threading.get_ident()}.tmp"
+            with open(temp_path, "wb") as cached:
+                cached.write(data)
+            os.replace(temp_path, cache_path)
+        except OSError as e:
+            print(f"Could not write asset cache: {e}")
+
+    def _load_sound(self, path):
+        try:
+            settings = pygame.mixer.get_init()
+            if settings is None:
+                raise pygame.error("mixer not initialized")
+
+            # Raw samples only make sense for the mixer format they were decoded for
+            cache_path = self._cache_path(path, "{}_{}_{}.pcm".format(*settings))
+            data = self._read_cache(cache_path)
+            if data is not None:
+                return pygame.mixer.Sound(buffer=data)
+
+            sound = pygame.mixer.Sound(path)
+            self._write_cache(cache_path, sound.get_raw())
+            return sound
+        except (pygame.error, OSError) as e:
+            print(f"Could not load sound {path}: {e}")
+            return SilentSound()
+
+    def _load_image(self, path, size, alpha):
+        try:
+            variant = f"{size[0]}x{size[1]}" if size else "full"
+            cache_path = self._cache_path(path, f"{variant}.rgba")
+            data = self._read_cache(cache_path)
+            if data is not None:
+                width, height = IMAGE_HEADER.unpack_from(data)
+                surface = pygame.image.frombytes(data[IMAGE_HEADER.size:], (width, height), "RGBA")
+            else:
+                surface = pygame.image.load(path)
+                if size:
+                    surface = pygame.transform.scale(surface, size)
+                self._write_cache(cache_path, IMAGE_HEADER.pack(*surface.get_size())
+                                  + pygame.image.tobytes(surface, "RGBA"))
+            return surface.convert_alpha() if alpha else surface
+        except (pygame.error, OSError) as e:
+            print(f"Could not load texture {path}: {e}")
+            return pygame.Surface(size or (1, 1), pygame.SRCALPHA if alpha else 0)
+
+
+assets = AssetManager()
+
+
+class SoundAsset:
+    """Class attribute that loads a sound through `assets` the first time it is read"""
+
+    def __init__(self, path, preload=True):
+        self.path = path
+        self.preload = preload
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        return assets.sound(self.path)
+
+    def load(self):
+        return assets.sound(self.path)
+
+    def set_volume(self, volume):
+        assets.set_volume(self.path, volume)
+
+
+class ImageAsset:
+    """Class attribute that loads a texture through `assets` the first time it is read"""
+
+    def __init__(self, path, size=None, alpha=False, preload=True):
+        self.path = path
+        self.size = size
+        self.alpha = alpha
+        self.preload = preload
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        return assets.image(self.path, self.size, self.alpha)
+
+    def load(self):
+        return assets.image(self.path, self.size, self.alpha)
+
+
+def preload_entries(*namespaces):
+    """The preloadable assets in classes or dicts, each file and size only once"""
+    entries = {}
+    for namespace in namespaces:
+        values = vars(namespace).values() if isinstance(namespace, type) else namespace.values()
+        for value in values:
+            if isinstance(value, (SoundAsset, ImageAsset)) and value.preload:
+                key = (value.path, getattr(value, "size", None), getattr(value, "alpha", None))
+                entries.setdefault(key, value)
+    return list(entries.values())
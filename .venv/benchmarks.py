@@ -0,0 +1,422 @@
+"""Benchmark suite for the engine, the wire protocol and the play screen.
+
+Every benchmark runs on positions from seeded random games, so results are
+comparable between runs. Drawing goes to an offscreen surface under SDL's
+dummy video driver, so no window is needed.
+
+    python benchmarks.py --save baseline.json
+    python benchmarks.py --compare baseline.json       # exits with 1 on a regression
+    python benchmarks.py --filter draw.
+"""
+import os
+
+# No window and no sound device needed; these must be set before pygame is imported
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import argparse
+import json
+import platform
+import random
+import statistics
+import sys
+import time
+
+import pygame
+
+from constants import WINDOW_WIDTH, WINDOW_HEIGHT
+from engine import GameEngine, iter_bits, COORDS
+from protocol import (FrameDecoder, decode_frame, encode_action, encode_snapshot, unpack_position,
+                      pack_position)
+
+BENCHMARKS = {}  # name -> setup function returning (run, operations per run)
+
+
+def benchmark(name):
+    def register(setup):
+        BENCHMARKS[name] = setup
+        return setup
+    return register
+
+
+def random_positions(count, seed=0, min_plies=10, max_plies=120):
+    """(engine snapshot, action that led there) pairs from seeded random games, all past monarch placement"""
+    rng = random.Random(seed)
+    engine = GameEngine()
+    positions = []
+    while len(positions) < count:
+        engine.reset()
+        for ply in range(rng.randint(min_plies, max_plies)):
+            actions = engine.legal_actions()
+            if engine.game_over or not actions:
+                break
+            action = rng.choice(actions)
+            engine.apply_action(action)
+            if ply >= min_plies and not engine.game_over and not engine.monarch_placement_phase:
+                positions.append((engine.snapshot(), action))
+                if len(positions) == count:
+                    break
+    return positions
+
+
+def fresh_engines(positions):
+    """An engine per position, with the move caches empty so benchmarks measure generation"""
+    engines = []
+    for state, _ in positions:
+        engine = GameEngine()
+        engine.restore(state)
+        engines.append(engine)
+    return engines
+
+
+# --- Engine ---
+
+@benchmark("engine.get_valid_movement_squares")
+def bench_movement():
+    engines = fresh_engines(random_positions(50))
+    squares = [[COORDS[index] for index in iter_bits(engine.occupancy[engine.current_player])]
+               for engine in engines]
+
+    def run():
+        for engine, pieces in zip(engines, squares):
+            engine._invalidate()
+            for row, col in pieces:
+                engine.get_valid_movement_squares(row, col)
+    return run, sum(map(len, squares))
+
+
+@benchmark("engine.get_valid_placement_squares")
+def bench_placement():
+    engines = fresh_engines(random_positions(50))
+
+    def run():
+        for engine in engines:
+            engine._invalidate()
+            engine.get_valid_placement_squares()
+    return run, len(engines)
+
+
+# The same calls against the rules as they were before the engine (kept in test_engine.py for the
+# replay tests), so the (row, col) API can be compared with the code it replaced
+
+
+def legacy_rules(engines):
+    from test_engine import OldRules
+
+    rules = []
+    for engine in engines:
+        old = OldRules()
+        old.board = [list(row) for row in engine.board]
+        old.current_player = engine.current_player
+        rules.append(old)
+    return rules
+
+
+@benchmark("legacy.get_valid_movement_squares")
+def bench_legacy_movement():
+    engines = fresh_engines(random_positions(50))
+    rules = legacy_rules(engines)
+    squares = [[COORDS[index] for index in iter_bits(engine.occupancy[engine.current_player])]
+               for engine in engines]
+
+    def run():
+        for old, pieces in zip(rules, squares):
+            for row, col in pieces:
+                old.movement_squares(row, col)
+    return run, sum(map(len, squares))
+
+
+@benchmark("legacy.get_valid_placement_squares")
+def bench_legacy_placement():
+    rules = legacy_rules(fresh_engines(random_positions(50)))
+
+    def run():
+        for old in rules:
+            old.placement_squares()
+    return run, len(rules)
+
+
+@benchmark("engine.check_board_promotions")
+def bench_promotions():
+    engines = fresh_engines(random_positions(50))
+
+    def run():
+        for engine in engines:
+            engine.check_board_promotions()
+    return run, len(engines)
+
+
+@benchmark("engine.legal_actions")
+def bench_legal_actions():
+    engines = fresh_engines(random_positions(50))
+
+    def run():
+        for engine in engines:
+            engine._invalidate()
+            engine.legal_actions()
+    return run, len(engines)
+
+
+# --- Serialization (what NetworkManager.send_action and update_game_state do) ---
+
+@benchmark("protocol.encode_action")
+def bench_encode_action():
+    positions = random_positions(50)
+    engines = fresh_engines(positions)
+    actions = [action for _, action in positions]
+
+    def run():
+        for seq, (engine, action) in enumerate(zip(engines, actions), 1):
+            encode_action(seq, action, engine)
+    return run, len(engines)
+
+
+@benchmark("protocol.encode_snapshot")
+def bench_encode_snapshot():
+    engines = fresh_engines(random_positions(50))
+
+    def run():
+        for seq, engine in enumerate(engines, 1):
+            encode_snapshot(seq, engine)
+    return run, len(engines)
+
+
+@benchmark("protocol.decode_snapshot")
+def bench_decode_snapshot():
+    engines = fresh_engines(random_positions(50))
+    data = b"".join(encode_snapshot(seq, engine) for seq, engine in enumerate(engines, 1))
+    target = GameEngine()
+
+    def run():
+        decoder = FrameDecoder()
+        decoder.feed(data)
+        for _, frame in decoder.frames():
+            unpack_position(decode_frame(frame)["position"], target)
+    return run, len(engines)
+
+
+@benchmark("network.update_game_state")
+def bench_update_game_state():
+    """Apply a whole game, received as action frames, to a headless Game"""
+    from main import Game
+    from network_manager import NetworkManager
+
+    rng = random.Random(1)
+    sender = GameEngine()
+    frames = []
+    while not sender.game_over and len(frames) < 200:
+        actions = sender.legal_actions()
+        if not actions:
+            break
+        action = rng.choice(actions)
+        sender.apply_action(action)
+        frames.append(encode_action(len(frames) + 1, action, sender))
+    data = b"".join(frames)
+    game = Game()
+    game.is_muted = True
+    manager = NetworkManager()
+
+    def run():
+        game.reset_game()
+        manager.reset_sequence()
+        decoder = FrameDecoder()
+        decoder.feed(data)
+        for _, frame in decoder.frames():
+            manager.update_game_state(game, decode_frame(frame))
+        assert not manager.resyncing and pack_position(game.engine) == pack_position(sender)
+    return run, len(frames)
+
+
+# --- Drawing ---
+
+def draw_fixture():
+    """A Game part way through a random game, with a piece selected, and an offscreen surface"""
+    from main import Game
+
+    game = Game()
+    rng = random.Random(2)
+    for _ in range(40):
+        actions = game.engine.legal_actions()
+        if game.game_over or not actions:
+            break
+        game.play_action(rng.choice(actions))
+    own = game.engine.occupancy[game.current_player]
+    if own:
+        row, col = COORDS[next(iter_bits(own))]
+        game.selected_piece = (row, col)
+        game.valid_moves = game.get_valid_movement_squares(row, col)
+    surface = pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT)).convert()
+    return game, surface
+
+
+def bench_section(section):
+    def setup():
+        from draw_utils import DrawUtils
+
+        game, surface = draw_fixture()
+        layer = DrawUtils._get_static_layer(game, surface)
+        _, area, _, draw_section = next(entry for entry in DrawUtils.sections(game) if entry[0] == section)
+
+        def run():
+            # Exactly what DrawUtils.draw does for a section whose state changed
+            surface.set_clip(area)
+            surface.blit(layer, area, area)
+            draw_section(game, surface)
+            surface.set_clip(None)
+        return run, 1
+    return setup
+
+
+for _section in ("board", "reserve", "info", "resign", "mute", "log"):
+    benchmark(f"draw.section.{_section}")(bench_section(_section))
+
+
+@benchmark("draw.static_layer")
+def bench_static_layer():
+    from draw_utils import DrawUtils
+
+    game, surface = draw_fixture()
+
+    def run():
+        DrawUtils._static_key = None
+        DrawUtils._get_static_layer(game, surface)
+    return run, 1
+
+
+@benchmark("draw.full_frame")
+def bench_full_frame():
+    from draw_utils import DrawUtils
+
+    game, surface = draw_fixture()
+
+    def run():
+        DrawUtils.invalidate()
+        DrawUtils.draw(game, surface)
+    return run, 1
+
+
+@benchmark("draw.idle_frame")
+def bench_idle_frame():
+    from draw_utils import DrawUtils
+
+    game, surface = draw_fixture()
+    DrawUtils.draw(game, surface)
+
+    def run():
+        DrawUtils.draw(game, surface)
+    return run, 1
+
+
+@benchmark("draw.menu")
+def bench_menu():
+    from UI import MenuScreen
+    from draw_utils import DrawUtils
+
+    menu = MenuScreen()
+    surface = pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT)).convert()
+
+    def run():
+        DrawUtils.draw_menu(surface, menu)
+    return run, 1
+
+
+# --- Runner ---
+
+def measure(run, operations, repeat, min_time):
+    """Seconds per operation for each of repeat runs, each looping long enough to last min_time"""
+    run()  # Warm up caches and lazily loaded assets
+    loops = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(loops):
+            run()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time / 10 or loops >= 1 << 20:
+            break
+        loops *= 10
+    loops = max(1, int(loops * min_time / max(elapsed, 1e-9)))
+
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(loops):
+            run()
+        samples.append((time.perf_counter() - start) / (loops * operations))
+    return samples
+
+
+def run_benchmarks(names, repeat, min_time):
+    results = {}
+    for name in names:
+        run, operations = BENCHMARKS[name]()
+        samples = measure(run, operations, repeat, min_time)
+        results[name] = {"median_us": statistics.median(samples) * 1e6, "min_us": min(samples) * 1e6,
+                         "repeat": repeat}
+        print(f"{name:<40} {results[name]['median_us']:10.2f} us  (min {results[name]['min_us']:.2f})")
+    return results
+
+
+def print_speedups(results):
+    """Speedup of each engine.* benchmark over its legacy.* counterpart, when both ran"""
+    for name, result in results.items():
+        if name.startswith("legacy."):
+            current = results.get("engine." + name[len("legacy."):])
+            if current is not None:
+                print(f"{name[len('legacy.'):]:<40} {result['min_us'] / current['min_us']:9.1f}x faster than legacy")
+
+
+def compare(results, baseline, threshold):
+    """Print the change against a baseline; returns the names that got slower than threshold allows"""
+    regressions = []
+    print(f"\n{'benchmark':<40} {'baseline':>10} {'now':>10} {'change':>8}")
+    for name, result in results.items():
+        before = baseline.get(name)
+        if before is None:
+            print(f"{name:<40} {'-':>10} {result['min_us']:10.2f} {'new':>8}")
+            continue
+        change = result["min_us"] / before["min_us"] - 1
+        flag = ""
+        if change > threshold:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print(f"{name:<40} {before['min_us']:10.2f} {result['min_us']:10.2f} {change:+8.1%}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the engine, protocol and drawing")
+    parser.add_argument("--filter", default="", help="Only run benchmarks whose name contains this")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per benchmark")
+    parser.add_argument("--min-time", type=float, default=0.2, help="Seconds each timed run should last")
+    parser.add_argument("--save", metavar="FILE", help="Write the results as JSON")
+    parser.add_argument("--compare", metavar="FILE", help="JSON results to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="Slowdown (as a fraction) that counts as a regression")
+    args = parser.parse_args()
+
+    pygame.init()
+    # Textures are converted for the display format, so a (dummy) display must exist
+    pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
+
+    names = [name for name in BENCHMARKS if args.filter in name]
+    results = run_benchmarks(names, args.repeat, args.min_time)
+    print_speedups(results)
+
+    if args.save:
+        with open(args.save, "w") as output:
+            json.dump({"python": platform.python_version(), "pygame": pygame.version.ver,
+                       "platform": platform.platform(), "time": time.strftime("%Y-%m-%d %H:%M:%S"),
+                       "results": results}, output, indent=2)
+        print(f"Saved results to {args.save}")
+
+    if args.compare:
+        with open(args.compare) as baseline_file:
+            baseline = json.load(baseline_file)["results"]
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"{len(regressions)} regression(s) over {args.threshold:.0%}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,8 @@
+import os
+
+# The game's modules sit next to the interpreter's own folders; only collect the game's tests
+collect_ignore = ["Lib", "Scripts", "include"]
+
+# Tests that touch pygame run without a window or sound card
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
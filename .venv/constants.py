@@ -0,0 +1,45 @@
+
+WINDOW_WIDTH = 1700
+WINDOW_HEIGHT = 1200
+BOARD_SIZE = 9
+
+CELL_SIZE = int(WINDOW_HEIGHT * 0.08)
+BOARD_PIXELS = BOARD_SIZE * CELL_SIZE
+GRID_OFFSET_X = (WINDOW_WIDTH - BOARD_PIXELS) // 2 - int(WINDOW_WIDTH * 0.15)  # Shift left to make room for reserve
+GRID_OFFSET_Y = (WINDOW_HEIGHT - BOARD_PIXELS) // 2
+GRID_OFFSET = GRID_OFFSET_Y
+RESERVE_WIDTH = CELL_SIZE * 6
+
+PLAYING_FPS = 60
+
+PALACE_AREA = 5
+
+# Game Constants
+EMPTY = 0
+PLAYER_1 = 1
+PLAYER_2 = 2
+
+ADVISOR_NUMBER = 2
+OFFICIAL_NUMBER = 5
+PALACE_NUMBER = 1
+NUMBER_OF_PIECES = ADVISOR_NUMBER + OFFICIAL_NUMBER + PALACE_NUMBER
+
+# Colors
+BLACK = (0, 0, 0)
+WHITE = (255, 255, 255)
+BROWN = (139, 69, 19)
+GRID_COLOR = (20, 20, 20)
+NEW = (50, 50, 50)
+
+PLACE_HIGHLIGHT_PLAYER1 = (0, 255, 0, 128)
+PLACE_HIGHLIGHT_PLAYER2 = (255, 180, 255, 128)
+MOVE_HIGHLIGHT_PLAYER1 = (0, 127, 0, 128)
+MOVE_HIGHLIGHT_PLAYER2 = (127, 90, 127, 128)
+
+PLAYER_1_COLOR = (255, 255, 255)
+PLAYER_2_COLOR = (0, 0, 0)
+
+RED = (255, 50, 50)
+GOLD = (212, 175, 55)
+PURPLE = (255, 0, 255, 0)
+YELLOW = (255, 200, 50)
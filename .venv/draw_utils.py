@@ -0,0 +1,896 @@
+import pygame
+import random
+import math
+import time
+from functools import lru_cache
+from constants import *
+from assets import assets
+
+try:
+    import numpy as np
+    from particles import ParticleSystem
+except ImportError:
+    print("NumPy not found, using the slower starfield")
+    ParticleSystem = None
+
+class StarPoint:
+    def __init__(self, center_x, center_y,star_color):
+        offset_x = random.uniform(-5, 5)
+        offset_y = random.uniform(-5, 5)
+        self.position = [center_x + offset_x, center_y + offset_y]
+        self.center = (center_x, center_y)  # Store center for distance calculation
+        self.size = 0.5
+        x = random.uniform(-1, 1)
+        y = random.uniform(-1, 1)
+
+        min_speed = .1
+
+        # Ensure min speed
+        if x > 0:
+            x = max(min_speed, x)
+        else:
+            x = min(-min_speed, x)
+
+        if y > 0:
+            y = max(min_speed, y)
+        else:
+            y = min(-min_speed, y)
+
+        self.vector = (x, y)
+        self.color = star_color
+    def update(self, speed):
+        # Update position based on vector
+        self.position[0] += self.vector[0] * speed
+        self.position[1] += self.vector[1] * speed
+
+        # Calculate distance from center
+        dx = self.position[0] - self.center[0]
+        dy = self.position[1] - self.center[1]
+        distance = (dx * dx + dy * dy) ** 0.5
+
+        # Gradually increase size based on distance
+        # Starting from 0.5, growing to max 2.5
+        self.size = 0.5 + (distance / 150)  # Adjust 400 to control growth rate
+        self.size = min(10, self.size)  # Cap maximum size
+
+    def is_off_screen(self, width, height):
+        return (self.position[0] < 0 or self.position[0] > width or
+                self.position[1] < 0 or self.position[1] > height)
+
+class MenuStarfield:
+    def __init__(self, width, height, max_stars=200, spawn_count=1):
+        self.width = width
+        self.height = height
+        self.stars = []  # Only used without NumPy
+        self.center = (width // 2, height // 2)
+        self.frame_counter = 0
+        self.spawn_interval = 2
+        self.spawn_count = spawn_count  # Stars spawned every spawn_interval frames
+        self.max_stars = max_stars
+        self.speed = 5
+
+        if ParticleSystem is not None:
+            self.particles = ParticleSystem(max_stars, (width, height), start_size=0.5,
+                                            growth=1 / 150, max_size=10)
+            self.rng = np.random.default_rng()
+        else:
+            self.particles = None
+
+    def update(self):
+        if self.particles is None:
+            self._update_star_points()
+            return
+
+        self.frame_counter += 1
+
+        # Spawn new stars every few frames if under max
+        count = min(self.spawn_count, self.max_stars - len(self.particles))
+        if self.frame_counter % self.spawn_interval == 0 and count > 0:
+            rng = self.rng
+            positions = self.center + rng.uniform(-5, 5, (count, 2))
+
+            # Ensure min speed on both axes
+            velocities = rng.uniform(-1, 1, (count, 2))
+            velocities = np.where(velocities > 0, np.maximum(velocities, .1), np.minimum(velocities, -.1))
+
+            # Roughly one star in fifty gets a random colour (from a 216 colour palette to keep
+            # the sprite cache small)
+            colors = np.full((count, 3), 255, np.uint8)
+            coloured = rng.uniform(0, 100, count) > 98
+            colors[coloured] = rng.integers(0, 6, (int(coloured.sum()), 3)) * 51
+
+            self.particles.spawn(positions, velocities, colors, origins=np.tile(self.center, (count, 1)))
+
+        self.particles.update(self.speed)
+
+    def _update_star_points(self):
+        self.frame_counter += 1
+
+        star_chance = random.uniform(0,100)
+
+        if star_chance > 98:
+            star_color = (random.uniform(0,255),random.uniform(0,255),random.uniform(0,255))
+        else:
+            star_color = (255, 255, 255)
+
+        # Spawn new star every few frames if under max
+        if self.frame_counter % self.spawn_interval == 0 and len(self.stars) < self.max_stars:
+            self.stars.append(StarPoint(self.center[0], self.center[1], star_color))
+
+        # Update existing stars and remove ones that are off screen
+        self.stars = [star for star in self.stars if not star.is_off_screen(self.width, self.height)]
+        for star in self.stars:
+            star.update(self.speed)
+
+    def draw(self, screen):
+        if self.particles is not None:
+            self.particles.draw(screen)
+            return
+
+        for star in self.stars:
+            pygame.draw.circle(screen, star.color,
+                               (int(star.position[0]), int(star.position[1])),
+                               star.size)  # Use dynamic size
+
+GENERAL_FONT = 'Fonts/general_text.ttf'
+LOG_LINE_HEIGHT = 25
+LOG_OVERFLOW_LINES = 4
+
+
+@lru_cache(maxsize=None)
+def get_font(path, size):
+    """Opening a font is slow, so each (file, size) pair is only loaded once"""
+    return pygame.font.Font(path, size)
+
+
+@lru_cache(maxsize=512)
+def render_text(font, text, color):
+    """Rendered text surfaces, cached by font, content and colour"""
+    return font.render(text, True, color)
+
+
+@lru_cache(maxsize=256)
+def wrap_text(font, text, width):
+    """Split text at spaces into lines no wider than width"""
+    if font.size(text)[0] <= width:
+        return (text,)
+
+    words = text.split()
+    lines = []
+    current_line = words[0]
+    for word in words[1:]:
+        test_line = current_line + " " + word
+        if font.size(test_line)[0] <= width:
+            current_line = test_line
+        else:
+            lines.append(current_line)
+            current_line = word
+    lines.append(current_line)
+    return tuple(lines)
+
+
+class DrawUtils:
+    # The play screen is a static layer (background, borders, grid, coordinates,
+    # tables) composed once, with a few sections drawn on top. Each section is
+    # redrawn only when its state key changes.
+    _static_layer = None
+    _static_key = None
+    _areas = None
+    _areas_key = None
+    _section_keys = None  # None forces a full redraw
+    _target = None
+    _log_background = None
+    _overlay = None  # (area, what the screen looked like under the profiling overlay)
+    _overlay_text = None  # (rendered panel, when it was rendered)
+
+    @staticmethod
+    def invalidate():
+        """Redraw the whole play screen next frame (e.g. after another screen drew over it)"""
+        DrawUtils._section_keys = None
+
+    @staticmethod
+    def draw(game, screen, profiler=None):
+        """Draw whatever changed since the last frame and return the dirty rectangles.
+
+        With a FrameProfiler, the time each redrawn section takes is recorded.
+        """
+        layer = DrawUtils._get_static_layer(game, screen)
+        target = (id(game), id(screen))
+        full_redraw = DrawUtils._section_keys is None or DrawUtils._target != target
+        if full_redraw:
+            screen.blit(layer, (0, 0))
+            DrawUtils._section_keys = {}
+            DrawUtils._target = target
+
+        dirty = []
+        for name, area, key, draw_section in DrawUtils.sections(game):
+            if name in DrawUtils._section_keys and DrawUtils._section_keys[name] == key:
+                continue
+            DrawUtils._section_keys[name] = key
+
+            # Put the static layer back under the section, then draw it clipped to its area
+            screen.set_clip(area)
+            screen.blit(layer, area, area)
+            if profiler is None:
+                draw_section(game, screen)
+            else:
+                start = time.perf_counter()
+                draw_section(game, screen)
+                profiler.record_section(name, time.perf_counter() - start)
+            screen.set_clip(None)
+            dirty.append(area)
+
+        return [screen.get_rect()] if full_redraw else dirty
+
+    @staticmethod
+    def draw_profiler_overlay(screen, profiler, rtt=None, refresh=0.25):
+        """Draw the profiling panel in the top left corner and return its area.
+
+        The text is re-rendered at most every refresh seconds. Call
+        clear_profiler_overlay before the next frame is drawn.
+        """
+        now = time.perf_counter()
+        if DrawUtils._overlay_text is None or now - DrawUtils._overlay_text[1] >= refresh:
+            font = get_font(None, 22)
+            lines = profiler.summary(rtt)
+            panel = pygame.Surface((300, 10 + 20 * len(lines)))
+            panel.fill((0, 0, 0))
+            panel.set_alpha(200)
+            for row, line in enumerate(lines):
+                panel.blit(font.render(line, True, (0, 255, 0)), (8, 6 + 20 * row))
+            DrawUtils._overlay_text = (panel, now)
+
+        panel = DrawUtils._overlay_text[0]
+        area = panel.get_rect(topleft=(10, 10)).clip(screen.get_rect())
+        DrawUtils._overlay = (area, screen.subsurface(area).copy())
+        screen.blit(panel, area)
+        return area
+
+    @staticmethod
+    def clear_profiler_overlay(screen):
+        """Put back what the overlay covered and return that area (None if it wasn't drawn)"""
+        if DrawUtils._overlay is None:
+            return None
+        area, under = DrawUtils._overlay
+        DrawUtils._overlay = None
+        screen.blit(under, area)
+        return area
+
+    @staticmethod
+    def sections(game):
+        """(name, screen area, state key, draw function) for each part of the play screen that can change"""
+        areas = DrawUtils._get_areas(game)
+        selected_reserve = game.selected_reserve_piece
+        return (
+            ("board", areas["board"],
+             (game.engine.version, game.is_king_placement_phase(), game.current_player,
+              game.selected_piece, tuple(game.valid_moves), bool(selected_reserve)),
+             DrawUtils._draw_board),
+            ("reserve", areas["reserve"],
+             (tuple(map(tuple, game.player1_reserve)), tuple(map(tuple, game.player2_reserve)),
+              tuple(selected_reserve.items()) if selected_reserve else None),
+             DrawUtils._draw_reserve),
+            ("info", areas["info"], game.current_player, DrawUtils._draw_game_info),
+            ("resign", areas["resign"], (game.resign_hover, game.spectating), DrawUtils._draw_resign_button),
+            ("mute", areas["mute"], game.is_muted, DrawUtils._draw_mute_button),
+            ("log", areas["log"], tuple(game.message_log), DrawUtils.draw_message_log),
+        )
+
+    @staticmethod
+    def _get_areas(game):
+        """Screen area owned by each section; they never overlap"""
+        key = (id(game), tuple(game.resign_button_rect), tuple(game.mute_button_rect), tuple(game.log_rect))
+        if DrawUtils._areas_key == key:
+            return DrawUtils._areas
+
+        board_pixels = BOARD_SIZE * CELL_SIZE
+        (reserve_start_x, _, _, table_size, _, padding, border_width) = DrawUtils._reserve_layout()
+        # Reserves can outgrow their tables, so the section spans the full height
+        reserve_margin = border_width + padding
+        reserve = pygame.Rect(reserve_start_x - reserve_margin, 0,
+                              table_size + reserve_margin * 2, WINDOW_HEIGHT)
+
+        info_font = get_font(GENERAL_FONT, 36)
+        info = pygame.Rect(10, 10, 0, 0)
+        for name in ("White", "Black"):
+            info.union_ip(render_text(info_font, f"Player to move: {name}", WHITE).get_rect(topleft=(10, 10)))
+
+        resign_text = render_text(get_font(GENERAL_FONT, 30), "Resign", WHITE)
+        resign = game.resign_button_rect.union(resign_text.get_rect(center=game.resign_button_rect.center))
+
+        x, y = game.mute_button_rect.topleft
+        mute_text = render_text(get_font(GENERAL_FONT, 25), "Use arrows keys to adjust volume", BLACK)
+        mute = game.mute_button_rect.inflate(700, 10).union(mute_text.get_rect(topleft=(x + 70, y + 20)))
+
+        # The last message shown can wrap past the top of the log box
+        log = game.log_rect.inflate(0, LOG_OVERFLOW_LINES * LOG_LINE_HEIGHT)
+        log.bottom = game.log_rect.bottom
+
+        DrawUtils._areas = {
+            "board": pygame.Rect(GRID_OFFSET, GRID_OFFSET, board_pixels, board_pixels),
+            "reserve": reserve,
+            "info": info,
+            "resign": resign,
+            "mute": mute,
+            "log": log,
+        }
+        DrawUtils._areas_key = key
+        return DrawUtils._areas
+
+    @staticmethod
+    def _get_static_layer(game, screen):
+        """Everything that never changes during a game, scaled and composed once"""
+        key = (screen.get_size(), id(game.background), id(game.background_2), id(game.table_texture))
+        if DrawUtils._static_key == key:
+            return DrawUtils._static_layer
+
+        layer = pygame.Surface(screen.get_size(), 0, screen)
+        layer.blit(game.background_2, (0, 0))
+
+        # Draw board border first (3D effect)
+        border_width = 8
+        # Outer dark border (shadow)
+        pygame.draw.rect(layer, (40, 40, 40,),
+                         (GRID_OFFSET - border_width,
+                          GRID_OFFSET - border_width,
+                          BOARD_SIZE * CELL_SIZE + border_width * 2,
+                          BOARD_SIZE * CELL_SIZE + border_width * 2))
+        # Inner light border (highlight)
+        pygame.draw.rect(layer, (200, 200, 200),
+                         (GRID_OFFSET - border_width // 2,
+                          GRID_OFFSET - border_width // 2,
+                          BOARD_SIZE * CELL_SIZE + border_width,
+                          BOARD_SIZE * CELL_SIZE + border_width))
+
+        board_size = BOARD_SIZE * CELL_SIZE
+        board_background = pygame.transform.scale(game.background, (board_size, board_size))
+        layer.blit(board_background, (GRID_OFFSET, GRID_OFFSET))
+
+        DrawUtils._draw_grid(layer)
+        DrawUtils._draw_coordinates(layer)
+        DrawUtils._draw_center_x(layer)
+        DrawUtils._draw_reserve_tables(game, layer)
+
+        DrawUtils._static_layer, DrawUtils._static_key = layer, key
+        DrawUtils._section_keys = None
+        return layer
+
+    @staticmethod
+    def _draw_board(game, screen):
+        """Draw the center square, highlights and pieces"""
+        if game.is_king_placement_phase():
+            DrawUtils.draw_red_center(screen)
+
+        # Draw the center X
+        DrawUtils._draw_center_x(screen)
+
+        # Draw valid placements if in placement phase
+        if game.selected_reserve_piece:
+            DrawUtils._draw_valid_placements(game, screen)
+
+        # Draw valid moves if a piece is selected
+        if game.selected_piece:
+            DrawUtils._draw_valid_moves(game, screen)
+
+        # Draw selected piece highlight
+        if game.selected_piece:
+            DrawUtils._draw_selected_piece_highlight(game, screen)
+
+        # Draw all pieces
+        DrawUtils._draw_pieces_on_board(game, screen)
+
+    @staticmethod
+    def _draw_reserve(game, screen):
+        """Draw the reserve pieces and the selected reserve piece highlight"""
+        DrawUtils._draw_piece_reserve(game, screen)
+
+        if game.selected_reserve_piece:
+            DrawUtils._draw_selected_reserve_piece(game, screen)
+
+    @staticmethod
+    def _draw_resign_button(game, screen):
+        """Draw the resign button in the top right corner (spectators have nothing to resign)"""
+        if game.spectating:
+            return
+        button_color = (200, 50, 50) if game.resign_hover else (150, 30, 30)
+        pygame.draw.rect(screen, button_color, game.resign_button_rect)
+        pygame.draw.rect(screen, (255, 255, 255), game.resign_button_rect, 2)  # White border
+
+        # Draw button text
+        text = render_text(get_font(GENERAL_FONT, 30), "Resign", (255, 255, 255))
+        text_rect = text.get_rect(center=game.resign_button_rect.center)
+        screen.blit(text, text_rect)
+    @staticmethod
+    def _draw_coordinates(screen, color=(255, 255, 255)):  # Added color parameter with white as default
+        """Draw coordinate numbers on the left and bottom edges of the board"""
+        # Set up the font
+        font = get_font(None, int(CELL_SIZE * 0.5))  # Font size relative to cell size
+
+        # Calculate padding for number placement
+        padding = CELL_SIZE * 0.3
+
+        for i in range(BOARD_SIZE):
+            # Bottom numbers count left to right (1 to n)
+            bottom_number = str(i + 1)
+            text = render_text(font, bottom_number, color)  # Using custom color
+            x = GRID_OFFSET + (i * CELL_SIZE) + (CELL_SIZE - text.get_width()) // 2
+            y = GRID_OFFSET + (BOARD_SIZE * CELL_SIZE) + padding
+            screen.blit(text, (x, y))
+
+            # Left numbers count top to bottom (1 to n)
+            left_number = str(BOARD_SIZE - i)
+            text = render_text(font, left_number, color)  # Using custom color
+            x = GRID_OFFSET - padding - text.get_width()
+            y = GRID_OFFSET + (i * CELL_SIZE) + (CELL_SIZE - text.get_height()) // 2
+            screen.blit(text, (x, y))
+    @staticmethod
+    def draw_menu(screen, menu):
+        """Draw the menu screen with starfield effect and all its components"""
+        # Initialize starfield if not already created
+        if not hasattr(menu, 'starfield'):
+            menu.starfield = MenuStarfield(screen.get_width(), screen.get_height())
+
+        # Draw black background
+        screen.fill((0, 0, 0))
+
+        # Update and draw starfield
+        menu.starfield.update()
+        menu.starfield.draw(screen)
+
+        # Draw title "Deceit" at the top
+        title_font = get_font(GENERAL_FONT, 100)  # Using your custom font
+        title_text = render_text(title_font, "Seiji ", (255, 255, 255))
+        title_rect = title_text.get_rect(centerx=screen.get_width() // 2, top=50)
+        screen.blit(title_text, title_rect)
+
+        # Draw each button bigger and without table texture
+        button_height = 80  # Increased button height
+        for border_rect, (button_rect, text) in zip(menu.button_borders, menu.buttons):
+            # Increase button size
+            button_rect.height = button_height
+            border_rect.height = button_height + 4
+
+            # Draw text with larger font
+            DrawUtils._draw_menu_text(screen, text, button_rect, menu.font, size=40)
+
+        # Game assets keep loading in the background while the menu is up
+        loaded, total = assets.progress()
+        if loaded < total:
+            DrawUtils._draw_loading_bar(screen, loaded, total)
+
+        if menu.show_ip_dialog:
+            # Draw semi-transparent black overlay
+            overlay = pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT))
+            overlay.fill((0, 0, 0))
+            overlay.set_alpha(200)
+            screen.blit(overlay, (0, 0))
+
+            # Draw IP dialog
+            dialog_width = 400
+            dialog_height = 200
+            dialog_x = (WINDOW_WIDTH - dialog_width) // 2
+            dialog_y = (WINDOW_HEIGHT - dialog_height) // 2
+
+            # Draw dialog box
+            pygame.draw.rect(screen, (0, 0, 0), (dialog_x, dialog_y, dialog_width, dialog_height))
+            pygame.draw.rect(screen, (255, 255, 255), (dialog_x, dialog_y, dialog_width, dialog_height), 2)
+
+            # Draw text
+            font = get_font(None, 32)
+            title = render_text(font, "Enter Server IP (and room code)", (255, 255, 255))
+            screen.blit(title, (dialog_x + 20, dialog_y + 20))
+            hint = render_text(get_font(None, 24), "Start with \"watch\" to spectate a room", (180, 180, 180))
+            screen.blit(hint, (dialog_x + 20, dialog_y + 130))
+
+            # Draw input box
+            input_box = pygame.Rect(dialog_x + 20, dialog_y + 70, dialog_width - 40, 40)
+            pygame.draw.rect(screen, (50, 50, 50), input_box)
+            pygame.draw.rect(screen, (255, 255, 255), input_box, 2)
+
+            # Draw input text
+            if hasattr(menu, 'ip_input'):
+                text = font.render(menu.ip_input, True, (255, 255, 255))
+                screen.blit(text, (input_box.x + 5, input_box.y + 10))
+
+    def draw_message_log(self, screen):
+        """Draw the message log in the bottom right corner with scrolling"""
+        # Draw semi-transparent background
+        log_surface = DrawUtils._log_background
+        if log_surface is None or log_surface.get_size() != self.log_rect.size:
+            log_surface = pygame.Surface((self.log_rect.width, self.log_rect.height))
+            log_surface.fill((30, 30, 30))
+            log_surface.set_alpha(200)
+            DrawUtils._log_background = log_surface
+        screen.blit(log_surface, self.log_rect)
+
+        # Draw border
+        pygame.draw.rect(screen, (100, 100, 100), self.log_rect, 2)
+
+        # Get the most recent messages (reverse the list)
+        messages_to_display = list(reversed(self.message_log))
+
+        # Draw messages from bottom up
+        current_y = self.log_rect.bottom - 30  # Start from bottom, with padding
+
+        for message in messages_to_display:
+            # If we've moved above the top of the box, stop drawing
+            if current_y < self.log_rect.top:
+                break
+
+            # Draw wrapped lines from bottom up
+            for line in reversed(wrap_text(self.log_font, message, self.log_rect.width - 10)):
+                text_surface = render_text(self.log_font, line, (255, 255, 255))
+                screen.blit(text_surface, (self.log_rect.x + 5, current_y))
+                current_y -= LOG_LINE_HEIGHT
+
+    @staticmethod
+    def _draw_loading_bar(screen, loaded, total):
+        """Draw the background preload progress along the bottom of the menu"""
+        bar = pygame.Rect(0, 0, screen.get_width() // 4, 6)
+        bar.midbottom = (screen.get_width() // 2, screen.get_height() - 40)
+        pygame.draw.rect(screen, (60, 0, 0), bar)
+        pygame.draw.rect(screen, (255, 0, 0), (bar.x, bar.y, bar.width * loaded // total, bar.height))
+
+        label = render_text(get_font(None, 24), f"Loading {loaded}/{total}", (255, 0, 0))
+        screen.blit(label, label.get_rect(centerx=bar.centerx, bottom=bar.top - 6))
+
+    @staticmethod
+    def _draw_menu_text(screen, text, button, font, size=50):  # Increased size from 40 to 50
+        """Helper method to draw text on menu buttons with specified size"""
+        letter_spacing = 10  # Adjust this value to increase/decrease spacing
+
+        # Calculate total width with spacing to center properly
+        total_width = 0
+        letter_surfaces = []
+        for char in text:
+            letter_surface = render_text(font, char, (255, 0, 0))  # Changed to red (255, 0, 0)
+            letter_surfaces.append(letter_surface)
+            total_width += letter_surface.get_width() + letter_spacing
+        total_width -= letter_spacing  # Remove extra spacing after last letter
+
+        # Calculate starting x position to center the text
+        start_x = button.centerx - (total_width // 2)
+        y = button.centery - letter_surfaces[0].get_height() // 2
+
+        # Draw each letter with spacing
+        current_x = start_x
+        for letter_surface in letter_surfaces:
+            screen.blit(letter_surface, (current_x, y))
+            current_x += letter_surface.get_width() + letter_spacing
+
+    @staticmethod
+    def _draw_center_x(screen):
+        """Draw the X in the center of the board"""
+        center_x = GRID_OFFSET + (BOARD_SIZE // 2) * CELL_SIZE
+        center_y = GRID_OFFSET + (BOARD_SIZE // 2) * CELL_SIZE
+        pygame.draw.line(screen, GRID_COLOR,
+                         (center_x, center_y),
+                         (center_x + CELL_SIZE, center_y + CELL_SIZE),
+                         width=2)
+        pygame.draw.line(screen, GRID_COLOR,
+                         (center_x + CELL_SIZE, center_y),
+                         (center_x, center_y + CELL_SIZE),
+                         width=2)
+
+    # Add this static method to the DrawUtils class:
+    @staticmethod
+    def draw_red_center(screen):
+        """Draw a transparent red highlight in the center of the board with an X"""
+        center_x = GRID_OFFSET + (BOARD_SIZE // 2) * CELL_SIZE
+        center_y = GRID_OFFSET + (BOARD_SIZE // 2) * CELL_SIZE
+
+        # Create a surface for the transparent red square
+        red_surface = pygame.Surface((CELL_SIZE, CELL_SIZE), pygame.SRCALPHA)
+        pygame.draw.rect(red_surface, (255, 0, 0, 128), (0, 0, CELL_SIZE, CELL_SIZE))  # 128 is half transparency
+        screen.blit(red_surface, (center_x, center_y))
+
+        # Draw the X lines in white for contrast
+        pygame.draw.line(screen, (255, 255, 255),
+                         (center_x, center_y),
+                         (center_x + CELL_SIZE, center_y + CELL_SIZE),
+                         width=3)
+        pygame.draw.line(screen, (255, 255, 255),
+                         (center_x + CELL_SIZE, center_y),
+                         (center_x, center_y + CELL_SIZE),
+                         width=3)
+
+    @staticmethod
+    def _draw_grid(screen):
+        """Draw the game board grid"""
+        for i in range(BOARD_SIZE + 1):
+            pygame.draw.line(screen, GRID_COLOR,
+                             (GRID_OFFSET + i * CELL_SIZE, GRID_OFFSET),
+                             (GRID_OFFSET + i * CELL_SIZE, GRID_OFFSET + BOARD_SIZE * CELL_SIZE),
+                             width=1)
+            pygame.draw.line(screen, GRID_COLOR,
+                             (GRID_OFFSET, GRID_OFFSET + i * CELL_SIZE),
+                             (GRID_OFFSET + BOARD_SIZE * CELL_SIZE, GRID_OFFSET + i * CELL_SIZE),
+                             width=1)
+
+    @staticmethod
+    def _draw_valid_placements(game, screen):
+        """Draw valid placement squares for piece placement phase"""
+        valid_placements = game.get_valid_placement_squares()
+        for row, col in valid_placements:
+            if game.board[row][col] == EMPTY:  # Only highlight empty squares
+                color = PLACE_HIGHLIGHT_PLAYER1 if game.current_player == PLAYER_1 else PLACE_HIGHLIGHT_PLAYER2
+                x = GRID_OFFSET + col * CELL_SIZE
+                y = GRID_OFFSET + row * CELL_SIZE
+
+                pygame.draw.rect(screen, color, (x, y, CELL_SIZE, CELL_SIZE))
+                pygame.draw.line(screen, GRID_COLOR, (x, y), (x, y + CELL_SIZE))
+                pygame.draw.line(screen, GRID_COLOR, (x, y), (x + CELL_SIZE, y))
+
+    @staticmethod
+    def _draw_valid_moves(game, screen):
+        """Draw valid moves for selected piece"""
+        for row, col in game.valid_moves:
+            color = MOVE_HIGHLIGHT_PLAYER1 if game.current_player == PLAYER_1 else MOVE_HIGHLIGHT_PLAYER2
+            x = GRID_OFFSET + col * CELL_SIZE
+            y = GRID_OFFSET + row * CELL_SIZE
+
+            pygame.draw.rect(screen, color, (x, y, CELL_SIZE, CELL_SIZE))
+            pygame.draw.line(screen, GRID_COLOR, (x, y), (x, y + CELL_SIZE))
+            pygame.draw.line(screen, GRID_COLOR, (x, y), (x + CELL_SIZE, y))
+
+    @staticmethod
+    def _draw_mute_button(game, screen):
+        """Draw the mute button with speaker icon and volume message"""
+        # Draw button background with gray box
+        button_bg_rect = pygame.Rect(game.mute_button_rect)
+        button_bg_rect.inflate_ip(700, 10)
+
+        pygame.draw.rect(screen, (200, 200, 200, 100), button_bg_rect)
+        pygame.draw.rect(screen, (180, 20, 20), button_bg_rect, width=2)
+        pygame.draw.rect(screen, (30, 30, 30), game.mute_button_rect, border_radius=10)
+
+        x, y = game.mute_button_rect.topleft
+        pygame.draw.polygon(screen, WHITE, [
+            (x + 15, y + 25),
+            (x + 25, y + 25),
+            (x + 35, y + 15),
+            (x + 35, y + 45),
+            (x + 25, y + 35),
+            (x + 15, y + 35),
+        ])
+
+        if not game.is_muted:
+            pygame.draw.arc(screen, WHITE, (x + 35, y + 20, 10, 20), -0.5, 0.5, 2)
+            pygame.draw.arc(screen, WHITE, (x + 40, y + 15, 15, 30), -0.5, 0.5, 2)
+        else:
+            pygame.draw.line(screen, RED, (x + 40, y + 15), (x + 55, y + 45), 3)
+            pygame.draw.line(screen, RED, (x + 55, y + 15), (x + 40, y + 45), 3)
+
+        text = render_text(get_font(GENERAL_FONT, 25), "Use arrows keys to adjust volume", BLACK)
+        screen.blit(text, (x + 70, y + 20))
+
+    @staticmethod
+    def _draw_selected_piece_highlight(game, screen):
+        """Draw highlight for selected piece"""
+        row, col = game.selected_piece
+        pygame.draw.rect(screen, RED,
+                         (GRID_OFFSET + col * CELL_SIZE,
+                          GRID_OFFSET + row * CELL_SIZE,
+                          CELL_SIZE, CELL_SIZE))
+
+    @staticmethod
+    def _draw_pieces_on_board(game, screen):
+        """Draw all pieces on the board"""
+        for row in range(BOARD_SIZE):
+            for col in range(BOARD_SIZE):
+                if game.board[row][col] != EMPTY:
+                    piece = game.board[row][col]
+                    main_color = WHITE if piece.owner == PLAYER_1 else BLACK
+                    contrast_color = BLACK if piece.owner == PLAYER_1 else WHITE
+
+                    center = (GRID_OFFSET + col * CELL_SIZE + CELL_SIZE // 2,
+                              GRID_OFFSET + row * CELL_SIZE + CELL_SIZE // 2)
+
+                    if piece.promoted:
+                        pygame.draw.circle(screen, RED, center, CELL_SIZE // 2 - 2)
+
+                    pygame.draw.circle(screen, main_color, center, CELL_SIZE // 2 - 5)
+
+                    DrawUtils._draw_piece_type_indicators(screen, piece, center)
+
+    @staticmethod
+    def _draw_piece_type_indicators(screen, piece, center):
+        """Draw special indicators for different piece types"""
+        contrast_color = BLACK if piece.owner == PLAYER_1 else WHITE
+
+        if piece.name == "Monarch":
+            points = [
+                (center[0], center[1] - CELL_SIZE // 4),
+                (center[0] - CELL_SIZE // 4, center[1] + CELL_SIZE // 4),
+                (center[0] + CELL_SIZE // 4, center[1] + CELL_SIZE // 4)
+            ]
+            pygame.draw.polygon(screen, GOLD, points)
+        elif piece.name == "Advisor":
+            pygame.draw.circle(screen, contrast_color, center, CELL_SIZE // 4)
+        elif piece.name == "Palace":
+            area_size = PALACE_AREA
+            # Calculate grid position from center
+            grid_col = (center[0] - GRID_OFFSET) // CELL_SIZE
+            grid_row = (center[1] - GRID_OFFSET) // CELL_SIZE
+
+            # Calculate top-left position for palace area
+            top_left_x = GRID_OFFSET + (grid_col - (area_size // 2)) * CELL_SIZE
+            top_left_y = GRID_OFFSET + (grid_row - (area_size // 2)) * CELL_SIZE
+
+            outline_color = PLAYER_1_COLOR if piece.owner == PLAYER_1 else PLAYER_2_COLOR
+
+            # Create a clip rect for the board boundaries
+            board_rect = pygame.Rect(GRID_OFFSET, GRID_OFFSET, BOARD_SIZE * CELL_SIZE, BOARD_SIZE * CELL_SIZE)
+            original_clip = screen.get_clip()
+            screen.set_clip(board_rect)
+
+            # Draw the rectangle
+            outline_rect = pygame.Rect(top_left_x, top_left_y, area_size * CELL_SIZE, area_size * CELL_SIZE)
+            pygame.draw.rect(screen, outline_color, outline_rect, 4)
+
+            # Reset the clip
+            screen.set_clip(original_clip)
+
+            # Draw the center purple square
+            palace_size = CELL_SIZE // 2
+            palace_top_left = (center[0] - palace_size // 2, center[1] - palace_size // 2)
+            pygame.draw.rect(screen, PURPLE, (palace_top_left[0], palace_top_left[1], palace_size, palace_size))
+
+    @staticmethod
+    def _reserve_layout():
+        """Reserve table geometry: (start x, top table y, bottom table y, table size, piece spacing,
+        padding, border width)"""
+        # Calculate reserve area dimensions - made tables smaller
+        reserve_width = int(WINDOW_WIDTH * 0.15)  # Reduced from 0.20 to 0.15
+        reserve_height = int(WINDOW_HEIGHT * 0.25)  # Reduced from 0.30 to 0.25
+
+        # Start reserve area after the board with some padding
+        reserve_start_x = GRID_OFFSET_X + BOARD_PIXELS + int(WINDOW_WIDTH * 0.02)
+        # Scale piece spacing relative to reserve size - increased relative piece size
+        piece_spacing = int(reserve_width * 0.22)  # Increased from 0.15 to 0.22
+        padding = int(piece_spacing * 0.15)
+
+        # Calculate table size based on reserve dimensions
+        table_size = max(reserve_width, reserve_height)
+
+        # Align tables with board edges
+        top_table_y = GRID_OFFSET  # Align with board top
+        bottom_table_y = GRID_OFFSET + (BOARD_SIZE * CELL_SIZE) - table_size  # Align with board bottom
+        border_width = int(WINDOW_HEIGHT * 0.008)
+
+        return (reserve_start_x, top_table_y, bottom_table_y, table_size, piece_spacing,
+                padding, border_width)
+
+    @staticmethod
+    def _draw_reserve_tables(game, screen):
+        """Draw both reserve tables with 3D borders (part of the static layer)"""
+        (reserve_start_x, top_table_y, bottom_table_y, table_size, _, _,
+         border_width) = DrawUtils._reserve_layout()
+        table_texture = pygame.transform.scale(game.table_texture, (table_size, table_size))
+
+        # Draw tables for both players
+        for y_offset in [top_table_y, bottom_table_y]:
+            # Draw outer shadow border
+            pygame.draw.rect(screen, (40, 40, 40),
+                             (reserve_start_x - border_width,
+                              y_offset - border_width,
+                              table_size + border_width * 2,
+                              table_size + border_width * 2))
+
+            # Draw inner highlight border
+            pygame.draw.rect(screen, (200, 200, 200),
+                             (reserve_start_x - border_width // 2,
+                              y_offset - border_width // 2,
+                              table_size + border_width,
+                              table_size + border_width))
+
+            # Draw table background
+            screen.blit(table_texture, (reserve_start_x, y_offset))
+
+    @staticmethod
+    def _draw_piece_reserve(game, screen):
+        """Draw the pieces waiting in both reserves"""
+        (reserve_start_x, top_table_y, bottom_table_y, _, piece_spacing,
+         padding, _) = DrawUtils._reserve_layout()
+
+        # Draw the pieces with updated spacing
+        DrawUtils._draw_reserve_pieces(game, screen, game.player1_reserve,
+                                       reserve_start_x, top_table_y,
+                                       WHITE, BLACK, piece_spacing, padding)
+        DrawUtils._draw_reserve_pieces(game, screen, game.player2_reserve,
+                                       reserve_start_x, bottom_table_y,
+                                       BLACK, WHITE, piece_spacing, padding)
+
+    @staticmethod
+    def _draw_reserve_pieces(game, screen, reserve, reserve_start_x, y_offset,
+                             piece_color, contrast_color, piece_spacing, padding):
+        """Draw pieces in the reserve area with scaled dimensions"""
+        max_pieces_per_row = 4
+        current_y = y_offset + padding
+
+        for section in reserve:
+            num_pieces = len(section)
+            rows_needed = (num_pieces + max_pieces_per_row - 1) // max_pieces_per_row
+
+            for piece_idx, piece_type in enumerate(section):
+                row = piece_idx // max_pieces_per_row
+                col = piece_idx % max_pieces_per_row
+
+                # Calculate piece position
+                x = reserve_start_x + (col * piece_spacing) + padding
+                y = current_y + (row * piece_spacing)
+                center_x = int(x + piece_spacing / 2)
+                center_y = int(y + piece_spacing / 2)
+
+                # Scale piece sizes - made pieces larger
+                piece_radius = int(piece_spacing * 0.45)  # Increased from 0.35 to 0.45
+                inner_radius = int(piece_spacing * 0.22)  # Increased from 0.15 to 0.22
+                square_size = int(piece_spacing * 0.45)  # Increased from 0.35 to 0.45
+
+                # Draw main piece circle
+                pygame.draw.circle(screen, piece_color,
+                                   (center_x, center_y),
+                                   piece_radius)
+
+                # Draw piece type indicators
+                if piece_type == "Advisor":
+                    pygame.draw.circle(screen, contrast_color,
+                                       (center_x, center_y),
+                                       inner_radius)
+                elif piece_type == "Palace":
+                    pygame.draw.rect(screen, PURPLE,
+                                     (center_x - square_size // 2,
+                                      center_y - square_size // 2,
+                                      square_size, square_size))
+
+            # Update y position for next section
+            current_y += rows_needed * piece_spacing + padding
+
+    @staticmethod
+    def _draw_game_info(game, screen):
+        """Draw game information including current player"""
+        display_name = "White" if game.current_player == PLAYER_1 else "Black"
+
+        text = render_text(get_font(GENERAL_FONT, 36), f"Player to move: {display_name}", WHITE)
+        screen.blit(text, (10, 10))
+
+    @staticmethod
+    def _draw_selected_reserve_piece(game, screen):
+        """Draw highlight for selected reserve piece using scaled dimensions"""
+        reserve_width = int(WINDOW_WIDTH * 0.15)
+        piece_spacing = int(reserve_width * 0.22)
+        padding = int(piece_spacing * 0.15)
+
+        # Calculate table size and positions
+        table_size = max(reserve_width, int(WINDOW_HEIGHT * 0.25))
+        reserve_start_x = GRID_OFFSET + (BOARD_SIZE * CELL_SIZE) + int(WINDOW_WIDTH * 0.02)
+        top_table_y = GRID_OFFSET
+        bottom_table_y = GRID_OFFSET + (BOARD_SIZE * CELL_SIZE) - table_size
+
+        # Determine base y_offset based on player
+        y_offset = top_table_y if game.selected_reserve_piece['player'] == PLAYER_1 else bottom_table_y
+        current_y = y_offset + padding
+
+        # Calculate section offset
+        for section_idx in range(game.selected_reserve_piece['section']):
+            section = (game.player1_reserve if game.selected_reserve_piece['player'] == PLAYER_1
+                       else game.player2_reserve)[section_idx]
+            rows_needed = (len(section) + 3) // 4
+            current_y += rows_needed * piece_spacing + padding
+
+        # Calculate piece center position
+        row = game.selected_reserve_piece['row']
+        col = game.selected_reserve_piece['col']
+
+        piece_x = reserve_start_x + (col * piece_spacing) + padding
+        piece_y = current_y + (row * piece_spacing)
+
+        # Draw highlight rect centered on the piece with proper spacing
+        highlight_rect = pygame.Rect(
+            piece_x - padding // 2,
+            piece_y - padding // 2,
+            piece_spacing + padding,
+            piece_spacing + padding
+        )
+
+        pygame.draw.rect(screen, RED, highlight_rect, 2)
@@ -0,0 +1,757 @@
+"""Headless rules engine for Seiji.
+
+Everything in here is pygame-free so the rules can run on the server or in
+bulk analysis. The board is a flat list of 81 squares (index = row * 9 + col)
+backed by one occupancy bitboard per player, and all geometry (rays,
+neighbours, palace areas) is precomputed once at import time.
+"""
+import random
+from collections import namedtuple
+
+from constants import (BOARD_SIZE, PALACE_AREA, EMPTY, PLAYER_1, PLAYER_2,
+                       ADVISOR_NUMBER, OFFICIAL_NUMBER, PALACE_NUMBER)
+from piece import Piece
+
+NUM_SQUARES = BOARD_SIZE * BOARD_SIZE
+CENTER = (BOARD_SIZE // 2) * BOARD_SIZE + BOARD_SIZE // 2
+
+# Shared direction tables - pieces point at these instead of owning a list
+ORTHOGONAL = ((1, 0), (0, 1), (-1, 0), (0, -1))
+DIAGONAL = ((1, 1), (1, -1), (-1, -1), (-1, 1))
+ALL_DIRECTIONS = DIAGONAL + ORTHOGONAL
+NO_DIRECTIONS = ()
+
+# Reserve layout: section index for each piece type
+RESERVE_SECTIONS = {"Advisor": 0, "Official": 1, "Palace": 2}
+
+# Friendly-neighbour kinds packed into a small bitmask
+KIND_BITS = {"Monarch": 1, "Advisor": 2, "Official": 4, "Palace": 8}
+MONARCH_BIT, ADVISOR_BIT, OFFICIAL_BIT, PALACE_BIT = 1, 2, 4, 8
+
+# (directions, move_distance, promoted) for every piece status
+BASE_STATS = {
+    "Official": (ORTHOGONAL, 1, False),
+    "Advisor": (DIAGONAL, 3, False),
+    "Monarch": (ALL_DIRECTIONS, 1, False),
+    "Palace": (NO_DIRECTIONS, 0, False),
+}
+OFFICIAL_WITH_MONARCH = (ALL_DIRECTIONS, 1, True)
+OFFICIAL_WITH_ADVISOR = (ORTHOGONAL, 2, True)
+ADVISOR_WITH_MONARCH = (ALL_DIRECTIONS, 2, True)
+MONARCH_PROMOTED = (ALL_DIRECTIONS, 2, True)
+
+
+def piece_status(name, adjacent_mask):
+    """Return (directions, move_distance, promoted) for a piece given its friendly neighbours."""
+    if name == "Official":
+        if adjacent_mask & MONARCH_BIT:
+            return OFFICIAL_WITH_MONARCH
+        if adjacent_mask & ADVISOR_BIT:
+            return OFFICIAL_WITH_ADVISOR
+    elif name == "Advisor":
+        if adjacent_mask & MONARCH_BIT:
+            return ADVISOR_WITH_MONARCH
+    elif name == "Monarch":
+        if adjacent_mask & ~PALACE_BIT:
+            return MONARCH_PROMOTED
+    return BASE_STATS[name]
+
+
+# STATUS_TABLE[name][mask] -> piece_status(name, mask)
+STATUS_TABLE = {name: tuple(piece_status(name, mask) for mask in range(16)) for name in BASE_STATS}
+
+
+def _in_bounds(row, col):
+    return 0 <= row < BOARD_SIZE and 0 <= col < BOARD_SIZE
+
+
+def _build_geometry():
+    coords = tuple((index // BOARD_SIZE, index % BOARD_SIZE) for index in range(NUM_SQUARES))
+    rays = []
+    neighbours = []
+    palace_masks = []
+    half_area = PALACE_AREA // 2
+
+    for row, col in coords:
+        # square_rays[direction][distance] -> bitboard of the first `distance` squares of the ray
+        square_rays = {}
+        for dx, dy in ALL_DIRECTIONS:
+            prefixes = [0]
+            r, c = row + dx, col + dy
+            while _in_bounds(r, c):
+                prefixes.append(prefixes[-1] | 1 << (r * BOARD_SIZE + c))
+                r, c = r + dx, c + dy
+            prefixes.extend([prefixes[-1]] * (BOARD_SIZE + 1 - len(prefixes)))
+            square_rays[(dx, dy)] = tuple(prefixes)
+        rays.append(square_rays)
+
+        neighbours.append(tuple((row + dx) * BOARD_SIZE + col + dy
+                                for dx, dy in ORTHOGONAL if _in_bounds(row + dx, col + dy)))
+
+        mask = 0
+        for i in range(max(0, row - half_area), min(BOARD_SIZE, row + half_area + 1)):
+            for j in range(max(0, col - half_area), min(BOARD_SIZE, col + half_area + 1)):
+                mask |= 1 << (i * BOARD_SIZE + j)
+        palace_masks.append(mask)
+
+    return coords, tuple(rays), tuple(neighbours), tuple(palace_masks)
+
+
+COORDS, RAYS, NEIGHBOURS, PALACE_MASKS = _build_geometry()
+BITS = tuple(1 << index for index in range(NUM_SQUARES))
+FULL_BOARD = (1 << NUM_SQUARES) - 1
+NEIGHBOUR_MASKS = tuple(sum(BITS[neighbour] for neighbour in neighbours) for neighbours in NEIGHBOURS)
+FIRST_COLUMN = sum(BITS[row * BOARD_SIZE] for row in range(BOARD_SIZE))
+LAST_COLUMN = FIRST_COLUMN << (BOARD_SIZE - 1)
+ROW_MASK = (1 << BOARD_SIZE) - 1
+# ROW_SQUARES[row][bits] -> the (row, col) squares set in one row's worth of a bitboard
+ROW_SQUARES = tuple(tuple(tuple((row, col) for col in range(BOARD_SIZE) if bits >> col & 1)
+                          for bits in range(1 << BOARD_SIZE))
+                    for row in range(BOARD_SIZE))
+
+# Zobrist keys for position hashing (fixed seed so keys are stable between runs)
+_zobrist_rng = random.Random(0x5E1)
+PIECE_KEYS = {(name, player): tuple(_zobrist_rng.getrandbits(64) for _ in range(NUM_SQUARES))
+              for name in BASE_STATS for player in (PLAYER_1, PLAYER_2)}
+MAX_RESERVE = 2 * (ADVISOR_NUMBER + OFFICIAL_NUMBER + PALACE_NUMBER)
+RESERVE_KEYS = {player: tuple(tuple(_zobrist_rng.getrandbits(64) for _ in range(MAX_RESERVE + 1))
+                              for _ in RESERVE_SECTIONS)
+                for player in (PLAYER_1, PLAYER_2)}
+SIDE_KEY = _zobrist_rng.getrandbits(64)
+PHASE_KEY = _zobrist_rng.getrandbits(64)
+
+# Action tuples used by legal_actions/apply_action: (kind, source, target index)
+# where source is a square index for moves and a piece type for drops
+MOVE = "move"
+PLACE = "place"
+MONARCH = "monarch"
+
+# Every move and drop action, built once so legal_actions can hand out shared tuples
+MOVE_ACTIONS = tuple(tuple((MOVE, source, target) for target in range(NUM_SQUARES))
+                     for source in range(NUM_SQUARES))
+PLACE_ACTIONS = {piece_type: tuple((PLACE, piece_type, target) for target in range(NUM_SQUARES))
+                 for piece_type in RESERVE_SECTIONS}
+
+_REACH = {}
+_SHADOWS = {}
+_MOVE_SPECS = {}
+_MASK_SQUARES = {}
+_MASK_SQUARE_SETS = {}
+MAX_MASK_SQUARES = 1 << 16  # Square caches are dropped and rebuilt past this many masks
+
+
+def reach_table(directions, distance):
+    """Per-square bitboard of everything a piece could reach on an empty board"""
+    key = (directions, distance)
+    table = _REACH.get(key)
+    if table is None:
+        table = tuple(_union(rays[direction][distance] for direction in directions) for rays in RAYS)
+        _REACH[key] = table
+    return table
+
+
+def shadow_table(directions, distance):
+    """Per-square dict of blockers -> the squares they hide from a piece on that square.
+
+    Only blockers short of the end of a ray can hide anything, so the keys are
+    every subset of reach_table(directions, distance - 1) for the square - at
+    most 256 for the pieces in this game, which makes it cheap to build the
+    whole table up front instead of walking rays during move generation.
+    """
+    key = (directions, distance)
+    table = _SHADOWS.get(key)
+    if table is None:
+        table = []
+        for rays in RAYS:
+            shadows = {0: 0}
+            for direction in directions:
+                ray = rays[direction]
+                for step in range(1, distance):
+                    blocker = ray[step] ^ ray[step - 1]
+                    if not blocker:
+                        break
+                    hidden = ray[distance] & ~ray[step]
+                    shadows.update([(blockers | blocker, shadow | hidden) for blockers, shadow in shadows.items()])
+            table.append(shadows)
+        table = _SHADOWS[key] = tuple(table)
+    return table
+
+
+class MoveSpec(namedtuple("MoveSpec", "squares captures")):
+    """Precomputed movement for one piece status.
+
+    squares[index] is (reach, inner, shadows) for a piece on index: every
+    square it could reach on an empty board, the part of that reach where a
+    blocker hides the squares behind it, and a dict of blockers found there ->
+    the squares they hide. Single steppers have no inner squares. Unpromoted
+    advisors can't capture.
+    """
+    __slots__ = ()
+
+
+def move_spec(directions, distance, captures):
+    key = (directions, distance, captures)
+    spec = _MOVE_SPECS.get(key)
+    if spec is None:
+        reach = reach_table(directions, distance)
+        if distance > 1:
+            squares = zip(reach, reach_table(directions, distance - 1), shadow_table(directions, distance))
+        else:
+            squares = ((square_reach, 0, None) for square_reach in reach)
+        spec = MoveSpec(tuple(squares), captures)
+        _MOVE_SPECS[key] = spec
+    return spec
+
+
+def new_piece(name, owner):
+    """A freshly dropped piece in its base status"""
+    directions, distance, promoted = BASE_STATS[name]
+    piece = Piece(name, directions, distance, owner, promoted)
+    piece.moves = STATUS_MOVES[name][0]
+    return piece
+
+
+def piece_moves(piece):
+    """The MoveSpec for a piece's current stats, remembered on the piece"""
+    moves = piece.moves
+    if moves is None:
+        moves = piece.moves = move_spec(tuple(map(tuple, piece.directions)), piece.move_distance,
+                                        piece.name != "Advisor" or piece.promoted)
+    return moves
+
+
+def _union(masks):
+    result = 0
+    for mask in masks:
+        result |= mask
+    return result
+
+
+# STATUS_MOVES[name][mask] -> MoveSpec for STATUS_TABLE[name][mask]
+STATUS_MOVES = {name: tuple(move_spec(directions, distance, name != "Advisor" or promoted)
+                            for directions, distance, promoted in statuses)
+                for name, statuses in STATUS_TABLE.items()}
+
+
+def to_index(row, col):
+    return row * BOARD_SIZE + col
+
+
+def around(mask):
+    """The squares in mask plus every square orthogonally next to one of them"""
+    return (mask | mask << BOARD_SIZE | mask >> BOARD_SIZE
+            | (mask & ~LAST_COLUMN) << 1 | (mask & ~FIRST_COLUMN) >> 1) & FULL_BOARD
+
+
+def iter_bits(mask):
+    """Yield the square index of every set bit in a bitboard."""
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+def mask_squares(mask):
+    """The (row, col) squares of a bitboard in index order, shared between every mask seen before"""
+    squares = _MASK_SQUARES.get(mask)
+    if squares is None:
+        if len(_MASK_SQUARES) >= MAX_MASK_SQUARES:
+            _MASK_SQUARES.clear()
+        squares = ()
+        bits, row = mask, 0
+        while bits:
+            if bits & ROW_MASK:
+                squares += ROW_SQUARES[row][bits & ROW_MASK]
+            bits >>= BOARD_SIZE
+            row += 1
+        _MASK_SQUARES[mask] = squares
+    return squares
+
+
+def mask_square_set(mask):
+    """The (row, col) squares of a bitboard as a frozenset, shared like mask_squares"""
+    squares = _MASK_SQUARE_SETS.get(mask)
+    if squares is None:
+        if len(_MASK_SQUARE_SETS) >= MAX_MASK_SQUARES:
+            _MASK_SQUARE_SETS.clear()
+        squares = _MASK_SQUARE_SETS[mask] = frozenset(mask_squares(mask))
+    return squares
+
+
+def new_reserve():
+    return [
+        ["Advisor"] * ADVISOR_NUMBER,
+        ["Official"] * OFFICIAL_NUMBER,
+        ["Palace"] * PALACE_NUMBER
+    ]
+
+
+def opponent(player):
+    return PLAYER_1 if player == PLAYER_2 else PLAYER_2
+
+
+class BoardRow:
+    """Read-only row view so callers can keep using board[row][col]."""
+    __slots__ = ("_cells", "_offset")
+
+    def __init__(self, cells, offset):
+        self._cells = cells
+        self._offset = offset
+
+    def __getitem__(self, col):
+        if not 0 <= col < BOARD_SIZE:
+            raise IndexError(col)
+        return self._cells[self._offset + col]
+
+    def __len__(self):
+        return BOARD_SIZE
+
+    def __iter__(self):
+        return iter(self._cells[self._offset:self._offset + BOARD_SIZE])
+
+
+class GameEngine:
+    def __init__(self):
+        self.cells = [EMPTY] * NUM_SQUARES
+        self.rows = tuple(BoardRow(self.cells, row * BOARD_SIZE) for row in range(BOARD_SIZE))
+        self._move_cache = {}
+        self._footprint_cache = {}  # Square plus reach of every cached move set
+        self.reset()
+
+    def reset(self):
+        """Reset to an empty board with full reserves"""
+        self.cells[:] = [EMPTY] * NUM_SQUARES
+        self.occupancy = {PLAYER_1: 0, PLAYER_2: 0}
+        self.current_player = PLAYER_1
+        self.kings_placed = {PLAYER_1: False, PLAYER_2: False}
+        self.monarch_placement_phase = True
+        self.game_over = False
+        self.winner = None
+        self.player1_reserve = new_reserve()
+        self.player2_reserve = new_reserve()
+        self.promoted = []  # Indices newly promoted by the last action
+        self.version = 0
+        self._invalidate()
+        self.rehash()
+
+    # --- Board access ---
+
+    @property
+    def board(self):
+        return self.rows
+
+    @board.setter
+    def board(self, board):
+        self.load_board(board)
+
+    def load_board(self, board):
+        """Replace the position with a 9x9 grid of Piece/EMPTY (e.g. from the network)"""
+        self.occupancy = {PLAYER_1: 0, PLAYER_2: 0}
+        for row in range(BOARD_SIZE):
+            for col in range(BOARD_SIZE):
+                index = row * BOARD_SIZE + col
+                piece = board[row][col]
+                self.cells[index] = piece
+                if piece != EMPTY:
+                    self.occupancy[piece.owner] |= BITS[index]
+
+        # Re-derive stats so every piece points at the shared direction tables
+        self._update_promotions(FULL_BOARD)
+        self._invalidate()
+        self.rehash()
+
+    def reserve_for(self, player):
+        return self.player1_reserve if player == PLAYER_1 else self.player2_reserve
+
+    def find_monarch(self, player):
+        """Square index of player's monarch, or None if it is not on the board"""
+        for index in iter_bits(self.occupancy[player]):
+            if self.cells[index].name == "Monarch":
+                return index
+        return None
+
+    def _invalidate(self, changed_mask=None, restyled_mask=0):
+        """Drop cached moves that the last change could affect (everything if changed_mask is None)"""
+        self.version += 1
+        self._placement_cache = {}
+
+        old_moves = self._move_cache
+        if changed_mask is None:
+            self._move_cache = {}
+            self._footprint_cache = {}
+            return
+
+        # A cached move set only depends on its own piece and the squares it can reach.
+        # Surviving entries go into fresh dicts so snapshots keep the old ones intact.
+        self._footprint_cache = footprints = {index: footprint
+                                              for index, footprint in self._footprint_cache.items()
+                                              if not footprint & changed_mask}
+        while restyled_mask:
+            bit = restyled_mask & -restyled_mask
+            restyled_mask ^= bit
+            footprints.pop(bit.bit_length() - 1, None)
+        self._move_cache = {index: old_moves[index] for index in footprints}
+
+    def _set(self, index, piece):
+        self.cells[index] = piece
+        self.occupancy[piece.owner] |= BITS[index]
+        self.key ^= PIECE_KEYS[(piece.name, piece.owner)][index]
+
+    def _clear(self, index):
+        piece = self.cells[index]
+        if piece != EMPTY:
+            self.occupancy[piece.owner] &= ~BITS[index]
+            self.cells[index] = EMPTY
+            self.key ^= PIECE_KEYS[(piece.name, piece.owner)][index]
+        return piece
+
+    def _take_from_reserve(self, player, section):
+        reserve = self.reserve_for(player)[section]
+        keys = RESERVE_KEYS[player][section]
+        self.key ^= keys[len(reserve)] ^ keys[len(reserve) - 1]
+        reserve.pop()
+
+    def _add_to_reserve(self, player, name):
+        section = RESERVE_SECTIONS[name]
+        reserve = self.reserve_for(player)[section]
+        keys = RESERVE_KEYS[player][section]
+        self.key ^= keys[len(reserve)] ^ keys[len(reserve) + 1]
+        reserve.append(name)
+
+    # --- Hashing and snapshots (used by search) ---
+
+    def rehash(self):
+        """Recompute the Zobrist key from scratch.
+
+        Engine actions keep it up to date; call this after assigning state directly.
+        """
+        key = 0
+        for player in (PLAYER_1, PLAYER_2):
+            for index in iter_bits(self.occupancy[player]):
+                key ^= PIECE_KEYS[(self.cells[index].name, player)][index]
+            for section, pieces in enumerate(self.reserve_for(player)):
+                key ^= RESERVE_KEYS[player][section][len(pieces)]
+        if self.current_player == PLAYER_2:
+            key ^= SIDE_KEY
+        if self.monarch_placement_phase:
+            key ^= PHASE_KEY
+        self.key = key
+        return key
+
+    def snapshot(self):
+        """Capture the full position so it can be restored after trying actions"""
+        return (self.cells[:], self.occupancy[PLAYER_1], self.occupancy[PLAYER_2],
+                self.current_player, self.kings_placed[PLAYER_1], self.kings_placed[PLAYER_2],
+                self.monarch_placement_phase, self.game_over, self.winner,
+                tuple(len(section) for section in self.player1_reserve),
+                tuple(len(section) for section in self.player2_reserve),
+                self.key, self._move_cache, self._footprint_cache, self._placement_cache)
+
+    def restore(self, state):
+        (cells, occupancy_1, occupancy_2, self.current_player, king_1, king_2,
+         self.monarch_placement_phase, self.game_over, self.winner, reserve_1, reserve_2,
+         self.key, self._move_cache, self._footprint_cache, self._placement_cache) = state
+
+        # Pieces are never mutated (promotions swap in new objects), so sharing them is safe
+        self.cells[:] = cells
+        self.occupancy = {PLAYER_1: occupancy_1, PLAYER_2: occupancy_2}
+        self.kings_placed = {PLAYER_1: king_1, PLAYER_2: king_2}
+        self.player1_reserve = [[name] * count for name, count in zip(RESERVE_SECTIONS, reserve_1)]
+        self.player2_reserve = [[name] * count for name, count in zip(RESERVE_SECTIONS, reserve_2)]
+        self.promoted = []
+        self.version += 1
+
+    def copy(self):
+        """Independent engine at the same position (e.g. for a search thread)"""
+        clone = GameEngine()
+        clone.restore(self.snapshot())
+        clone._invalidate()
+        clone.rehash()
+        return clone
+
+    # --- Promotions ---
+
+    def adjacent_mask(self, index):
+        """Bitmask of the kinds of friendly pieces orthogonally adjacent to a square"""
+        cells = self.cells
+        owner = cells[index].owner
+        mask = 0
+        for neighbour in NEIGHBOURS[index]:
+            other = cells[neighbour]
+            if other != EMPTY and other.owner == owner:
+                mask |= KIND_BITS[other.name]
+        return mask
+
+    def has_friendly_adjacent_pieces(self, row, col):
+        """Return a set of names of friendly pieces adjacent to the given position."""
+        index = to_index(row, col)
+        if self.cells[index] == EMPTY:
+            return set()
+        mask = self.adjacent_mask(index)
+        return {name for name, bit in KIND_BITS.items() if mask & bit}
+
+    def _update_promotions(self, changed_mask):
+        """Re-evaluate pieces on and next to the changed squares.
+
+        Returns the newly promoted indices and a bitboard of pieces whose movement changed.
+        """
+        cells = self.cells
+        occupancy = self.occupancy
+        promoted = []
+        restyled_mask = 0
+        dirty = around(changed_mask) & (occupancy[PLAYER_1] | occupancy[PLAYER_2])
+        while dirty:
+            bit = dirty & -dirty
+            dirty ^= bit
+            index = bit.bit_length() - 1
+            piece = cells[index]
+            name = piece.name
+
+            adjacent = 0
+            friends = NEIGHBOUR_MASKS[index] & occupancy[piece.owner]
+            while friends:
+                low = friends & -friends
+                friends ^= low
+                adjacent |= KIND_BITS[cells[low.bit_length() - 1].name]
+
+            moves = STATUS_MOVES[name][adjacent]
+            if piece.moves is not moves:
+                directions, distance, should_promote = STATUS_TABLE[name][adjacent]
+                if should_promote and not piece.promoted:
+                    promoted.append(index)
+                # Swap in a new piece rather than mutating, so snapshots can share pieces
+                piece = cells[index] = Piece(name, directions, distance, piece.owner, should_promote)
+                piece.moves = moves
+                restyled_mask |= bit
+        return promoted, restyled_mask
+
+    def check_board_promotions(self):
+        """Re-evaluate every piece on the board"""
+        self.promoted, _ = self._update_promotions(FULL_BOARD)
+        self._invalidate()
+        return self.promoted
+
+    # --- Move generation (cached until the position changes) ---
+
+    def movement_mask(self, index):
+        """Bitboard of squares the piece on index can move to or capture on"""
+        cached = self._move_cache.get(index)
+        if cached is not None:
+            return cached
+
+        piece = self.cells[index]
+        if piece == EMPTY:
+            return 0
+        # Same as one step of generate_moves, so asking about a single piece does not pay for the whole side
+        own = self.occupancy[piece.owner]
+        occupied = own | self.occupancy[opponent(piece.owner)]
+        squares, captures = piece.moves or piece_moves(piece)
+        reach, inner, shadows = squares[index]
+        mask = reach & ~own if captures else reach & ~occupied
+        if inner & occupied:
+            mask &= ~shadows[inner & occupied]
+        self._move_cache[index] = mask
+        self._footprint_cache[index] = reach | BITS[index]
+        return mask
+
+    def generate_moves(self, player):
+        """Fill the move and placement caches for every piece player has on the board, in one pass"""
+        cells = self.cells
+        move_cache = self._move_cache
+        footprints = self._footprint_cache
+        own = self.occupancy[player]
+        enemy = self.occupancy[PLAYER_2 if player == PLAYER_1 else PLAYER_1]
+        occupied = own | enemy
+        free = ~occupied
+        not_own = ~own
+
+        drops = 0
+        pieces = own
+        while pieces:
+            low = pieces & -pieces
+            pieces ^= low
+            index = low.bit_length() - 1
+            mask = move_cache.get(index)
+            if mask is None:
+                piece = cells[index]
+                squares, captures = piece.moves or piece_moves(piece)
+                reach, inner, shadows = squares[index]
+                mask = reach & not_own if captures else reach & free
+                if inner & occupied:
+                    mask &= ~shadows[inner & occupied]
+                move_cache[index] = mask
+                footprints[index] = reach | low
+                if not reach:
+                    mask = PALACE_MASKS[index]
+            elif footprints[index] == low:
+                # Palaces reach nothing but open up the area around them for drops
+                mask = PALACE_MASKS[index]
+            drops |= mask
+        self._placement_cache[player] = drops & free
+
+    def movement_targets(self, index):
+        """Square indices the piece on index can move to or capture on"""
+        return tuple(iter_bits(self.movement_mask(index)))
+
+    def get_valid_movement_squares(self, row, col):
+        """Get valid (row, col) moves for the piece on the given square."""
+        index = row * BOARD_SIZE + col
+        mask = self._move_cache.get(index)
+        return mask_squares(self.movement_mask(index) if mask is None else mask)
+
+    def placement_mask(self, player=None):
+        """Bitboard of empty squares where player may drop a reserve piece"""
+        if player is None:
+            player = self.current_player
+        cached = self._placement_cache.get(player)
+        if cached is not None:
+            return cached
+
+        self.generate_moves(player)
+        return self._placement_cache[player]
+
+    def get_valid_placement_squares(self, player=None):
+        """Get the set of empty (row, col) squares where player may place a reserve piece."""
+        if player is None:
+            player = self.current_player
+        mask = self._placement_cache.get(player)
+        return mask_square_set(self.placement_mask(player) if mask is None else mask)
+
+    def is_legal_move(self, from_pos, to_pos):
+        from_index = to_index(*from_pos)
+        piece = self.cells[from_index]
+        if self.game_over or self.monarch_placement_phase or piece == EMPTY:
+            return False
+        if piece.owner != self.current_player:
+            return False
+        return bool(self.movement_mask(from_index) & BITS[to_index(*to_pos)])
+
+    # --- Actions ---
+
+    def is_king_placement_phase(self):
+        """Check if we're still in the king placement phase using kings_placed tracking"""
+        if all(self.kings_placed.values()) and self.monarch_placement_phase:
+            self.monarch_placement_phase = False
+            self.key ^= PHASE_KEY
+
+        return not all(self.kings_placed.values())
+
+    def legal_actions(self):
+        """Every legal action for the side to move, as (kind, source, target index) tuples"""
+        if self.game_over:
+            return []
+
+        player = self.current_player
+        free = FULL_BOARD & ~(self.occupancy[PLAYER_1] | self.occupancy[PLAYER_2])
+        if self.monarch_placement_phase:
+            if self.kings_placed[player]:
+                return []
+            return [(MONARCH, None, index) for index in iter_bits(free & ~BITS[CENTER])]
+
+        self.generate_moves(player)
+        move_cache = self._move_cache
+        actions = []
+        append = actions.append
+        for index in iter_bits(self.occupancy[player]):
+            moves = MOVE_ACTIONS[index]
+            mask = move_cache[index]
+            while mask:
+                low = mask & -mask
+                append(moves[low.bit_length() - 1])
+                mask ^= low
+
+        drops = self._placement_cache[player]
+        if drops:
+            targets = list(iter_bits(drops))
+            reserve = self.reserve_for(player)
+            for piece_type, section in RESERVE_SECTIONS.items():
+                if reserve[section]:
+                    places = PLACE_ACTIONS[piece_type]
+                    actions.extend([places[target] for target in targets])
+        return actions
+
+    def apply_action(self, action):
+        """Play an action from legal_actions. Moves return the captured piece (or EMPTY)."""
+        kind, source, target = action
+        if kind == MOVE:
+            return self._move(source, target)
+        if kind == PLACE:
+            return self._place(target, source)
+        return self._place_monarch(target)
+
+    def place_monarch(self, row, col):
+        """Place the current player's monarch, returning False if the square is not allowed"""
+        return self._place_monarch(to_index(row, col))
+
+    def _place_monarch(self, index):
+        if self.game_over or index == CENTER or self.cells[index] != EMPTY:
+            return False
+        if self.kings_placed[self.current_player]:
+            return False
+
+        self._set(index, new_piece("Monarch", self.current_player))
+        self.kings_placed[self.current_player] = True
+        self._finish_action(BITS[index])
+        return True
+
+    def place_piece(self, row, col, piece_type):
+        """Drop a reserve piece for the current player, returning False if not allowed"""
+        return self._place(to_index(row, col), piece_type)
+
+    def _place(self, index, piece_type):
+        reserve = self.reserve_for(self.current_player)
+        section = RESERVE_SECTIONS.get(piece_type)
+        if self.game_over or section is None or not reserve[section]:
+            return False
+        if not self.placement_mask() & BITS[index]:
+            return False
+
+        self._set(index, new_piece(piece_type, self.current_player))
+        self._take_from_reserve(self.current_player, section)
+        self._finish_action(BITS[index])
+        return True
+
+    def move_piece(self, from_pos, to_pos):
+        """Move a piece (assumed legal) and return whatever was captured, or EMPTY"""
+        return self._move(to_index(*from_pos), to_index(*to_pos))
+
+    def _move(self, source, destination):
+        piece = self._clear(source)
+        target = self._clear(destination)
+        enemy = opponent(piece.owner)
+
+        if target != EMPTY and target.owner == enemy:
+            if target.name == "Monarch":
+                self.kings_placed[enemy] = False
+            elif target.name != "Palace":
+                self._add_to_reserve(piece.owner, target.name)
+
+        self._set(destination, piece)
+        self._finish_action(BITS[source] | BITS[destination])
+        return target
+
+    def _finish_action(self, changed_mask):
+        self.promoted, restyled_mask = self._update_promotions(changed_mask)
+        self._invalidate(changed_mask, restyled_mask)
+        self.current_player = PLAYER_2 if self.current_player == PLAYER_1 else PLAYER_1
+        self.key ^= SIDE_KEY
+        if self.monarch_placement_phase:
+            self.is_king_placement_phase()
+        self.did_someone_win()
+
+    def resign(self, player=None):
+        """End the game in favour of player's opponent (the side to move by default)"""
+        if not self.game_over:
+            self.game_over = True
+            self.winner = opponent(self.current_player if player is None else player)
+
+    def did_someone_win(self):
+        if self.monarch_placement_phase:
+            return False
+
+        for player in (PLAYER_1, PLAYER_2):
+            if not self.kings_placed[player]:
+                self.game_over, self.winner = True, opponent(player)
+                return True
+
+        return False
@@ -0,0 +1,199 @@
+"""Compact append-only file format for recorded games (written by selfplay.py).
+
+A record file is a 9 byte header followed by games, back to back:
+    <8sB  magic, format version
+    <IHBB seed, number of plies, winner (0 for none), how the game ended
+followed by 4 bytes per ply:
+    <BBBB code, source, target, promotions
+
+The low two bits of code are the action kind (the same codes as the wire
+protocol) and the next three hold the code of the piece a move captured.
+Source and target are encoded as in protocol.encode_action; a resignation
+stores the resigning player as its source. Promotions packs how many pieces
+of each kind the ply promoted, two bits per kind.
+
+Games are only ever appended as whole records, so a file can be read while
+it is still being written; RecordReader memory-maps it and hands out plies as
+memoryviews without copying.
+"""
+import mmap
+import os
+import struct
+
+from constants import BOARD_SIZE, PLAYER_1, PLAYER_2
+from engine import MOVE, PLACE, MONARCH, to_index
+from protocol import ACTION_CODES, ACTION_KINDS, PIECE_CODES, PIECE_NAMES, NO_SQUARE
+
+RECORD_MAGIC = b"SEIJIREC"
+RECORD_VERSION = 1
+
+FILE_HEADER = struct.Struct("<8sB")
+GAME_HEADER = struct.Struct("<IHBB")  # seed, plies, winner, end reason
+PLY = struct.Struct("<BBBB")  # code, source, target, promotions
+MAX_SEED = 2 ** 32 - 1  # Largest seed and ply count the game header can hold
+MAX_PLIES = 2 ** 16 - 1
+
+# How a game ended
+MONARCH_CAPTURED = 0
+RESIGNED = 1  # Includes running out of legal actions
+PLY_LIMIT = 2
+END_REASONS = {MONARCH_CAPTURED: "monarch captured", RESIGNED: "resigned", PLY_LIMIT: "ply limit"}
+
+CAPTURE_SHIFT = 2
+MAX_PROMOTIONS = 3  # Per piece kind and ply; anything above is counted as 3
+
+
+def encode_ply(action, captured=None, promoted=()):
+    """Pack one ply: the action tuple, the captured piece's name and the names of promoted pieces"""
+    kind, source, target = action
+    if kind == PLACE:
+        source = PIECE_CODES[source]
+    elif kind == MONARCH:
+        source = 0
+
+    code = ACTION_CODES[kind]
+    if captured is not None:
+        code |= PIECE_CODES[captured] << CAPTURE_SHIFT
+
+    promotions = 0
+    for name in promoted:
+        shift = (PIECE_CODES[name] - 1) * 2
+        if (promotions >> shift) & MAX_PROMOTIONS < MAX_PROMOTIONS:
+            promotions += 1 << shift
+    return PLY.pack(code, source, NO_SQUARE if target is None else target, promotions)
+
+
+def decode_ply(code, source, target, promotions):
+    """The (action, captured name or None, {name: count}) stored in a ply"""
+    kind = ACTION_KINDS[code & 0x03]
+    if kind == PLACE:
+        source = PIECE_NAMES[source]
+    elif kind == MONARCH:
+        source = None
+    captured = PIECE_NAMES.get(code >> CAPTURE_SHIFT)
+    return (kind, source, None if target == NO_SQUARE else target), captured, promotion_counts(promotions)
+
+
+def promotion_counts(promotions):
+    """{piece name: count} from a ply's promotions byte"""
+    counts = {}
+    for name, piece_code in PIECE_CODES.items():
+        count = (promotions >> (piece_code - 1) * 2) & MAX_PROMOTIONS
+        if count:
+            counts[name] = count
+    return counts
+
+
+def encode_game(seed, winner, reason, plies):
+    """A whole game record; plies is the concatenated output of encode_ply"""
+    return GAME_HEADER.pack(seed, len(plies) // PLY.size, winner or 0, reason) + plies
+
+
+def parse_action(text, player=PLAYER_1):
+    """Read an action written like the game log: "monarch 5,1", "place Palace 5,2", "move 5,2 5,3".
+
+    Rows are mirrored for player 2, so one script works for either side.
+    """
+    def square(coords):
+        col, rank = (int(value) for value in coords.split(","))
+        row = BOARD_SIZE - rank
+        return to_index(BOARD_SIZE - 1 - row if player == PLAYER_2 else row, col - 1)
+
+    words = text.split()
+    if words[0] == "monarch" and len(words) == 2:
+        return (MONARCH, None, square(words[1]))
+    if words[0] == "place" and len(words) == 3 and words[1] in PIECE_CODES:
+        return (PLACE, words[1], square(words[2]))
+    if words[0] == "move" and len(words) == 3:
+        return (MOVE, square(words[1]), square(words[2]))
+    raise ValueError(f"Can't read action {text!r}")
+
+
+class RecordWriter:
+    """Appends encoded games to a record file, writing the header if the file is new"""
+
+    def __init__(self, path):
+        self.path = path
+        new = not os.path.exists(path) or os.path.getsize(path) == 0
+        if not new:
+            with open(path, "rb") as existing:
+                _check_header(existing.read(FILE_HEADER.size))
+        self.file = open(path, "ab")
+        if new:
+            self.file.write(FILE_HEADER.pack(RECORD_MAGIC, RECORD_VERSION))
+
+    def write(self, games):
+        """Append whole game records and flush them, so readers never see half a game"""
+        self.file.write(games)
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class RecordReader:
+    """Iterates the games in a record file through a read-only memory map"""
+
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, "rb")
+        size = os.fstat(self.file.fileno()).st_size
+        if size < FILE_HEADER.size:
+            self.file.close()
+            raise ValueError(f"{path} is not a game record file")
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.view = memoryview(self.map)
+        try:
+            _check_header(self.view[:FILE_HEADER.size])
+        except ValueError:
+            self.close()
+            raise
+
+    def __iter__(self):
+        """Yield (seed, winner, reason, plies); plies is a memoryview into the map, valid until close()"""
+        view = self.view
+        offset, end = FILE_HEADER.size, len(view)
+        while offset + GAME_HEADER.size <= end:
+            seed, count, winner, reason = GAME_HEADER.unpack_from(view, offset)
+            start = offset + GAME_HEADER.size
+            offset = start + count * PLY.size
+            if offset > end:
+                print(f"{self.path}: ignoring a truncated game at the end of the file")
+                return
+            yield seed, winner or None, reason, view[start:offset]
+
+    @staticmethod
+    def plies(plies):
+        """Decode a game's packed plies into (action, captured, promoted) tuples"""
+        for values in PLY.iter_unpack(plies):
+            yield decode_ply(*values)
+
+    def close(self):
+        self.view.release()
+        try:
+            self.map.close()
+        except BufferError:
+            pass  # Someone still holds a view of some plies; the map closes once it is dropped
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def _check_header(header):
+    if len(header) < FILE_HEADER.size:
+        raise ValueError("not a game record file")
+    magic, version = FILE_HEADER.unpack(header)
+    if magic != RECORD_MAGIC:
+        raise ValueError("not a game record file")
+    if version != RECORD_VERSION:
+        raise ValueError(f"unsupported game record version {version}")
@@ -0,0 +1,7 @@
+class GameState:
+    MENU = "menu"
+    PLAYING = "playing"
+    PLACEMENT = "placement"
+    MOVEMENT = "movement"
+    GAME_OVER = "game_over"
+    POST_GAME ="post_game"
\ No newline at end of file
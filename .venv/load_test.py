@@ -0,0 +1,204 @@
+"""Load generator for the game server.
+
+Opens N simulated matches (two connections each) against a server, plays
+real game actions back and forth, and reports moves/sec and relay latency.
+With --spectators, every match also gets that many watchers, and the report
+covers how quickly the fan-out reaches them.
+
+    python server.py --quiet &
+    python load_test.py --matches 1000 --moves 40
+    python load_test.py --matches 10 --spectators 300
+"""
+import argparse
+import asyncio
+import random
+import secrets
+import time
+
+from engine import GameEngine
+from protocol import (FrameDecoder, decode_frame, frame_seq, encode_join, encode_watch, encode_action,
+                      encode_snapshot, JOINED, MOVE, PING, ERROR, PONG_FRAME, READ_SIZE, SNAPSHOT_INTERVAL)
+
+
+def build_payloads(count, seed=0):
+    """Frames for one random game, with snapshots where a client would send them"""
+    rng = random.Random(seed)
+    engine = GameEngine()
+    payloads = []
+    while len(payloads) < count:
+        actions = engine.legal_actions()
+        if engine.game_over or not actions:
+            break
+        action = rng.choice(actions)
+        engine.apply_action(action)
+        seq = len(payloads) + 1
+        data = encode_action(seq, action, engine)
+        if seq == 1 or seq % SNAPSHOT_INTERVAL == 0 or engine.game_over:
+            data += encode_snapshot(seq, engine)
+        payloads.append(data)
+    return payloads
+
+
+class Player:
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self.decoder = FrameDecoder()
+        self.pending = []
+
+    async def next_message(self, wanted):
+        """Read until a frame of the wanted type arrives, answering pings on the way"""
+        while True:
+            while self.pending:
+                kind, message = self.pending.pop(0)
+                if kind == wanted:
+                    return message
+            data = await self.reader.read(READ_SIZE)
+            if not data:
+                raise ConnectionError("server closed the connection")
+            self.decoder.feed(data)
+            for kind, frame in self.decoder.frames():
+                if kind == PING:
+                    self.writer.write(PONG_FRAME)
+                elif kind in (wanted, JOINED):
+                    self.pending.append((kind, decode_frame(frame)))
+
+    async def follow(self, sent_times, latencies):
+        """As a spectator, read until the server closes the room; returns the highest action seq seen"""
+        last_seq = 0
+        try:
+            while True:
+                data = await self.reader.read(READ_SIZE)
+                if not data:
+                    return last_seq
+                now = time.perf_counter()
+                self.decoder.feed(data)
+                for kind, frame in self.decoder.frames():
+                    if kind == PING:
+                        self.writer.write(PONG_FRAME)
+                    elif kind == MOVE:
+                        seq = frame_seq(frame)
+                        if seq > last_seq:
+                            # Frames repeated by a skip-ahead catch-up aren't counted twice
+                            last_seq = seq
+                            latencies.append(now - sent_times[seq])
+                    elif kind == ERROR:
+                        raise ConnectionError(decode_frame(frame)["reason"])
+        finally:
+            self.writer.close()
+
+
+async def connect(host, port, room, spectate=False):
+    reader, writer = await asyncio.open_connection(host, port)
+    player = Player(reader, writer)
+    writer.write(encode_watch(room) if spectate else encode_join(room))
+    await player.next_message(JOINED)
+    return player
+
+
+async def open_match(host, port, semaphore):
+    room = "LT" + secrets.token_hex(4).upper()
+    async with semaphore:
+        return room, [await connect(host, port, room), await connect(host, port, room)]
+
+
+async def open_spectator(host, port, room, semaphore):
+    async with semaphore:
+        return await connect(host, port, room, spectate=True)
+
+
+async def play_match(players, moves, payloads, latencies, sent_times):
+    try:
+        for move in range(moves):
+            sender, receiver = players[move % 2], players[1 - move % 2]
+            sent_at = sent_times[move % len(payloads) + 1] = time.perf_counter()
+            sender.writer.write(payloads[move % len(payloads)])
+            await sender.writer.drain()
+            await receiver.next_message(MOVE)
+            latencies.append(time.perf_counter() - sent_at)
+    finally:
+        for player in players:
+            player.writer.close()
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+
+async def run(args):
+    payloads = build_payloads(args.moves)
+    latencies = []
+
+    # Connect everything first so the measurement only covers play
+    print(f"Opening {args.matches} matches ({args.matches * 2} connections) to {args.host}:{args.port}")
+    semaphore = asyncio.Semaphore(args.connect_concurrency)
+    opened = await asyncio.gather(*(open_match(args.host, args.port, semaphore) for _ in range(args.matches)),
+                                  return_exceptions=True)
+    matches = [match for match in opened if not isinstance(match, Exception)]
+    failures = [result for result in opened if isinstance(result, Exception)]
+
+    # seq -> when a player sent it, per match
+    sent_times = [{} for _ in matches]
+    spectator_latencies = []
+    spectator_failures = []
+    followers = []
+    if args.spectators:
+        print(f"Opening {args.spectators} spectators per match ({args.spectators * len(matches)} connections)")
+        watchers = await asyncio.gather(*(open_spectator(args.host, args.port, room, semaphore)
+                                          for room, _ in matches for _ in range(args.spectators)),
+                                        return_exceptions=True)
+        for index, watcher in enumerate(watchers):
+            if isinstance(watcher, Exception):
+                spectator_failures.append(watcher)
+            else:
+                followers.append(asyncio.create_task(
+                    watcher.follow(sent_times[index // args.spectators], spectator_latencies)))
+
+    start = time.perf_counter()
+    results = await asyncio.gather(*(play_match(players, args.moves, payloads, latencies, times)
+                                     for (_, players), times in zip(matches, sent_times)),
+                                   return_exceptions=True)
+    elapsed = time.perf_counter() - start
+    # The server closes spectators once their match's players have left
+    followed = await asyncio.gather(*followers, return_exceptions=True)
+    spectator_failures += [result for result in followed if isinstance(result, Exception)]
+
+    failures += [result for result in results if isinstance(result, Exception)]
+    latencies.sort()
+    print(f"Matches: {args.matches - len(failures)} ok, {len(failures)} failed")
+    if failures:
+        print(f"First failure: {failures[0]!r}")
+    print(f"Payload: {sum(map(len, payloads)) // len(payloads)} bytes/move on average")
+    print(f"Moves relayed: {len(latencies)} in {elapsed:.2f}s = {len(latencies) / elapsed:.0f} moves/sec")
+    print(f"Relay latency: p50 {percentile(latencies, 0.50) * 1000:.2f} ms, "
+          f"p99 {percentile(latencies, 0.99) * 1000:.2f} ms, "
+          f"max {percentile(latencies, 1.0) * 1000:.2f} ms")
+    if followers:
+        complete = sum(1 for last_seq in followed if last_seq == len(payloads))
+        spectator_latencies.sort()
+        print(f"Spectators: {complete} of {len(followers)} saw the final move, "
+              f"{len(spectator_latencies)} action frames delivered")
+        print(f"Fan-out latency: p50 {percentile(spectator_latencies, 0.50) * 1000:.2f} ms, "
+              f"p99 {percentile(spectator_latencies, 0.99) * 1000:.2f} ms, "
+              f"max {percentile(spectator_latencies, 1.0) * 1000:.2f} ms")
+    if spectator_failures:
+        # Kept apart from the match count: a dropped watcher says nothing about the players' relay
+        print(f"Spectators failed: {len(spectator_failures)}, first: {spectator_failures[0]!r}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulate many matches against a game server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=5555)
+    parser.add_argument("--matches", type=int, default=100, help="Simultaneous matches")
+    parser.add_argument("--moves", type=int, default=40, help="Moves per match")
+    parser.add_argument("--spectators", type=int, default=0, help="Spectators watching each match")
+    parser.add_argument("--connect-concurrency", type=int, default=200,
+                        help="Matches allowed to be connecting at once")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
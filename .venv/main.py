@@ -0,0 +1,615 @@
+import time
+START_TIME = time.perf_counter()  # Startup timing counts from here, before the heavy imports
+
+import pygame
+from pygame import mixer
+from constants import WINDOW_WIDTH, WINDOW_HEIGHT, BOARD_SIZE, CELL_SIZE, GRID_OFFSET
+from game_state import GameState
+from UI import MenuScreen
+from draw_utils import DrawUtils
+from main_ultilities import MainUtilities
+from constants import *
+from network_manager import NetworkManager
+import argparse
+import queue
+import threading
+from engine import GameEngine, COORDS, MOVE, PLACE, MONARCH, opponent, to_index
+from protocol import RESIGN
+from ai import AIPlayer
+from UI import PostGameScreen
+from assets import assets, preload_entries, SoundAsset, ImageAsset
+from profiler import FrameProfiler
+
+pygame.init()
+
+
+class _EngineAttribute:
+    """Forward a Game attribute to its headless engine so existing callers keep working"""
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, game, owner=None):
+        if game is None:
+            return self
+        return getattr(game.engine, self.name)
+
+    def __set__(self, game, value):
+        setattr(game.engine, self.name, value)
+
+
+class Game:
+    # Rules state lives in the engine; Game only adds sounds, UI and networking
+    board = _EngineAttribute()
+    current_player = _EngineAttribute()
+    game_over = _EngineAttribute()
+    winner = _EngineAttribute()
+    monarch_placement_phase = _EngineAttribute()
+    kings_placed = _EngineAttribute()
+    player1_reserve = _EngineAttribute()
+    player2_reserve = _EngineAttribute()
+
+    # Sounds and textures load on first use, or earlier through the background preload
+    place_sound = SoundAsset("Sounds/place_sound.mp3")
+    slide_sound = SoundAsset("Sounds/slide_sound.mp3")
+    pick_up = SoundAsset("Sounds/pick_up.mp3")
+    capture = SoundAsset("Sounds/capture.mp3")
+    promote_sound = SoundAsset("Sounds/promote.mp3")
+    endgame = SoundAsset("Sounds/endgame.mp3", preload=False)  # Only needed once a game ends
+    select_piece = SoundAsset("Sounds/advisor.mp3")
+    de_select = SoundAsset("Sounds/de-select.mp3")
+    enemy_promote = SoundAsset("Sounds/enemy_promote.mp3")
+    enemy_select = SoundAsset("Sounds/enemy_select.mp3")
+
+    background = ImageAsset("Textures/background.png", (BOARD_SIZE * CELL_SIZE, BOARD_SIZE * CELL_SIZE))
+    background_2 = ImageAsset("Textures/background_2.png", (WINDOW_WIDTH, WINDOW_HEIGHT))
+    table_texture = ImageAsset("Textures/tables.png", alpha=True)
+
+    def __init__(self):
+        # Game State & Core Mechanics
+        self.engine = GameEngine()
+
+        # Last local action, sent to the opponent at the end of the move
+        self.last_action = None
+
+        # Multiplayer sound queues
+        self.placed_piece = False
+        self.moved_piece = False
+        self.captured_piece = False
+        self.promoted_piece = False
+
+        # Piece Selection & Movement
+        self.selected_piece = None
+        self.valid_moves = []
+        self.reserve_selected = False
+        self.selected_reserve_piece = None
+
+        # Networking
+        self.network_manager = NetworkManager()
+        self.multiplayer = False
+
+        # Computer opponent (AIPlayer) when playing "Against", otherwise None
+        self.ai = None
+
+        # UI Elements
+        self.mute_button_rect = pygame.Rect(10, WINDOW_HEIGHT - 70, 60, 60)
+        self.resign_button_rect = pygame.Rect(WINDOW_WIDTH - 120, 10, 100, 40)
+        self.resign_hover = False
+        self.is_muted = False
+
+        # Message Log
+        self.message_log = []
+        self.most_recent_message = None
+        self.max_messages = 10
+        self.log_font = pygame.font.Font(None, 24)
+        self.log_rect = pygame.Rect(
+            WINDOW_WIDTH - 300,
+            WINDOW_HEIGHT - 160,
+            280,
+            140)
+
+    def send_action(self, action):
+        if self.multiplayer:
+            self.network_manager.send_action(action, self.engine)
+
+    def reset_game(self):
+        """Reset the game state for a new game"""
+        if self.ai:
+            self.ai.cancel()
+        self.engine.reset()
+        self.network_manager.reset_sequence()
+        self.last_action = None
+        self.selected_piece = None
+        self.valid_moves = []
+        self.reserve_selected = False
+        self.selected_reserve_piece = None
+
+        # Clear message log
+        self.message_log = []
+        self.most_recent_message = None
+
+    def handle_resign(self, player=None, remote=False):
+        if not self.game_over:
+            # The resign button always belongs to the local player
+            if player is None:
+                if self.ai:
+                    player = opponent(self.ai.player)
+                elif self.multiplayer and self.network_manager.player:
+                    player = self.network_manager.player
+                else:
+                    player = self.current_player
+            self.engine.resign(player)
+            if not self.is_muted:
+                self.endgame.play()
+            self.add_to_log(f"Player {player} has resigned. Player {self.winner} wins!")
+            if not remote:
+                self.send_action((RESIGN, player, None))
+
+    def is_ai_turn(self):
+        return self.ai is not None and not self.game_over and self.current_player == self.ai.player
+
+    @property
+    def spectating(self):
+        """Watching an online match: the board follows the players and accepts no input"""
+        return self.multiplayer and self.network_manager.spectating
+
+    def is_remote_turn(self):
+        """True when it is the online opponent's move (our seat comes from the server)"""
+        seat = self.network_manager.player
+        return self.multiplayer and seat is not None and self.current_player != seat
+
+    def update_ai(self):
+        """Start the computer's search on its turn and play the move once it is ready"""
+        if not self.is_ai_turn():
+            return
+
+        if not self.ai.thinking:
+            self.ai.start_thinking(self.engine)
+            return
+
+        result = self.ai.poll()
+        if result is None:
+            return
+        if result.action is None:
+            self.handle_resign(self.ai.player)
+            return
+        self.play_action(result.action)
+
+    def play_action(self, action, remote=False):
+        """Play an action tuple with the same sounds and log as a click (remote ones aren't sent back)"""
+        kind, source, target = action
+        if kind == RESIGN:
+            self.handle_resign(source, remote)
+            return
+
+        self.placed_piece = False
+        self.moved_piece = False
+        self.captured_piece = False
+        self.promoted_piece = False
+        self.deselect()
+
+        row, col = COORDS[target]
+        if kind == MOVE:
+            self.move_piece(COORDS[source], (row, col))
+            self.slide_sound.play()
+        elif kind == PLACE:
+            self.placed_piece = self.place_new_piece(row, col, source)
+        else:
+            self.placed_piece = self.place_monarch(row, col)
+        self.end_of_move(remote)
+
+    def process_network_updates(self):
+        """Process any pending network updates"""
+        if self.multiplayer:
+            self.network_manager.process_network_updates(self)
+
+    def add_to_log(self, message):
+        """Add a new message to the game log"""
+        self.message_log.append(message)
+        self.most_recent_message = message
+        if len(self.message_log) > self.max_messages:
+            self.message_log.pop(0)  # Remove oldest message if we exceed max
+
+    def is_king_placement_phase(self):
+        """Check if we're still in the king placement phase using kings_placed tracking"""
+        return self.engine.is_king_placement_phase()
+
+    def place_monarch(self, row, col):
+        player = self.current_player
+        if not self.engine.place_monarch(row, col):
+            return False
+        self.last_action = (MONARCH, None, to_index(row, col))
+        self.place_sound.play()
+        self.add_to_log(f"Player {player} placed Monarch at {col + 1},{BOARD_SIZE - row}")
+        return True
+
+    def did_someone_win(self):
+        if not self.engine.did_someone_win():
+            return False
+
+        if not self.is_muted:
+            self.endgame.play()
+        return True
+
+    def get_valid_movement_squares(self, row, col):
+        """Get valid moves based on piece type."""
+        return self.engine.get_valid_movement_squares(row, col)
+
+    def get_valid_placement_squares(self):
+        return self.engine.get_valid_placement_squares()
+
+    def check_board_promotions(self):
+        """Check all pieces on the board for promotion/demotion"""
+        return self.engine.check_board_promotions()
+
+    def move_piece(self, from_pos, to_pos):
+        """Handle piece movement and capture logic"""
+        to_row, to_col = to_pos
+        piece = self.board[from_pos[0]][from_pos[1]]
+        player = piece.owner
+
+        target = self.engine.move_piece(from_pos, to_pos)
+        self.last_action = (MOVE, to_index(*from_pos), to_index(*to_pos))
+
+        # Handle capture
+        if target != EMPTY:
+            self.captured_piece = True
+            self.capture.play()
+            action = f"captured {target.name} at {to_col + 1},{BOARD_SIZE - to_row}"
+        else:
+            action = f"moved {piece.name} to: {to_col + 1},{BOARD_SIZE - to_row}"
+
+        self.moved_piece = True
+        self.add_to_log(f"Player {player} {action}")
+
+    def deselect(self):
+
+        if self.reserve_selected:
+            self.de_select.play()
+
+        self.selected_piece = None
+        self.selected_reserve_piece = None
+        self.reserve_selected = False
+        self.valid_moves = []
+
+    def place_new_piece(self, row, col, piece_type=None):
+        player = self.current_player
+        if piece_type is None:
+            piece_type = self.selected_reserve_piece['piece_type']
+
+        if not self.engine.place_piece(row, col, piece_type):
+            return False
+        self.last_action = (PLACE, piece_type, to_index(row, col))
+
+        self.reserve_selected = False
+        self.selected_piece = None
+        self.valid_moves = []
+
+        # Log and sound
+        self.add_to_log(f"Player {player} placed {piece_type} at: {col + 1},{BOARD_SIZE - row}")
+        self.place_sound.play()
+        self.deselect()
+
+        return True
+
+    def end_of_move(self, remote=False):
+        """Handle end of move state updates and checks"""
+        # Piece states are updated incrementally by the engine after every action
+        if self.engine.promoted:
+            self.promoted_piece = True
+            (self.enemy_promote if remote else self.promote_sound).play()
+
+        # Then check win conditions
+        if self.did_someone_win():
+            if not self.is_muted:
+                self.endgame.play()
+
+        # Always send the action last, and only once
+        if not remote and self.last_action is not None:
+            self.send_action(self.last_action)
+        self.last_action = None
+
+    def check_reserve_click(self, mouse_x, mouse_y):
+        """Check if a click occurred in the reserve area and process it"""
+        # Match calculations from _draw_piece_reserve
+        reserve_width = int(WINDOW_WIDTH * 0.15)
+        reserve_height = int(WINDOW_HEIGHT * 0.25)
+        table_size = max(reserve_width, reserve_height)
+
+        # Calculate board center position
+        reserve_start_x = GRID_OFFSET_X + BOARD_PIXELS + int(WINDOW_WIDTH * 0.02)
+
+        # Scale piece spacing relative to reserve size
+        piece_spacing = int(reserve_width * 0.22)  # Match the drawing code
+        padding = int(piece_spacing * 0.15)
+        max_pieces_per_row = 4
+
+        # Early exit if click is left of reserve area
+        if mouse_x < reserve_start_x:
+            return False
+
+        # Calculate table positions matching the draw code
+        top_table_y = GRID_OFFSET
+        bottom_table_y = GRID_OFFSET + (BOARD_SIZE * CELL_SIZE) - table_size
+
+        reserve_areas = {
+            PLAYER_1: (top_table_y, top_table_y + table_size, self.player1_reserve),
+            PLAYER_2: (bottom_table_y, bottom_table_y + table_size, self.player2_reserve)
+        }
+
+        def process_click(start_y, end_y, reserve):
+            if not (start_y <= mouse_y <= end_y):
+                return False
+
+            self.deselect()
+
+            # Calculate column based on click position
+            col = int((mouse_x - (reserve_start_x + padding)) // piece_spacing)
+            current_y = start_y + padding
+
+            for section_idx, section in enumerate(reserve):
+                num_pieces = len(section)
+                rows_needed = (num_pieces + max_pieces_per_row - 1) // max_pieces_per_row
+                section_height = rows_needed * piece_spacing + padding
+
+                if current_y <= mouse_y < current_y + section_height:
+                    row = int((mouse_y - current_y) // piece_spacing)
+                    piece_idx = row * max_pieces_per_row + col
+
+                    if 0 <= col < max_pieces_per_row and piece_idx < len(section):
+                        self.selected_reserve_piece = {
+                            'player': self.current_player,
+                            'section': section_idx,
+                            'piece_type': section[piece_idx],
+                            'row': row,
+                            'col': col
+                        }
+                        return True
+                current_y += section_height
+            return False
+
+        start_y, end_y, reserve = reserve_areas.get(self.current_player, (0, 0, []))
+        if process_click(start_y, end_y, reserve):
+            self.pick_up.play()
+            return True
+
+        self.selected_reserve_piece = None
+        return False
+    def handle_click(self, row, col):
+        try:
+            self.placed_piece = False
+            self.moved_piece = False
+            self.captured_piece = False
+            self.promoted_piece = False
+
+            if self.game_over or self.is_ai_turn() or self.is_remote_turn() or self.spectating:
+                return
+
+            if self.is_king_placement_phase():
+                # The engine rejects the center square and occupied squares
+                if self.place_monarch(row, col):
+                    self.placed_piece = True
+                    self.end_of_move()  # Only call when actually placing
+                return
+
+            piece = self.board[row][col]
+
+            # Handle movement if a piece is selected
+            if self.selected_piece:  # self.selected_piece is (row, col) tuple
+                old_row, old_col = self.selected_piece
+                selected_piece = self.board[old_row][old_col]  # Get the actual piece object
+
+                if (row, col) in self.valid_moves:
+                    # Check the actual piece's owner
+                    if selected_piece is not None and selected_piece.owner != self.current_player:
+                        return
+
+                    # The engine also hands the turn to the other player
+                    self.move_piece((old_row, old_col), (row, col))
+                    self.selected_piece, self.valid_moves = None, []
+
+                    self.moved_piece = True
+                    self.slide_sound.play()
+                    self.end_of_move()  # Call after successful move
+                else:
+                    self.deselect()
+                return  # Return after handling selected piece
+
+            # Select own piece
+            if piece != EMPTY:
+                self.deselect()
+
+                if piece.owner != self.current_player:
+                    self.enemy_select.play()
+                else:
+                    self.select_piece.play()
+
+                self.selected_piece = (row, col)  # Store coordinates, not the piece
+                self.valid_moves = self.get_valid_movement_squares(row, col)
+                return  # Early return after selecting
+
+            # Place new piece from reserve
+            if self.reserve_selected:
+                if self.place_new_piece(row, col):
+                    self.placed_piece = True
+                    self.end_of_move()  # Call after successful placement
+                else:
+                    self.deselect()
+
+        except Exception as e:
+            print(f"Error in handle_click: {e}")
+            self.end_of_move()  # Only call on error
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Play the board game")
+    parser.add_argument("--verbose", action="store_true", help="Print startup and asset loading timings")
+    args = parser.parse_args()
+
+    assets.start_time = START_TIME
+    assets.verbose = args.verbose
+    pygame.init()
+    mixer.init()
+
+    screen = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
+    pygame.display.set_caption("Board Game Prototype")
+
+    utils = MainUtilities()
+    game = Game()
+    current_state = GameState.MENU
+    menu = MenuScreen()
+    post_game_screen = PostGameScreen()
+    menu.ip_input = ""
+    clock = pygame.time.Clock()
+    profiler = FrameProfiler()
+
+    previous_state = None
+    first_frame = True
+
+    waiting_for_transition = False
+    transition_start_time = 0
+    TRANSITION_DELAY = 1000  # 1 second delay
+
+    while True:
+        dirty_rects = None  # Only the play screen tracks what changed; other screens flip everything
+
+        if current_state == GameState.MENU:
+            clock.tick(35)
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT:
+                    utils.handle_exit(screen)
+
+                if event.type == pygame.MOUSEBUTTONDOWN and not menu.show_ip_dialog:
+                    mouse_x, mouse_y = pygame.mouse.get_pos()
+                    action = menu.handle_click(mouse_x, mouse_y)
+
+                    if action in ("Alone", "Against"):
+                        utils.fade_to_black(screen)
+                        utils.handle_music_transition('Sounds/ambient_track.mp3')
+                        game.multiplayer = False
+                        game.ai = AIPlayer(PLAYER_2) if action == "Against" else None
+                        current_state = GameState.PLAYING
+                    elif action == "Amidst":
+                        menu.show_ip_dialog = True
+                        utils.play_sound('multiplayer_connect')
+                        menu.ip_input = ""
+                    elif action == "Abandon":
+                        utils.handle_exit(screen)
+
+                if menu.show_ip_dialog and event.type == pygame.KEYDOWN:
+                    if utils.handle_ip_input(event, menu):
+                        current_state = utils.handle_multiplayer_connection(game, menu, screen)
+
+            menu.draw(screen)
+
+        elif current_state == GameState.PLAYING:
+            # Frames where nothing changed cost next to nothing, so run at the display rate
+            clock.tick(PLAYING_FPS)
+            if profiler.enabled:
+                profiler.begin_frame(game.network_manager.update_queue.qsize())
+                if game.multiplayer:
+                    game.network_manager.measure_rtt()
+            if previous_state != GameState.PLAYING:
+                DrawUtils.invalidate()
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT:
+                    utils.handle_exit(screen)
+
+                if event.type == pygame.KEYDOWN:
+                    if event.key == pygame.K_F3:
+                        profiler.toggle()
+                    utils.handle_volume_control(game, event)
+
+                if event.type == pygame.MOUSEMOTION:
+                    mouse_x, mouse_y = pygame.mouse.get_pos()
+                    game.resign_hover = game.resign_button_rect.collidepoint(mouse_x, mouse_y)
+
+                if event.type == pygame.MOUSEBUTTONDOWN:
+                    mouse_x, mouse_y = pygame.mouse.get_pos()
+
+                    if game.mute_button_rect.collidepoint(mouse_x, mouse_y):
+                        game.is_muted = not game.is_muted
+                        mixer.music.set_volume(0 if game.is_muted else 1)
+                        continue
+
+                    if game.spectating:
+                        continue
+
+                    if game.resign_button_rect.collidepoint(mouse_x, mouse_y):
+                        game.handle_resign()
+                        waiting_for_transition = True
+                        transition_start_time = pygame.time.get_ticks()
+                        continue
+
+                    if game.check_reserve_click(mouse_x, mouse_y):
+                        game.reserve_selected = True
+                    else:
+                        col = (mouse_x - GRID_OFFSET) // CELL_SIZE
+                        row = (mouse_y - GRID_OFFSET) // CELL_SIZE
+
+                        if 0 <= row < BOARD_SIZE and 0 <= col < BOARD_SIZE:
+                            game.handle_click(row, col)
+                        else:
+                            game.deselect()
+
+            game.process_network_updates()
+            game.update_ai()
+
+            # Redraw only the parts of the game state that changed
+            overlay_area = DrawUtils.clear_profiler_overlay(screen)
+            dirty_rects = DrawUtils.draw(game, screen, profiler if profiler.enabled else None)
+            if overlay_area:
+                dirty_rects.append(overlay_area)
+            if profiler.enabled:
+                dirty_rects.append(DrawUtils.draw_profiler_overlay(screen, profiler, game.network_manager.rtt))
+
+            # Handle transition to post-game state
+            if game.game_over and not waiting_for_transition:
+                waiting_for_transition = True
+                transition_start_time = pygame.time.get_ticks()
+
+            # Check if we should transition after delay
+            if waiting_for_transition:
+                current_time = pygame.time.get_ticks()
+                if current_time - transition_start_time >= TRANSITION_DELAY:
+                    current_state = GameState.POST_GAME
+                    waiting_for_transition = False
+
+        elif current_state == GameState.POST_GAME:
+            clock.tick(35)
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT:
+                    utils.handle_exit(screen)
+
+                if event.type == pygame.MOUSEBUTTONDOWN:
+                    mouse_x, mouse_y = pygame.mouse.get_pos()
+                    action = post_game_screen.handle_click(mouse_x, mouse_y)
+
+                    if action == "Rematch":
+                        game.reset_game()
+                        current_state = GameState.PLAYING
+                    elif action == "Menu":
+                        game.reset_game()
+                        current_state = GameState.MENU
+                        utils.handle_music_transition('Sounds/menu_theme.mp3')
+
+            winner_text = "WHITE WINS" if game.winner == PLAYER_1 else "BLACK WINS"
+            post_game_screen.draw(screen, winner_text)
+
+        previous_state = current_state
+        if dirty_rects is None:
+            pygame.display.flip()
+        elif dirty_rects:
+            pygame.display.update(dirty_rects)
+        if profiler.enabled and current_state == GameState.PLAYING:
+            profiler.end_frame()
+
+        if first_frame:
+            # Everything a game needs loads behind the menu instead of before it
+            first_frame = False
+            assets.log(f"First menu frame after {assets.mark('First menu frame') * 1000:.0f} ms")
+            assets.preload(preload_entries(Game, MenuScreen, utils.sounds))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,211 @@
+from typing import Optional, Dict, Any
+import socket
+import threading
+import queue
+import time
+from engine import COORDS, MOVE as MOVE_ACTION
+from protocol import (FrameDecoder, ProtocolError, decode_frame, encode_join, encode_watch, encode_action,
+                      encode_snapshot, unpack_position, checksum, JOINED, MOVE, SNAPSHOT, PING, PONG,
+                      OPPONENT_JOINED, OPPONENT_LEFT, ERROR, PING_FRAME, PONG_FRAME, RESYNC_FRAME,
+                      SNAPSHOT_INTERVAL, SPECTATOR)
+
+
+class NetworkManager:
+    def __init__(self, verbose: bool = False):
+        self.socket: Optional[socket.socket] = None
+        self.update_queue: queue.Queue = queue.Queue()
+        self.lock = threading.Lock()
+        self.send_lock = threading.Lock()
+        self.connected = False
+        self.room: Optional[str] = None
+        self.player: Optional[int] = None  # Seat assigned by the server
+        self.spectating = False  # Watching someone else's match; nothing is ever sent
+
+        # Sequence number of the last action sent or applied, shared by both players
+        self.seq = 0
+        self.resyncing = False
+
+        # Instrumentation
+        self.verbose = verbose
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.frames_received = 0
+        self.rtt: Optional[float] = None  # Last measured round trip to the server, in seconds
+        self.ping_sent_at: Optional[float] = None  # Send time of the ping awaiting a pong
+        self.last_ping_at = 0.0
+
+    def log(self, message: str) -> None:
+        if self.verbose:
+            print(message)
+
+    def connect_to_server(self, server_ip: str = "localhost", port: int = 5555,
+                          room: Optional[str] = None, spectate: bool = False) -> bool:
+        """Connect and join a room by code, or get matched with the next waiting player.
+
+        With spectate set, watch the match in room instead of taking a seat.
+        """
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        try:
+            self.socket.connect((server_ip, port))
+            # Frames are tiny; don't let Nagle hold them back
+            self.socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            print("Connected to server!")
+            self.connected = True
+            self.room, self.player = None, None
+            self.spectating = spectate
+            self.reset_sequence()
+            self._send(encode_watch(room) if spectate else encode_join(room))
+            threading.Thread(target=self._network_thread, daemon=True).start()
+            return True
+        except Exception as e:
+            print(f"Couldn't connect to server: {e}")
+            self.connected = False
+            return False
+
+    def reset_sequence(self) -> None:
+        """Start numbering from scratch for a new game"""
+        self.seq = 0
+        self.resyncing = False
+
+    def send_action(self, action: tuple, engine: Any) -> bool:
+        """Send an action that has just been applied to engine, plus a snapshot when one is due"""
+        if not self.connected or self.spectating:
+            return False
+
+        self.seq += 1
+        data = encode_action(self.seq, action, engine)
+        if self.seq == 1 or self.seq % SNAPSHOT_INTERVAL == 0 or engine.game_over:
+            data += encode_snapshot(self.seq, engine)
+
+        self.log(f"Sending action {self.seq}: {action} ({len(data)} bytes)")
+        return self._send(data)
+
+    def measure_rtt(self, interval: float = 1.0) -> None:
+        """Ping the server at most every interval seconds; its pong updates rtt"""
+        now = time.perf_counter()
+        if not self.connected or now - self.last_ping_at < interval:
+            return
+        self.ping_sent_at = self.last_ping_at = now
+        self._send(PING_FRAME)
+
+    def request_resync(self) -> None:
+        if not self.resyncing:
+            self.log(f"Out of sync after action {self.seq}, asking for a snapshot")
+            self.resyncing = True
+            self._send(RESYNC_FRAME)
+
+    def _send(self, data: bytes) -> bool:
+        try:
+            # The network thread answers pings, so sends from both threads are serialized
+            with self.send_lock:
+                self.socket.sendall(data)
+            self.bytes_sent += len(data)
+            return True
+        except Exception as e:
+            print(f"Error sending message: {e}")
+            self.connected = False
+            return False
+
+    def update_game_state(self, game, message: Dict) -> None:
+        """Apply a received action or snapshot to the game"""
+        seq = message["seq"]
+
+        if message["type"] == SNAPSHOT:
+            if not self.resyncing:
+                # Snapshots normally just confirm a position we already reached
+                if seq < self.seq or (seq == self.seq and message["check"] == checksum(game.engine)):
+                    return
+            unpack_position(message["position"], game.engine)
+            game.deselect()
+            self.seq, self.resyncing = seq, False
+            self.log(f"Loaded snapshot at action {seq}")
+            return
+
+        if seq == 1 and self.seq > 0 and not self.resyncing:
+            # The opponent started a rematch
+            game.reset_game()
+        if seq <= self.seq:
+            return
+        if seq > self.seq + 1:
+            self.request_resync()
+            return
+
+        kind, source, target = message["action"]
+        if kind == MOVE_ACTION and not game.engine.is_legal_move(COORDS[source], COORDS[target]):
+            self.request_resync()
+            return
+
+        self.log(f"Received action {seq}: {message['action']}")
+        game.play_action(message["action"], remote=True)
+        self.seq = seq
+        if checksum(game.engine) != message["check"]:
+            self.request_resync()
+
+    def process_network_updates(self, game) -> None:
+        """Process any pending network updates and apply them to the game state"""
+        try:
+            while not self.update_queue.empty():
+                message = self.update_queue.get_nowait()
+                with self.lock:
+                    if message["type"] in (MOVE, SNAPSHOT):
+                        self.update_game_state(game, message)
+                    elif message["type"] == OPPONENT_JOINED:
+                        game.add_to_log("A player connected" if self.spectating else "Opponent connected")
+                    elif message["type"] == OPPONENT_LEFT:
+                        game.add_to_log("A player disconnected" if self.spectating else "Opponent disconnected")
+                    elif message["type"] == ERROR:
+                        game.add_to_log(f"Server: {message.get('reason')}")
+        except queue.Empty:
+            pass
+
+    def _network_thread(self) -> None:
+        # Frames are cut out of one reusable buffer, however the bytes were split or coalesced
+        decoder = FrameDecoder()
+        try:
+            while True:
+                count = decoder.recv_into(self.socket)
+                if not count:
+                    break
+                self.bytes_received += count
+                for kind, frame in decoder.frames():
+                    self.frames_received += 1
+                    try:
+                        self._handle_frame(kind, frame)
+                    except ProtocolError as e:
+                        # One bad frame isn't worth the connection; rebuild the position from the server instead
+                        print(f"Skipping bad frame: {e}")
+                        if kind in (MOVE, SNAPSHOT):
+                            with self.lock:
+                                self.request_resync()
+        except Exception as e:
+            print(f"Network error: {e}")
+        finally:
+            self.connected = False
+
+    def _handle_frame(self, kind: int, frame: memoryview) -> None:
+        if kind == PING:
+            self._send(PONG_FRAME)
+        elif kind == PONG:
+            # The server only pongs our own pings
+            if self.ping_sent_at is not None:
+                self.rtt = time.perf_counter() - self.ping_sent_at
+                self.ping_sent_at = None
+        elif kind == JOINED:
+            message = decode_frame(frame)
+            self.room = message["room"]
+            if message["player"] == SPECTATOR:
+                print(f"Watching room {self.room}")
+            else:
+                self.player = message["player"]
+                print(f"Joined room {self.room} as player {self.player}")
+        else:
+            self.update_queue.put(decode_frame(frame))
+
+    def disconnect(self) -> None:
+        self.connected = False
+        if self.socket:
+            try:
+                self.socket.close()
+            except Exception as e:
+                print(f"Error closing socket: {e}")
+        self.socket = None
@@ -0,0 +1,10 @@
+class Piece:
+    __slots__ = ("name", "directions", "move_distance", "owner", "promoted", "moves")
+
+    def __init__(self, name, directions, move_distance, owner, promoted=False):
+        self.name = name
+        self.directions = directions
+        self.move_distance = move_distance
+        self.owner = owner
+        self.promoted = promoted
+        self.moves = None  # engine.MoveSpec for the current stats, filled in by the engine
@@ -0,0 +1,310 @@
+"""Binary wire protocol shared by the game server, the client and the load generator.
+
+Every frame is a 4 byte header followed by the payload:
+    !HBB  payload length, protocol version, frame type
+
+Games are sent as actions rather than boards. Each action carries a sequence
+number and a checksum of the position it produces, and the mover follows
+every SNAPSHOT_INTERVAL-th action with a full snapshot. A receiver that sees
+a gap or a checksum mismatch asks the server to resync, and the server
+answers with its latest snapshot plus the actions played since.
+
+Spectators send watch instead of join. They are told they joined as seat
+SPECTATOR, get the same catch-up, and from then on receive the players'
+frames exactly as the opponent does; anything else they send is ignored.
+
+    client -> server: join, watch, move, snapshot, resync, ping, pong
+    server -> client: joined, opponent_joined, opponent_left, move, snapshot
+                      (relayed verbatim), ping, pong, error
+"""
+import struct
+
+from constants import BOARD_SIZE, EMPTY, PLAYER_1, PLAYER_2
+from engine import (MOVE as MOVE_ACTION, PLACE as PLACE_ACTION, MONARCH as MONARCH_ACTION,
+                    RESERVE_SECTIONS, BASE_STATS, NUM_SQUARES, MAX_RESERVE)
+from piece import Piece
+
+PROTOCOL_VERSION = 1
+
+# Frame types
+JOIN = 1
+JOINED = 2
+MOVE = 3
+SNAPSHOT = 4
+RESYNC = 5
+PING = 6
+PONG = 7
+OPPONENT_JOINED = 8
+OPPONENT_LEFT = 9
+ERROR = 10
+WATCH = 11
+
+SPECTATOR = 0  # Seat in the JOINED frame sent to a spectator
+
+# Resigning is only an action on the wire; the engine handles it directly
+RESIGN = "resign"
+
+SNAPSHOT_INTERVAL = 8  # Full snapshot after the first action, every 8th action and game over
+MAX_PAYLOAD_SIZE = 0xFFFF
+READ_SIZE = 4096
+
+HEADER = struct.Struct("!HBB")
+MOVE_PAYLOAD = struct.Struct("!IBBBI")  # seq, action kind, source, target, checksum
+SNAPSHOT_HEADER = struct.Struct("!II")  # seq, checksum
+JOINED_HEADER = struct.Struct("!B")  # player
+
+ACTION_CODES = {MOVE_ACTION: 0, PLACE_ACTION: 1, MONARCH_ACTION: 2, RESIGN: 3}
+ACTION_KINDS = {code: kind for kind, code in ACTION_CODES.items()}
+PIECE_CODES = {"Monarch": 1, "Advisor": 2, "Official": 3, "Palace": 4}
+PIECE_NAMES = {code: name for name, code in PIECE_CODES.items()}
+NO_SQUARE = 0xFF
+OWNER_BIT = 0x08  # Set in a square's code when the piece belongs to player 2
+SQUARE_CODES = frozenset([0] + [code | owner for code in PIECE_NAMES for owner in (0, OWNER_BIT)])
+
+# Flags byte of a packed position
+PHASE_FLAG, KING_1_FLAG, KING_2_FLAG, GAME_OVER_FLAG = 1, 2, 4, 8
+ALL_FLAGS = PHASE_FLAG | KING_1_FLAG | KING_2_FLAG | GAME_OVER_FLAG
+
+POSITION_SIZE = NUM_SQUARES + 3 + 2 * len(RESERVE_SECTIONS)
+MOVE_FRAME_SIZE = HEADER.size + MOVE_PAYLOAD.size
+SNAPSHOT_FRAME_SIZE = HEADER.size + SNAPSHOT_HEADER.size + POSITION_SIZE
+
+
+class ProtocolError(ValueError):
+    pass
+
+
+def checksum(engine):
+    """Low 32 bits of the engine's position key"""
+    return engine.key & 0xFFFFFFFF
+
+
+# --- Encoding ---
+
+def encode_frame(kind, payload=b""):
+    if len(payload) > MAX_PAYLOAD_SIZE:
+        raise ProtocolError(f"Payload too large: {len(payload)} bytes")
+    return HEADER.pack(len(payload), PROTOCOL_VERSION, kind) + payload
+
+
+def encode_join(room=None):
+    return encode_frame(JOIN, (room or "").encode())
+
+
+def encode_watch(room):
+    return encode_frame(WATCH, room.encode())
+
+
+def encode_joined(room, player):
+    return encode_frame(JOINED, JOINED_HEADER.pack(player) + room.encode())
+
+
+def encode_error(reason):
+    return encode_frame(ERROR, reason.encode())
+
+
+def encode_action(seq, action, engine):
+    """Frame for an action already applied to engine"""
+    kind, source, target = action
+    if kind == PLACE_ACTION:
+        source = PIECE_CODES[source]
+    elif kind == MONARCH_ACTION:
+        source = 0
+    return encode_frame(MOVE, MOVE_PAYLOAD.pack(seq, ACTION_CODES[kind], source,
+                                                NO_SQUARE if target is None else target,
+                                                checksum(engine)))
+
+
+def pack_position(engine):
+    """Position as 81 square codes, side to move, flags, winner and reserve counts (90 bytes)"""
+    squares = bytearray(NUM_SQUARES)
+    for index, piece in enumerate(engine.cells):
+        if piece != EMPTY:
+            squares[index] = PIECE_CODES[piece.name] | (OWNER_BIT if piece.owner == PLAYER_2 else 0)
+
+    flags = ((PHASE_FLAG if engine.monarch_placement_phase else 0)
+             | (KING_1_FLAG if engine.kings_placed[PLAYER_1] else 0)
+             | (KING_2_FLAG if engine.kings_placed[PLAYER_2] else 0)
+             | (GAME_OVER_FLAG if engine.game_over else 0))
+    reserves = [len(section) for section in engine.player1_reserve + engine.player2_reserve]
+    return bytes(squares) + bytes([engine.current_player, flags, engine.winner or 0] + reserves)
+
+
+def encode_snapshot(seq, engine):
+    return encode_frame(SNAPSHOT, SNAPSHOT_HEADER.pack(seq, checksum(engine)) + pack_position(engine))
+
+
+# Frames with no payload never change, so build them once
+PING_FRAME = encode_frame(PING)
+PONG_FRAME = encode_frame(PONG)
+RESYNC_FRAME = encode_frame(RESYNC)
+OPPONENT_JOINED_FRAME = encode_frame(OPPONENT_JOINED)
+OPPONENT_LEFT_FRAME = encode_frame(OPPONENT_LEFT)
+
+
+# --- Decoding ---
+
+def frame_seq(frame):
+    """Sequence number of a move or snapshot frame, without decoding the rest"""
+    return struct.unpack_from("!I", frame, HEADER.size)[0]
+
+
+def check_game_frame(kind, frame):
+    """Raise ProtocolError unless a MOVE or SNAPSHOT frame is well formed.
+
+    The server relays these frames without decoding them, so it checks them
+    here first; otherwise a bad frame would be stored for every later
+    catch-up and break the clients it reaches.
+    """
+    if kind == MOVE:
+        if len(frame) != MOVE_FRAME_SIZE:
+            raise ProtocolError(f"Move frame is {len(frame)} bytes, expected {MOVE_FRAME_SIZE}")
+        _, code, source, target, _ = MOVE_PAYLOAD.unpack_from(frame, HEADER.size)
+        action_kind = ACTION_KINDS.get(code)
+        if action_kind == MOVE_ACTION:
+            valid = source < NUM_SQUARES and target < NUM_SQUARES
+        elif action_kind == PLACE_ACTION:
+            valid = PIECE_NAMES.get(source) in RESERVE_SECTIONS and target < NUM_SQUARES
+        elif action_kind == MONARCH_ACTION:
+            valid = target < NUM_SQUARES
+        elif action_kind == RESIGN:
+            valid = source in (PLAYER_1, PLAYER_2) and target == NO_SQUARE
+        else:
+            raise ProtocolError(f"Unknown action code {code}")
+        if not valid:
+            raise ProtocolError(f"Bad {action_kind} action: source {source}, target {target}")
+
+    elif kind == SNAPSHOT:
+        if len(frame) != SNAPSHOT_FRAME_SIZE:
+            raise ProtocolError(f"Snapshot frame is {len(frame)} bytes, expected {SNAPSHOT_FRAME_SIZE}")
+        position = bytes(frame[HEADER.size + SNAPSHOT_HEADER.size:])
+        if not SQUARE_CODES.issuperset(position[:NUM_SQUARES]):
+            raise ProtocolError("Snapshot has an unknown piece code")
+        current_player, flags, winner = position[NUM_SQUARES:NUM_SQUARES + 3]
+        if current_player not in (PLAYER_1, PLAYER_2) or flags & ~ALL_FLAGS or winner not in (0, PLAYER_1, PLAYER_2):
+            raise ProtocolError("Snapshot has a bad side to move, flags or winner")
+        if max(position[NUM_SQUARES + 3:]) > MAX_RESERVE:
+            raise ProtocolError("Snapshot has an impossible reserve count")
+
+
+def decode_frame(frame):
+    """Turn one complete frame into a message dict with a "type" field.
+
+    Raises ProtocolError for a frame that is truncated or carries values no
+    sender would produce.
+    """
+    try:
+        return _decode_frame(frame)
+    except (KeyError, IndexError, struct.error, UnicodeDecodeError) as e:
+        raise ProtocolError(f"Malformed frame: {e!r}") from e
+
+
+def _decode_frame(frame):
+    kind = frame[3]
+    offset = HEADER.size
+    check_game_frame(kind, frame)
+    if kind == MOVE:
+        seq, code, source, target, check = MOVE_PAYLOAD.unpack_from(frame, offset)
+        action_kind = ACTION_KINDS[code]
+        if action_kind == PLACE_ACTION:
+            source = PIECE_NAMES[source]
+        elif action_kind == MONARCH_ACTION:
+            source = None
+        return {"type": MOVE, "seq": seq, "check": check,
+                "action": (action_kind, source, None if target == NO_SQUARE else target)}
+    if kind == SNAPSHOT:
+        seq, check = SNAPSHOT_HEADER.unpack_from(frame, offset)
+        return {"type": SNAPSHOT, "seq": seq, "check": check,
+                "position": bytes(frame[offset + SNAPSHOT_HEADER.size:])}
+    if kind == JOINED:
+        player, = JOINED_HEADER.unpack_from(frame, offset)
+        return {"type": JOINED, "player": player,
+                "room": bytes(frame[offset + JOINED_HEADER.size:]).decode()}
+    if kind in (JOIN, WATCH, ERROR):
+        text = bytes(frame[offset:]).decode()
+        return {"type": kind, "reason" if kind == ERROR else "room": text}
+    return {"type": kind}
+
+
+def unpack_position(position, engine):
+    """Load a position made by pack_position into engine"""
+    board = []
+    for row in range(BOARD_SIZE):
+        board_row = []
+        for code in position[row * BOARD_SIZE:(row + 1) * BOARD_SIZE]:
+            if code == 0:
+                board_row.append(EMPTY)
+                continue
+            name = PIECE_NAMES[code & ~OWNER_BIT]
+            directions, distance, promoted = BASE_STATS[name]
+            owner = PLAYER_2 if code & OWNER_BIT else PLAYER_1
+            board_row.append(Piece(name, directions, distance, owner, promoted))
+        board.append(board_row)
+
+    current_player, flags, winner = position[NUM_SQUARES:NUM_SQUARES + 3]
+    counts = position[NUM_SQUARES + 3:]
+    sections = len(RESERVE_SECTIONS)
+    engine.player1_reserve = [[name] * count for name, count in zip(RESERVE_SECTIONS, counts[:sections])]
+    engine.player2_reserve = [[name] * count for name, count in zip(RESERVE_SECTIONS, counts[sections:])]
+    engine.current_player = current_player
+    engine.monarch_placement_phase = bool(flags & PHASE_FLAG)
+    engine.kings_placed = {PLAYER_1: bool(flags & KING_1_FLAG), PLAYER_2: bool(flags & KING_2_FLAG)}
+    engine.game_over = bool(flags & GAME_OVER_FLAG)
+    engine.winner = winner or None
+    # load_board re-derives promotions and rehashes with the state set above
+    engine.load_board(board)
+
+
+class FrameDecoder:
+    """Splits a byte stream into frames, however the bytes were split or coalesced in transit.
+
+    Bytes land in one buffer that is reused for the whole connection. Frames
+    handed out by frames() are views into it and stay valid until the next
+    feed() or recv_into().
+    """
+
+    def __init__(self, size=READ_SIZE * 4):
+        self.buffer = bytearray(size)
+        self.view = memoryview(self.buffer)
+        self.start = 0
+        self.end = 0
+
+    def _make_room(self, needed):
+        if len(self.buffer) - self.end >= needed:
+            return
+        pending = self.end - self.start
+        if pending + needed > len(self.buffer):
+            # Only a frame bigger than the buffer gets here; grow once to fit it
+            buffer = bytearray(max(len(self.buffer) * 2, pending + needed))
+            buffer[:pending] = self.view[self.start:self.end]
+            self.buffer, self.view = buffer, memoryview(buffer)
+        else:
+            self.buffer[:pending] = self.buffer[self.start:self.end]
+        self.start, self.end = 0, pending
+
+    def feed(self, data):
+        self._make_room(len(data))
+        self.buffer[self.end:self.end + len(data)] = data
+        self.end += len(data)
+
+    def recv_into(self, sock):
+        """Read straight from a socket into the buffer, returning the byte count (0 on EOF)"""
+        self._make_room(READ_SIZE)
+        count = sock.recv_into(self.view[self.end:])
+        self.end += count
+        return count
+
+    def frames(self):
+        """Yield (frame type, frame view) for every complete frame received so far"""
+        while self.end - self.start >= HEADER.size:
+            length, version, kind = HEADER.unpack_from(self.buffer, self.start)
+            if version != PROTOCOL_VERSION:
+                raise ProtocolError(f"Unsupported protocol version {version}")
+            frame_end = self.start + HEADER.size + length
+            if frame_end > self.end:
+                break
+            frame = self.view[self.start:frame_end]
+            self.start = frame_end
+            yield kind, frame
+        if self.start == self.end:
+            self.start = self.end = 0
@@ -0,0 +1,304 @@
+"""Headless self-play for balance tuning.
+
+Plays games between two policies on the bare GameEngine, spread over a pool
+of worker processes, appends every game to a record file (see
+game_records.py) and prints win rates, game lengths and how often each kind
+of piece gets promoted. Tweak ADVISOR_NUMBER, OFFICIAL_NUMBER, PALACE_AREA or
+the promotion tables in engine.py, then run it again.
+
+    python selfplay.py --games 100000 --white greedy --black random --out games.rec
+    python selfplay.py --read games.rec
+"""
+import argparse
+import multiprocessing
+import os
+import random
+import time
+from collections import Counter
+
+from ai import PIECE_VALUES, WIN_SCORE
+from constants import EMPTY, PLAYER_1, PLAYER_2
+from engine import GameEngine, MOVE
+from game_records import (RecordReader, RecordWriter, encode_game, encode_ply, parse_action,
+                          promotion_counts, END_REASONS, MONARCH_CAPTURED, RESIGNED, PLY_LIMIT,
+                          PLY, CAPTURE_SHIFT, MAX_SEED, MAX_PLIES)
+from protocol import PIECE_NAMES, RESIGN
+
+# Played by "scripted" when no --script is given: monarch on the back rank behind a palace
+DEFAULT_SCRIPT = [
+    "monarch 5,1",
+    "place Palace 5,2",
+    "place Official 4,2",
+    "place Official 6,2",
+    "place Advisor 5,3",
+]
+
+
+class RandomPolicy:
+    """Uniformly random legal actions"""
+
+    def new_game(self, player):
+        pass
+
+    def choose(self, engine, actions, rng):
+        return rng.choice(actions)
+
+
+class GreedyPolicy:
+    """Takes the most valuable capture on offer (the monarch above all), otherwise plays randomly"""
+
+    def new_game(self, player):
+        pass
+
+    def choose(self, engine, actions, rng):
+        cells = engine.cells
+        best, best_value = [], 0
+        for action in actions:
+            if action[0] != MOVE:
+                continue
+            victim = cells[action[2]]
+            if victim == EMPTY:
+                continue
+            value = WIN_SCORE if victim.name == "Monarch" else PIECE_VALUES[victim.name]
+            if value > best_value:
+                best, best_value = [action], value
+            elif value == best_value:
+                best.append(action)
+        return rng.choice(best or actions)
+
+
+class ScriptedPolicy:
+    """Plays a fixed list of actions (in game log notation) whenever they are legal, then falls back.
+
+    Each turn it plays the first not yet played script action that is legal
+    right now; once none is, the fallback policy decides.
+    """
+
+    def __init__(self, script=None, fallback=None):
+        self.script = [line for line in (script or DEFAULT_SCRIPT) if line.strip()]
+        self.fallback = fallback or GreedyPolicy()
+        self.parsed = {}  # player -> script as action tuples
+        self.remaining = []
+
+    def new_game(self, player):
+        if player not in self.parsed:
+            self.parsed[player] = [parse_action(line, player) for line in self.script]
+        self.remaining = list(self.parsed[player])
+        self.fallback.new_game(player)
+
+    def choose(self, engine, actions, rng):
+        for action in self.remaining:
+            if action in actions:
+                self.remaining.remove(action)
+                return action
+        return self.fallback.choose(engine, actions, rng)
+
+
+POLICIES = {"random": RandomPolicy, "greedy": GreedyPolicy, "scripted": ScriptedPolicy}
+
+
+def make_policy(name, script=None):
+    return ScriptedPolicy(script) if name == "scripted" else POLICIES[name]()
+
+
+def play_game(engine, policies, rng, max_plies):
+    """Play one game from scratch; returns (winner, end reason, packed plies)"""
+    engine.reset()
+    for player, policy in policies.items():
+        policy.new_game(player)
+
+    plies = bytearray()
+    cells = engine.cells
+    for _ in range(max_plies):
+        if engine.game_over:
+            return engine.winner, MONARCH_CAPTURED, plies
+
+        player = engine.current_player
+        actions = engine.legal_actions()
+        if not actions:
+            # Nothing to play counts as resigning, as it would for the AI
+            engine.resign(player)
+            plies += encode_ply((RESIGN, player, None))
+            return engine.winner, RESIGNED, plies
+
+        action = policies[player].choose(engine, actions, rng)
+        captured = engine.apply_action(action)
+        captured = captured.name if action[0] == MOVE and captured != EMPTY else None
+        plies += encode_ply(action, captured, [cells[index].name for index in engine.promoted])
+
+    if engine.game_over:
+        return engine.winner, MONARCH_CAPTURED, plies
+    return None, PLY_LIMIT, plies
+
+
+def play_batch(task):
+    """Worker entry point: play count games, returning (records, stats, CPU seconds)"""
+    first_seed, count, white, black, max_plies, script = task
+    start = time.process_time()
+    engine = GameEngine()
+    policies = {PLAYER_1: make_policy(white, script), PLAYER_2: make_policy(black, script)}
+    records = bytearray()
+    stats = SelfPlayStats()
+    for seed in range(first_seed, first_seed + count):
+        # Seeding each game on its own makes any recorded game reproducible from its seed
+        winner, reason, plies = play_game(engine, policies, random.Random(seed), max_plies)
+        records += encode_game(seed, winner, reason, plies)
+        stats.add_game(winner, reason, plies)
+    return bytes(records), stats, time.process_time() - start
+
+
+class SelfPlayStats:
+    def __init__(self):
+        self.games = 0
+        self.wins = Counter()  # Winner (None when the ply limit ended it) -> games
+        self.reasons = Counter()  # End reason -> games
+        self.lengths = Counter()  # Plies -> games
+        self.promotions = Counter()  # Piece name -> times promoted
+        self.captures = Counter()  # Piece name -> times captured
+
+    def add_game(self, winner, reason, plies):
+        """Count one game from its packed plies (so recorded games give the same stats)"""
+        self.games += 1
+        self.wins[winner] += 1
+        self.reasons[reason] += 1
+        self.lengths[len(plies) // PLY.size] += 1
+
+        # Count distinct code and promotion bytes first; a game only has a handful of each
+        for code, count in Counter(plies[0::PLY.size]).items():
+            captured = code >> CAPTURE_SHIFT
+            if captured:
+                self.captures[PIECE_NAMES[captured]] += count
+        for promotions, count in Counter(plies[3::PLY.size]).items():
+            if promotions:
+                for name, promoted in promotion_counts(promotions).items():
+                    self.promotions[name] += promoted * count
+
+    def merge(self, other):
+        self.games += other.games
+        self.wins.update(other.wins)
+        self.reasons.update(other.reasons)
+        self.lengths.update(other.lengths)
+        self.promotions.update(other.promotions)
+        self.captures.update(other.captures)
+
+    def length_percentile(self, fraction):
+        wanted = fraction * self.games
+        seen = 0
+        for length in sorted(self.lengths):
+            seen += self.lengths[length]
+            if seen >= wanted:
+                return length
+        return 0
+
+    def report(self):
+        if not self.games:
+            print("No games")
+            return
+        games = self.games
+
+        def share(count):
+            return f"{100 * count / games:.1f}%"
+
+        print(f"Games: {games}")
+        print(f"Wins: white {share(self.wins[PLAYER_1])}, black {share(self.wins[PLAYER_2])}, "
+              f"unfinished {share(self.wins[None])}")
+        print("Ended by: " + ", ".join(f"{END_REASONS[reason]} {share(count)}"
+                                      for reason, count in sorted(self.reasons.items())))
+
+        mean = sum(length * count for length, count in self.lengths.items()) / games
+        print(f"Length (plies): min {min(self.lengths)}, median {self.length_percentile(0.5)}, "
+              f"mean {mean:.1f}, p90 {self.length_percentile(0.9)}, max {max(self.lengths)}")
+        buckets = Counter()
+        for length, count in self.lengths.items():
+            buckets[length // 50 * 50] += count
+        for bucket in sorted(buckets):
+            print(f"  {bucket:4d}-{bucket + 49:<4d} {share(buckets[bucket]):>6} "
+                  f"{'#' * round(40 * buckets[bucket] / games)}")
+
+        print("Promotions per game: " + ", ".join(f"{name} {self.promotions[name] / games:.2f}"
+                                                  for name in PIECE_VALUES))
+        print("Captures per game: " + ", ".join(f"{name} {self.captures[name] / games:.2f}"
+                                               for name in PIECE_VALUES))
+
+
+def read_records(path):
+    stats = SelfPlayStats()
+    start = time.perf_counter()
+    with RecordReader(path) as reader:
+        for seed, winner, reason, plies in reader:
+            stats.add_game(winner, reason, plies)
+    elapsed = time.perf_counter() - start
+    print(f"Read {stats.games} games from {path} in {elapsed:.2f}s")
+    stats.report()
+
+
+def run(args):
+    script = None
+    if args.script:
+        with open(args.script) as script_file:
+            script = [line.split("#")[0].strip() for line in script_file]
+
+    tasks = ((args.seed + first, min(args.batch, args.games - first), args.white, args.black,
+              args.max_plies, script) for first in range(0, args.games, args.batch))
+
+    writer = RecordWriter(args.out) if args.out else None
+    stats = SelfPlayStats()
+    cpu_time = 0.0
+    start = last_report = time.perf_counter()
+    print(f"Playing {args.games} games, white {args.white} vs black {args.black}, on {args.workers} workers")
+
+    pool = multiprocessing.Pool(args.workers) if args.workers > 1 else None
+    try:
+        # Batches come back in whatever order they finish; each game carries its own seed
+        results = pool.imap_unordered(play_batch, tasks) if pool else map(play_batch, tasks)
+        for records, batch_stats, batch_cpu in results:
+            if writer:
+                writer.write(records)
+            stats.merge(batch_stats)
+            cpu_time += batch_cpu
+            now = time.perf_counter()
+            if now - last_report >= 5:
+                last_report = now
+                print(f"  {stats.games} games, {stats.games / (now - start):.0f} games/sec")
+    finally:
+        if pool:
+            pool.close()
+            pool.join()
+        if writer:
+            writer.close()
+
+    elapsed = time.perf_counter() - start
+    stats.report()
+    print(f"Throughput: {stats.games / elapsed:.0f} games/sec on {args.workers} workers, "
+          f"{stats.games / cpu_time if cpu_time else 0:.0f} games/sec per core")
+    if args.out:
+        print(f"Appended to {args.out}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Play games between policies without a window")
+    parser.add_argument("--games", type=int, default=1000, help="Games to play")
+    parser.add_argument("--white", choices=POLICIES, default="random", help="Policy for player 1")
+    parser.add_argument("--black", choices=POLICIES, default="random", help="Policy for player 2")
+    parser.add_argument("--script", help="Actions for the scripted policy, one per line (e.g. 'place Palace 5,2')")
+    parser.add_argument("--max-plies", type=int, default=400, help="Plies before a game counts as unfinished")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Worker processes")
+    parser.add_argument("--batch", type=int, default=100, help="Games per task handed to a worker")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the first game")
+    parser.add_argument("--out", help="Record file to append the games to")
+    parser.add_argument("--read", metavar="FILE", help="Print stats for a record file instead of playing")
+    args = parser.parse_args()
+    # Each game's seed and ply count go into its record header
+    if args.seed < 0 or args.seed + max(args.games, 1) - 1 > MAX_SEED:
+        parser.error(f"--seed must be at least 0 and --seed + --games - 1 at most {MAX_SEED}")
+    if not 1 <= args.max_plies <= MAX_PLIES:
+        parser.error(f"--max-plies must be between 1 and {MAX_PLIES}")
+
+    if args.read:
+        read_records(args.read)
+    else:
+        run(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,362 @@
+import argparse
+import asyncio
+import secrets
+import socket
+import string
+
+from protocol import (FrameDecoder, ProtocolError, check_game_frame, decode_frame, frame_seq, encode_joined,
+                      encode_error, READ_SIZE, JOIN, WATCH, MOVE, SNAPSHOT, RESYNC, PING, PONG, PING_FRAME, PONG_FRAME,
+                      OPPONENT_JOINED_FRAME, OPPONENT_LEFT_FRAME, SPECTATOR)
+
+HEARTBEAT_INTERVAL = 10  # seconds between server pings
+IDLE_TIMEOUT = 30  # drop connections we haven't heard from for this long
+ERROR_FLUSH_TIMEOUT = 2  # seconds to spend delivering an error before closing
+SEND_QUEUE_SIZE = 64  # messages buffered per client before it counts as too slow
+ROOM_CODE_ALPHABET = string.ascii_uppercase + string.digits
+ROOM_CODE_LENGTH = 5
+MAX_MOVE_LOG = 256  # Actions kept since the last snapshot, for resyncs and rejoins
+MAX_SPECTATORS = 500  # Per room
+SPECTATOR_QUEUE_SIZE = 32  # Frames queued for a spectator before it is skipped ahead to the catch-up
+SPECTATOR_SEND_BUFFER = 8192  # Bytes the transport and the kernel may each hold for a spectator
+SPECTATOR_LAG_LIMIT = 10  # Seconds a spectator may stay behind (skipping ahead all the while) before it is dropped
+
+
+class Connection:
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self.address = writer.get_extra_info("peername")
+        self.outbox: asyncio.Queue = asyncio.Queue(SEND_QUEUE_SIZE)
+        self.room = None
+        self.player = None
+        self.spectating = False
+        self.behind_since = None  # When a spectator was first skipped ahead since its queue last drained
+        self.last_seen = asyncio.get_running_loop().time()
+        self.closed = False
+
+    def send(self, data):
+        """Queue bytes for this client without waiting; a player that can't keep up is dropped"""
+        if self.closed:
+            return
+        if self.spectating and data is not None and self.outbox.qsize() >= SPECTATOR_QUEUE_SIZE:
+            self.skip_ahead()
+            return
+        try:
+            self.outbox.put_nowait(data)
+        except asyncio.QueueFull:
+            self.close()
+
+    async def write_loop(self):
+        # Only this task ever waits on the socket, so a slow client stalls nobody else
+        try:
+            while True:
+                data = await self.outbox.get()
+                if data is None:
+                    break
+                self.writer.write(data)
+                await self.writer.drain()
+                if self.outbox.empty():
+                    self.behind_since = None
+        except (ConnectionError, OSError):
+            pass
+        finally:
+            self.close()
+
+    def skip_ahead(self):
+        """Replace everything queued for a lagging spectator with the room's catch-up"""
+        if self.room is None:
+            # The room is gone, so there is nothing left to catch up on
+            self.close()
+            return
+        now = asyncio.get_running_loop().time()
+        if self.behind_since is None:
+            self.behind_since = now
+        elif now - self.behind_since > SPECTATOR_LAG_LIMIT:
+            self.close()
+            return
+        while not self.outbox.empty():
+            self.outbox.get_nowait()
+        # Frames the spectator already has are ignored by its client, so overlap is harmless
+        self.outbox.put_nowait(self.room.catch_up())
+
+    def close_after_flush(self):
+        """Close once everything queued so far has been written"""
+        self.send(None)
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        # Wake the writer so it exits, discarding anything still queued
+        while not self.outbox.empty():
+            self.outbox.get_nowait()
+        self.outbox.put_nowait(None)
+        self.writer.close()
+
+
+class Room:
+    def __init__(self, code, public=False):
+        self.code = code
+        self.public = public
+        self.players = {}  # player number -> Connection
+        self.spectators = set()  # Connections watching the match
+        self.snapshot = None  # Latest snapshot frame
+        self.moves = []  # Action frames relayed since that snapshot
+        self.catch_up_frames = None  # catch_up() result, until the next recorded frame
+
+    def record(self, kind, frame):
+        """Remember a relayed game frame so a client can catch up without the opponent's help"""
+        self.catch_up_frames = None
+        if kind == SNAPSHOT:
+            self.snapshot = frame
+            self.moves.clear()
+        else:
+            if frame_seq(frame) == 1:
+                # First action of a new game
+                self.snapshot = None
+                self.moves.clear()
+            if len(self.moves) < MAX_MOVE_LOG:
+                self.moves.append(frame)
+
+    def catch_up(self):
+        """Frames that rebuild the current position from scratch, built once per position"""
+        if self.catch_up_frames is None:
+            self.catch_up_frames = (self.snapshot or b"") + b"".join(self.moves)
+        return self.catch_up_frames
+
+    def fan_out(self, data):
+        """Queue the same bytes object for every spectator; nothing is copied or re-encoded"""
+        for spectator in self.spectators:
+            spectator.send(data)
+
+    def is_full(self):
+        return len(self.players) >= 2
+
+    def free_seat(self):
+        return 1 if 1 not in self.players else 2
+
+    def opponent_of(self, player):
+        return self.players.get(2 if player == 1 else 1)
+
+
+class GameServer:
+    def __init__(self, heartbeat_interval=HEARTBEAT_INTERVAL, idle_timeout=IDLE_TIMEOUT, verbose=True,
+                 max_spectators=MAX_SPECTATORS):
+        self.rooms = {}  # room code -> Room
+        self.waiting_room = None  # Public room with one player, used for matchmaking
+        self.connections = set()
+        self.heartbeat_interval = heartbeat_interval
+        self.idle_timeout = idle_timeout
+        self.max_spectators = max_spectators
+        self.verbose = verbose
+
+    def log(self, message):
+        if self.verbose:
+            print(message)
+
+    # --- Rooms ---
+
+    def new_room_code(self):
+        while True:
+            code = "".join(secrets.choice(ROOM_CODE_ALPHABET) for _ in range(ROOM_CODE_LENGTH))
+            if code not in self.rooms:
+                return code
+
+    def find_room(self, code):
+        """Room for a join request: the named room, or the public matchmaking room"""
+        if code:
+            code = code.upper()
+            room = self.rooms.get(code)
+            if room is None:
+                room = self.rooms[code] = Room(code)
+            return room
+
+        room = self.waiting_room
+        if room is None or room.is_full() or room.code not in self.rooms:
+            room = Room(self.new_room_code(), public=True)
+            self.rooms[room.code] = room
+            self.waiting_room = room
+        return room
+
+    def join(self, conn, code):
+        if conn.room is not None:
+            return
+        room = self.find_room(code)
+        if room.is_full():
+            conn.send(encode_error("room full"))
+            conn.close_after_flush()
+            return
+
+        player = room.free_seat()
+        room.players[player] = conn
+        conn.room, conn.player = room, player
+        if room.is_full() and self.waiting_room is room:
+            self.waiting_room = None
+
+        conn.send(encode_joined(room.code, player))
+        opponent = room.opponent_of(player)
+        if opponent is not None:
+            opponent.send(OPPONENT_JOINED_FRAME)
+            conn.send(OPPONENT_JOINED_FRAME)
+        room.fan_out(OPPONENT_JOINED_FRAME)
+        catch_up = room.catch_up()
+        if catch_up:
+            conn.send(catch_up)
+        self.log(f"{conn.address} joined room {room.code} as player {player}")
+
+    def watch(self, conn, code):
+        """Add a read-only spectator to an existing room and catch it up to the current position"""
+        if conn.room is not None:
+            return
+        room = self.rooms.get(code.upper()) if code else None
+        if room is None or len(room.spectators) >= self.max_spectators:
+            conn.send(encode_error("no such room" if room is None else "too many spectators"))
+            conn.close_after_flush()
+            return
+
+        room.spectators.add(conn)
+        conn.room, conn.spectating = room, True
+        # Keep the backlog in the queue, where skip_ahead can throw it away, rather than in buffers
+        # that would otherwise grow to megabytes per spectator
+        conn.writer.transport.set_write_buffer_limits(SPECTATOR_SEND_BUFFER)
+        sock = conn.writer.get_extra_info("socket")
+        if sock is not None:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, SPECTATOR_SEND_BUFFER)
+        conn.send(encode_joined(room.code, SPECTATOR))
+        catch_up = room.catch_up()
+        if catch_up:
+            conn.send(catch_up)
+        self.log(f"{conn.address} is watching room {room.code} ({len(room.spectators)} spectators)")
+
+    def leave(self, conn):
+        room = conn.room
+        if room is None:
+            return
+        conn.room = None
+        if conn.spectating:
+            room.spectators.discard(conn)
+            return
+
+        room.players.pop(conn.player, None)
+        opponent = room.opponent_of(conn.player)
+        if opponent is not None:
+            opponent.send(OPPONENT_LEFT_FRAME)
+        room.fan_out(OPPONENT_LEFT_FRAME)
+        if not room.players:
+            self.rooms.pop(room.code, None)
+            if self.waiting_room is room:
+                self.waiting_room = None
+            # Nothing more will be played here
+            for spectator in room.spectators:
+                spectator.close_after_flush()
+
+    # --- Connections ---
+
+    async def handle_client(self, reader, writer):
+        conn = Connection(reader, writer)
+        self.connections.add(conn)
+        writer_task = asyncio.create_task(conn.write_loop())
+        self.log(f"Connected by {conn.address}")
+
+        loop = asyncio.get_running_loop()
+        decoder = FrameDecoder()
+        try:
+            while not conn.closed:
+                data = await reader.read(READ_SIZE)
+                if not data:
+                    break
+                conn.last_seen = loop.time()
+                decoder.feed(data)
+                for kind, frame in decoder.frames():
+                    self.handle_frame(conn, kind, frame)
+        except ProtocolError as e:
+            self.log(f"Bad frame from {conn.address}: {e}")
+            conn.send(encode_error(str(e)))
+            conn.close_after_flush()
+            # Give the error a moment to reach the client before the socket is closed below
+            await asyncio.wait([writer_task], timeout=ERROR_FLUSH_TIMEOUT)
+        except (ConnectionError, OSError, ValueError) as e:
+            self.log(f"Error handling client {conn.address}: {e}")
+        finally:
+            self.leave(conn)
+            self.connections.discard(conn)
+            conn.close()
+            await writer_task
+            self.log(f"Client {conn.address} disconnected")
+
+    def handle_frame(self, conn, kind, frame):
+        if kind in (MOVE, SNAPSHOT):
+            room = conn.room
+            if room is None or conn.spectating:
+                return
+            check_game_frame(kind, frame)
+            # Relay the original bytes to the opponent and every spectator; nothing is re-encoded
+            data = bytes(frame)
+            room.record(kind, data)
+            opponent = room.opponent_of(conn.player)
+            if opponent is not None:
+                opponent.send(data)
+            room.fan_out(data)
+        elif kind == RESYNC:
+            catch_up = conn.room.catch_up() if conn.room is not None else b""
+            if catch_up:
+                conn.send(catch_up)
+        elif kind == JOIN:
+            self.join(conn, decode_frame(frame)["room"])
+        elif kind == WATCH:
+            self.watch(conn, decode_frame(frame)["room"])
+        elif kind == PING:
+            conn.send(PONG_FRAME)
+        elif kind == PONG:
+            pass  # last_seen is already updated
+        else:
+            conn.send(encode_error(f"unknown frame type {kind}"))
+
+    async def heartbeat(self):
+        """Ping every client periodically and drop the ones that went quiet"""
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(self.heartbeat_interval)
+            now = loop.time()
+            for conn in list(self.connections):
+                if now - conn.last_seen > self.idle_timeout:
+                    self.log(f"Dropping idle client {conn.address}")
+                    conn.close()
+                else:
+                    conn.send(PING_FRAME)
+
+    async def serve(self, host="0.0.0.0", port=5555):
+        server = await asyncio.start_server(self.handle_client, host, port)
+        print(f"Server is listening on {host}:{port}")
+        heartbeat = asyncio.create_task(self.heartbeat())
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            heartbeat.cancel()
+
+    def start(self, host="0.0.0.0", port=5555):
+        try:
+            asyncio.run(self.serve(host, port))
+        except KeyboardInterrupt:
+            print("Server stopped")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Seiji game server")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=5555)
+    parser.add_argument("--heartbeat", type=float, default=HEARTBEAT_INTERVAL, help="Seconds between pings")
+    parser.add_argument("--idle-timeout", type=float, default=IDLE_TIMEOUT,
+                        help="Seconds of silence before a client is dropped")
+    parser.add_argument("--max-spectators", type=int, default=MAX_SPECTATORS, help="Spectators allowed per room")
+    parser.add_argument("--quiet", action="store_true", help="Don't log connections")
+    args = parser.parse_args()
+
+    server = GameServer(args.heartbeat, args.idle_timeout, verbose=not args.quiet,
+                        max_spectators=args.max_spectators)
+    server.start(args.host, args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""AI tests: search leaves the position alone, finds the winning capture, keeps to its budget and is cancellable."""
+import random
+import threading
+import time
+
+from constants import PLAYER_1, PLAYER_2
+from engine import GameEngine, MOVE, to_index
+from ai import AIPlayer, Searcher, SearchResult, TranspositionTable, EXACT, LOWER_BOUND
+from protocol import pack_position
+from test_engine import engine_with
+
+TIME_MARGIN = 0.15  # Time checks happen every few hundred nodes, so the search may run slightly over
+
+
+def midgame_engine(seed, plies=30):
+    rng = random.Random(seed)
+    engine = GameEngine()
+    for _ in range(plies):
+        actions = engine.legal_actions()
+        if not actions:
+            break
+        action = rng.choice(actions)
+        before = engine.snapshot()
+        engine.apply_action(action)
+        if engine.game_over:
+            engine.restore(before)
+            break
+    return engine
+
+
+def test_search_restores_the_position():
+    for seed in range(3):
+        engine = midgame_engine(seed)
+        position, key = pack_position(engine), engine.key
+        result = Searcher(table_bits=12).search(engine, time_budget=0.2)
+        assert result.action in engine.legal_actions()
+        assert pack_position(engine) == position
+        assert engine.key == key == engine.rehash()
+
+
+def test_search_takes_the_monarch():
+    engine = engine_with(("Monarch", PLAYER_1, 1, 1), ("Monarch", PLAYER_2, 0, 0), ("Official", PLAYER_2, 0, 5))
+    result = Searcher(table_bits=12).search(engine, time_budget=1.0)
+    assert result.action == (MOVE, to_index(1, 1), to_index(0, 0))
+
+
+def test_search_keeps_to_its_budget():
+    engine = midgame_engine(7)
+    for budget in (0.05, 0.3):
+        result = Searcher(table_bits=12).search(engine, time_budget=budget)
+        assert result.action is not None
+        assert result.elapsed <= budget + TIME_MARGIN
+
+
+def test_table_replaces_older_searches_and_keeps_deeper_entries():
+    table = TranspositionTable(size_bits=4)
+    key, other = 0x1234, 0x1234 + (1 << 4)  # Same slot, different positions
+    table.store(key, 5, EXACT, 10, "deep")
+    table.store(other, 2, EXACT, 20, "shallow")
+    assert table.probe(key)[4] == "deep" and table.probe(other) is None
+
+    table.store(other, 6, LOWER_BOUND, 30, "deeper")
+    assert table.probe(other)[4] == "deeper" and table.probe(key) is None
+
+    # Entries from an earlier search give way even to shallower ones
+    table.new_search()
+    table.store(key, 1, EXACT, 40, "new")
+    assert table.probe(key)[1:5] == (1, EXACT, 40, "new")
+
+
+def test_result_arriving_after_cancel_is_ignored():
+    player = AIPlayer(PLAYER_1, time_budget=0.05, table_bits=8)
+    release = threading.Event()
+    stale = SearchResult("stale", 0, 1, 1, 0.0)
+
+    def slow_search(engine, time_budget, stop_event=None):
+        release.wait(5)  # Finishes after the cancel no matter what stop_event says
+        return stale
+
+    player.searcher.search = slow_search
+    player.start_thinking(GameEngine())
+    player.cancel()
+    release.set()
+    deadline = time.monotonic() + 5
+    while player.results.empty() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert not player.results.empty()
+    assert player.poll() is None
+    assert not player.thinking and player.last_result is None
+
+    fresh = SearchResult("fresh", 0, 1, 1, 0.0)
+    player.searcher.search = lambda engine, time_budget, stop_event=None: fresh
+    player.start_thinking(GameEngine())
+    deadline = time.monotonic() + 5
+    result = None
+    while result is None and time.monotonic() < deadline:
+        result = player.poll()
+        time.sleep(0.01)
+    assert result is fresh and player.last_result is fresh
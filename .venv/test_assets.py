@@ -0,0 +1,132 @@
+"""Asset manager tests: each asset loads once, whoever asks first, and later starts hit the cache."""
+import threading
+import time
+
+import pygame
+import pytest
+
+from assets import AssetManager, ImageAsset, SilentSound, SoundAsset, preload_entries
+
+
+@pytest.fixture
+def manager(tmp_path):
+    return AssetManager(cache_dir=str(tmp_path / "cache"))
+
+
+@pytest.fixture
+def texture(tmp_path):
+    path = tmp_path / "texture.png"
+    surface = pygame.Surface((8, 4))
+    surface.fill((200, 10, 30))
+    pygame.image.save(surface, str(path))
+    return str(path)
+
+
+def test_concurrent_requests_load_once(manager):
+    calls = []
+    started = threading.Event()
+
+    def load():
+        calls.append(threading.get_ident())
+        started.set()
+        time.sleep(0.05)  # Keep the load in flight while the other threads ask for it
+        return object()
+
+    results = []
+    first = threading.Thread(target=lambda: results.append(manager._get(("sound", "a"), load)))
+    first.start()
+    started.wait()
+    others = [threading.Thread(target=lambda: results.append(manager._get(("sound", "a"), load))) for _ in range(8)]
+    for thread in others:
+        thread.start()
+    for thread in [first] + others:
+        thread.join()
+
+    assert len(calls) == 1
+    assert len(results) == 9 and all(result is results[0] for result in results)
+    assert manager.loading == {}
+
+
+def test_failed_load_lets_the_next_caller_retry(manager):
+    def fail():
+        raise RuntimeError("disk on fire")
+
+    with pytest.raises(RuntimeError):
+        manager._get(("sound", "a"), fail)
+    assert manager.loading == {}
+    assert manager._get(("sound", "a"), lambda: "loaded") == "loaded"
+
+
+def test_same_image_and_size_share_one_surface(manager, texture):
+    first = manager.image(texture)
+    assert manager.image(texture) is first
+    scaled = manager.image(texture, (4, 2))
+    assert scaled is not first and scaled.get_size() == (4, 2)
+    assert manager.image(texture, (4, 2)) is scaled
+
+
+def test_later_managers_read_the_processed_cache(tmp_path, texture, monkeypatch):
+    cache_dir = str(tmp_path / "cache")
+    original = AssetManager(cache_dir=cache_dir).image(texture, (4, 2))
+
+    def no_decoding(*args):
+        raise AssertionError("decoded the source file again")
+
+    monkeypatch.setattr(pygame.image, "load", no_decoding)
+    cached = AssetManager(cache_dir=cache_dir).image(texture, (4, 2))
+    assert cached.get_size() == (4, 2)
+    assert pygame.image.tobytes(cached, "RGBA") == pygame.image.tobytes(original, "RGBA")
+
+
+def test_missing_texture_gets_a_placeholder_once(manager, tmp_path, capsys):
+    missing = str(tmp_path / "missing.png")
+    placeholder = manager.image(missing, (3, 3))
+    assert placeholder.get_size() == (3, 3)
+    assert manager.image(missing, (3, 3)) is placeholder
+    assert capsys.readouterr().out.count("Could not load texture") == 1
+
+
+def test_sound_without_mixer_is_silent(manager, tmp_path, capsys):
+    sound = manager.sound(str(tmp_path / "missing.mp3"))
+    assert isinstance(sound, SilentSound)
+    assert manager.sound(str(tmp_path / "missing.mp3")) is sound
+    assert "Could not load sound" in capsys.readouterr().out
+
+
+def test_volume_set_before_loading_is_applied(manager, tmp_path):
+    path = str(tmp_path / "missing.mp3")
+    manager.set_volume(path, 0.25)
+    assert manager.sound(path).get_volume() == 0.25
+    manager.set_volume(path, 0.5)
+    assert manager.sound(path).get_volume() == 0.5
+
+
+def test_preload_entries_list_each_file_and_size_once():
+    class Screen:
+        click = SoundAsset("Sounds/click.mp3")
+        background = ImageAsset("Textures/bg.png", (10, 10))
+        ending = SoundAsset("Sounds/end.mp3", preload=False)
+
+    class OtherScreen:
+        click = SoundAsset("Sounds/click.mp3")
+        background = ImageAsset("Textures/bg.png", (10, 10))
+        thumbnail = ImageAsset("Textures/bg.png", (5, 5))
+
+    entries = preload_entries(Screen, OtherScreen, {"click": SoundAsset("Sounds/click.mp3")})
+    assert [(entry.path, getattr(entry, "size", None)) for entry in entries] == [
+        ("Sounds/click.mp3", None), ("Textures/bg.png", (10, 10)), ("Textures/bg.png", (5, 5))]
+
+
+def test_preload_loads_in_the_background(manager):
+    class Entry:
+        def __init__(self):
+            self.loaded = False
+
+        def load(self):
+            self.loaded = True
+
+    entries = [Entry() for _ in range(5)]
+    manager.preload(entries)
+    manager.preload_thread.join(5)
+    assert manager.progress() == (5, 5)
+    assert all(entry.loaded for entry in entries)
@@ -0,0 +1,92 @@
+"""Play screen drawing tests: redrawing only the changed sections gives the same pixels as a full redraw."""
+import random
+
+import pygame
+import pytest
+
+from constants import WINDOW_WIDTH, WINDOW_HEIGHT, BOARD_SIZE, CELL_SIZE
+from draw_utils import DrawUtils
+
+STEPS = 120
+
+
+def noise(size, seed):
+    """Texture with scattered colour blocks, so a section restored from the wrong place shows up"""
+    rng = random.Random(seed)
+    surface = pygame.Surface(size)
+    for _ in range(200):
+        surface.fill((rng.randrange(256), rng.randrange(256), rng.randrange(256)),
+                     (rng.randrange(size[0]), rng.randrange(size[1]), 5, 5))
+    return surface
+
+
+@pytest.fixture
+def game():
+    pygame.init()
+    pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
+    import main
+
+    game = main.Game()
+    game.background = noise((BOARD_SIZE * CELL_SIZE, BOARD_SIZE * CELL_SIZE), 1)
+    game.background_2 = noise((WINDOW_WIDTH, WINDOW_HEIGHT), 2)
+    game.table_texture = noise((64, 64), 3).convert_alpha()
+    DrawUtils.invalidate()
+    yield game
+    DrawUtils.invalidate()
+
+
+def random_step(game, rng, step):
+    """Change something a player could change: play, click, hover, mute, pick a reserve piece or log"""
+    if game.game_over:
+        game.reset_game()
+    roll = rng.random()
+    actions = game.engine.legal_actions()
+    if roll < 0.4 and actions:
+        game.play_action(rng.choice(actions))
+    elif roll < 0.55:
+        game.resign_hover = not game.resign_hover
+    elif roll < 0.6:
+        game.is_muted = not game.is_muted
+    elif roll < 0.8:
+        game.handle_click(rng.randrange(BOARD_SIZE), rng.randrange(BOARD_SIZE))
+    elif roll < 0.9:
+        reserve = game.player1_reserve if game.current_player == 1 else game.player2_reserve
+        sections = [index for index, pieces in enumerate(reserve) if pieces]
+        if sections:
+            section = rng.choice(sections)
+            game.selected_reserve_piece = {"player": game.current_player, "section": section,
+                                           "piece_type": reserve[section][0], "row": 0,
+                                           "col": rng.randrange(min(4, len(reserve[section])))}
+            game.reserve_selected = True
+    else:
+        game.add_to_log(f"A message long enough that it has to wrap onto another line ({step})")
+
+
+def full_redraw(game, screen):
+    """What invalidate() plus a redraw puts on screen, leaving the incremental state as it was"""
+    section_keys, target = DrawUtils._section_keys, DrawUtils._target
+    DrawUtils.invalidate()
+    DrawUtils.draw(game, screen)
+    DrawUtils._section_keys, DrawUtils._target = section_keys, target
+
+
+def test_incremental_frames_match_full_redraws(game):
+    incremental = pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT))
+    reference = pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT))
+    rng = random.Random(5)
+    assert DrawUtils.draw(game, incremental) == [incremental.get_rect()]
+
+    partial_frames = 0
+    for step in range(STEPS):
+        random_step(game, rng, step)
+        before = incremental.copy()
+        dirty = DrawUtils.draw(game, incremental)
+        full_redraw(game, reference)
+        assert pygame.image.tobytes(incremental, "RGB") == pygame.image.tobytes(reference, "RGB"), step
+
+        # Only the reported rectangles changed, so flipping just those is enough
+        for rect in dirty:
+            before.blit(incremental, rect, rect)
+        assert pygame.image.tobytes(before, "RGB") == pygame.image.tobytes(incremental, "RGB"), step
+        partial_frames += dirty != [incremental.get_rect()]
+    assert partial_frames == STEPS
@@ -0,0 +1,341 @@
+"""Rules engine tests: replays random games against the old Game rules, plus promotions and hashing."""
+import random
+
+import pytest
+
+from constants import (EMPTY, PLAYER_1, PLAYER_2, BOARD_SIZE, PALACE_AREA, ADVISOR_NUMBER, OFFICIAL_NUMBER,
+                       PALACE_NUMBER)
+from engine import (GameEngine, MOVE, PLACE, MONARCH, CENTER, ORTHOGONAL, DIAGONAL, ALL_DIRECTIONS, iter_bits,
+                    mask_squares, mask_square_set, to_index, COORDS)
+from piece import Piece
+
+EIGHT_WAYS = [(-1, 0), (1, 0), (0, -1), (0, 1), (-1, -1), (1, 1), (-1, 1), (1, -1)]
+
+
+class OldRules:
+    """The rules as main.Game implemented them before the engine: one Piece per square, ray walks"""
+
+    SETTINGS = {
+        "Official": {"base": ([(1, 0), (0, 1), (-1, 0), (0, -1)], 1),
+                     "with_monarch": (EIGHT_WAYS, 1),
+                     "with_advisor": ([(1, 0), (0, 1), (-1, 0), (0, -1)], 2)},
+        "Advisor": {"base": ([(1, 1), (1, -1), (-1, -1), (-1, 1)], 3),
+                    "with_monarch": (EIGHT_WAYS, 2)},
+        "Monarch": {"base": (EIGHT_WAYS, 1),
+                    "promoted": (EIGHT_WAYS, 2)},
+    }
+    DROPS = {"Official": ([(1, 0), (0, 1), (-1, 0), (0, -1)], 1, 1),
+             "Advisor": ([(1, 1), (1, -1), (-1, -1), (-1, 1)], 3, 0),
+             "Palace": ([], 0, 2)}
+
+    def __init__(self):
+        self.board = [[EMPTY] * BOARD_SIZE for _ in range(BOARD_SIZE)]
+        self.current_player = PLAYER_1
+        self.kings_placed = {PLAYER_1: False, PLAYER_2: False}
+        self.monarch_placement_phase = True
+        self.game_over = False
+        self.winner = None
+        self.reserves = {player: [["Advisor"] * ADVISOR_NUMBER, ["Official"] * OFFICIAL_NUMBER,
+                                  ["Palace"] * PALACE_NUMBER]
+                         for player in (PLAYER_1, PLAYER_2)}
+
+    def is_king_placement_phase(self):
+        if all(self.kings_placed.values()):
+            self.monarch_placement_phase = False
+        return not all(self.kings_placed.values())
+
+    def did_someone_win(self):
+        if self.monarch_placement_phase:
+            return
+        for player, enemy in ((PLAYER_1, PLAYER_2), (PLAYER_2, PLAYER_1)):
+            if not self.kings_placed[player]:
+                self.game_over, self.winner = True, enemy
+                return
+
+    def friendly_neighbours(self, row, col):
+        piece = self.board[row][col]
+        names = set()
+        for dr, dc in ((-1, 0), (1, 0), (0, -1), (0, 1)):
+            r, c = row + dr, col + dc
+            if 0 <= r < BOARD_SIZE and 0 <= c < BOARD_SIZE:
+                other = self.board[r][c]
+                if other != EMPTY and other.owner == piece.owner:
+                    names.add(other.name)
+        return names
+
+    def movement_squares(self, row, col):
+        piece = self.board[row][col]
+        moves = []
+        for dr, dc in piece.directions:
+            for distance in range(1, piece.move_distance + 1):
+                r, c = row + dr * distance, col + dc * distance
+                if not (0 <= r < BOARD_SIZE and 0 <= c < BOARD_SIZE):
+                    break
+                target = self.board[r][c]
+                if target == EMPTY:
+                    moves.append((r, c))
+                    continue
+                if target.owner != piece.owner and (piece.name != "Advisor" or piece.promoted):
+                    moves.append((r, c))
+                break
+        return moves
+
+    def placement_squares(self):
+        squares = set()
+        for row in range(BOARD_SIZE):
+            for col in range(BOARD_SIZE):
+                piece = self.board[row][col]
+                if piece == EMPTY or piece.owner != self.current_player:
+                    continue
+                if piece.name == "Palace":
+                    half = PALACE_AREA // 2
+                    for r in range(max(0, row - half), min(BOARD_SIZE, row + half + 1)):
+                        for c in range(max(0, col - half), min(BOARD_SIZE, col + half + 1)):
+                            squares.add((r, c))
+                else:
+                    squares.update(self.movement_squares(row, col))
+        return {(r, c) for r, c in squares if self.board[r][c] == EMPTY}
+
+    def update_status(self, row, col):
+        piece = self.board[row][col]
+        adjacent = self.friendly_neighbours(row, col)
+        settings = self.SETTINGS.get(piece.name)
+
+        def become(directions, distance, promoted):
+            piece.directions, piece.move_distance, piece.promoted = directions, distance, promoted
+
+        if (not adjacent or adjacent == {"Palace"}
+                or (piece.name == "Advisor" and "Monarch" not in adjacent)
+                or (piece.name == "Official" and "Monarch" not in adjacent and "Advisor" not in adjacent)):
+            if piece.promoted and settings:
+                become(*settings["base"], False)
+            return
+        if piece.name == "Official":
+            become(*settings["with_monarch" if "Monarch" in adjacent else "with_advisor"], True)
+        elif piece.name == "Advisor":
+            become(*settings["with_monarch"], True)
+        elif piece.name == "Monarch":
+            become(*settings["promoted"], True)
+
+    def finish(self):
+        self.current_player = PLAYER_1 if self.current_player == PLAYER_2 else PLAYER_2
+        for row in range(BOARD_SIZE):
+            for col in range(BOARD_SIZE):
+                if self.board[row][col] != EMPTY:
+                    self.update_status(row, col)
+        self.is_king_placement_phase()
+        self.did_someone_win()
+
+    def place_monarch(self, row, col):
+        self.board[row][col] = Piece("Monarch", EIGHT_WAYS, 1, self.current_player)
+        self.kings_placed[self.current_player] = True
+        self.finish()
+
+    def move_piece(self, source, target):
+        piece, captured = self.board[source[0]][source[1]], self.board[target[0]][target[1]]
+        if captured != EMPTY and captured.owner != piece.owner:
+            if captured.name == "Monarch":
+                self.kings_placed[captured.owner] = False
+            elif captured.name != "Palace":
+                self.reserves[piece.owner][0 if captured.name == "Advisor" else 1].append(captured.name)
+        self.board[target[0]][target[1]], self.board[source[0]][source[1]] = piece, EMPTY
+        self.finish()
+
+    def place_piece(self, row, col, piece_type):
+        directions, distance, section = self.DROPS[piece_type]
+        self.board[row][col] = Piece(piece_type, directions, distance, self.current_player)
+        self.reserves[self.current_player][section].pop()
+        self.finish()
+
+
+def describe(board):
+    """Comparable view of a board: (name, owner, promoted, distance, directions) per square"""
+    return [[None if piece == EMPTY else
+             (piece.name, piece.owner, piece.promoted, piece.move_distance, frozenset(map(tuple, piece.directions)))
+             for piece in row] for row in board]
+
+
+def engine_with(*pieces, player=PLAYER_1):
+    """Engine past the monarch phase holding (name, owner, row, col) pieces"""
+    board = [[EMPTY] * BOARD_SIZE for _ in range(BOARD_SIZE)]
+    for name, owner, row, col in pieces:
+        board[row][col] = Piece(name, (), 0, owner)
+    engine = GameEngine()
+    engine.kings_placed = {PLAYER_1: True, PLAYER_2: True}
+    engine.monarch_placement_phase = False
+    engine.current_player = player
+    engine.load_board(board)
+    return engine
+
+
+@pytest.mark.parametrize("seed", range(40))
+def test_random_game_matches_old_rules(seed):
+    rng = random.Random(seed)
+    old, engine = OldRules(), GameEngine()
+    for _ in range(200):
+        assert describe(engine.board) == describe(old.board)
+        assert engine.current_player == old.current_player
+        assert engine.kings_placed == old.kings_placed
+        assert engine.reserve_for(PLAYER_1) == old.reserves[PLAYER_1]
+        assert engine.reserve_for(PLAYER_2) == old.reserves[PLAYER_2]
+        assert (engine.game_over, engine.winner) == (old.game_over, old.winner)
+        if old.game_over:
+            break
+
+        player = old.current_player
+        if old.monarch_placement_phase:
+            free = [(row, col) for row in range(BOARD_SIZE) for col in range(BOARD_SIZE)
+                    if old.board[row][col] == EMPTY and to_index(row, col) != CENTER]
+            row, col = rng.choice(free)
+            old.place_monarch(row, col)
+            assert engine.place_monarch(row, col)
+            continue
+
+        drops = old.placement_squares()
+        assert set(engine.get_valid_placement_squares()) == drops
+        actions = []
+        for row in range(BOARD_SIZE):
+            for col in range(BOARD_SIZE):
+                piece = old.board[row][col]
+                if piece != EMPTY and piece.owner == player:
+                    moves = old.movement_squares(row, col)
+                    assert sorted(engine.get_valid_movement_squares(row, col)) == sorted(moves)
+                    actions += [(MOVE, (row, col), target) for target in moves]
+        for section in old.reserves[player]:
+            if section:
+                actions += [(PLACE, square, section[-1]) for square in sorted(drops)]
+        if not actions:
+            break
+
+        kind, first, second = rng.choice(actions)
+        if kind == MOVE:
+            old.move_piece(first, second)
+            engine.move_piece(first, second)
+        else:
+            old.place_piece(*first, second)
+            assert engine.place_piece(*first, second)
+
+
+def test_monarch_cannot_go_in_the_centre():
+    engine = GameEngine()
+    assert not engine.place_monarch(BOARD_SIZE // 2, BOARD_SIZE // 2)
+    actions = engine.legal_actions()
+    assert len(actions) == BOARD_SIZE * BOARD_SIZE - 1
+    assert all(kind == MONARCH and target != CENTER for kind, _, target in actions)
+
+
+def test_legal_actions_cover_moves_and_drops():
+    engine = engine_with(("Monarch", PLAYER_1, 4, 4), ("Official", PLAYER_1, 4, 5), ("Palace", PLAYER_1, 0, 0),
+                         ("Monarch", PLAYER_2, 8, 8), ("Advisor", PLAYER_2, 6, 6))
+    expected = set()
+    for index in iter_bits(engine.occupancy[PLAYER_1]):
+        row, col = divmod(index, BOARD_SIZE)
+        expected |= {(MOVE, index, to_index(*square)) for square in engine.get_valid_movement_squares(row, col)}
+    drops = {to_index(*square) for square in engine.get_valid_placement_squares()}
+    for piece_type in ("Advisor", "Official", "Palace"):
+        expected |= {(PLACE, piece_type, target) for target in drops}
+
+    actions = engine.legal_actions()
+    assert len(actions) == len(set(actions))
+    assert set(actions) == expected
+    # The palace's 5x5 area is part of the drop squares
+    assert {to_index(row, col) for row in range(3) for col in range(3)} - {0} <= drops
+
+
+def test_unpromoted_advisor_cannot_capture():
+    engine = engine_with(("Advisor", PLAYER_1, 2, 2), ("Official", PLAYER_2, 3, 3),
+                         ("Monarch", PLAYER_1, 8, 0), ("Monarch", PLAYER_2, 0, 8))
+    assert (3, 3) not in engine.get_valid_movement_squares(2, 2)
+    assert (1, 1) in engine.get_valid_movement_squares(2, 2)
+
+
+@pytest.mark.parametrize("neighbour, name, expected", [
+    ("Monarch", "Official", (ALL_DIRECTIONS, 1, True)),
+    ("Advisor", "Official", (ORTHOGONAL, 2, True)),
+    ("Monarch", "Advisor", (ALL_DIRECTIONS, 2, True)),
+    ("Official", "Monarch", (ALL_DIRECTIONS, 2, True)),
+    ("Palace", "Monarch", (ALL_DIRECTIONS, 1, False)),
+    ("Official", "Advisor", (DIAGONAL, 3, False)),
+])
+def test_promotion_follows_friendly_neighbours(neighbour, name, expected):
+    engine = engine_with((name, PLAYER_1, 4, 4), (neighbour, PLAYER_1, 4, 3), ("Monarch", PLAYER_2, 0, 0),
+                         ("Monarch", PLAYER_1, 8, 8) if "Monarch" not in (name, neighbour) else
+                         ("Official", PLAYER_2, 0, 8))
+    piece = engine.board[4][4]
+    assert (set(piece.directions), piece.move_distance, piece.promoted) == (set(expected[0]), *expected[1:])
+
+
+def test_promotion_is_lost_when_the_neighbour_moves_away():
+    engine = engine_with(("Monarch", PLAYER_1, 4, 3), ("Official", PLAYER_1, 4, 4), ("Monarch", PLAYER_2, 0, 0))
+    assert engine.board[4][4].promoted
+    engine.move_piece((4, 3), (5, 2))
+    official = engine.board[4][4]
+    assert not official.promoted
+    assert (set(official.directions), official.move_distance) == (set(ORTHOGONAL), 1)
+    assert engine.promoted == []
+
+
+def test_new_promotions_are_reported():
+    engine = engine_with(("Monarch", PLAYER_1, 4, 3), ("Official", PLAYER_1, 6, 4), ("Monarch", PLAYER_2, 0, 0))
+    engine.move_piece((6, 4), (5, 4))
+    assert engine.promoted == []
+    engine.move_piece((0, 0), (0, 1))
+    engine.move_piece((5, 4), (4, 4))
+    assert sorted(engine.promoted) == [to_index(4, 3), to_index(4, 4)]
+
+
+def test_capturing_the_monarch_ends_the_game():
+    engine = engine_with(("Monarch", PLAYER_1, 4, 4), ("Monarch", PLAYER_2, 4, 5), ("Official", PLAYER_2, 0, 0))
+    captured = engine.move_piece((4, 4), (4, 5))
+    assert captured.name == "Monarch"
+    assert engine.game_over and engine.winner == PLAYER_1
+
+
+def test_captured_pieces_go_to_the_captor_reserve():
+    engine = engine_with(("Monarch", PLAYER_1, 4, 4), ("Official", PLAYER_2, 4, 5), ("Monarch", PLAYER_2, 0, 0))
+    before = len(engine.player1_reserve[1])
+    engine.move_piece((4, 4), (4, 5))
+    assert len(engine.player1_reserve[1]) == before + 1
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_zobrist_key_survives_apply_and_restore(seed):
+    rng = random.Random(seed)
+    engine = GameEngine()
+    for _ in range(120):
+        actions = engine.legal_actions()
+        if not actions:
+            break
+        before_state, before_key = engine.snapshot(), engine.key
+
+        # Every action and its undo leave the incremental key equal to a fresh hash
+        for action in rng.sample(actions, min(5, len(actions))):
+            engine.apply_action(action)
+            key = engine.key
+            assert engine.rehash() == key
+            engine.restore(before_state)
+            assert engine.key == before_key
+            assert engine.rehash() == before_key
+
+        engine.apply_action(rng.choice(actions))
+
+
+def test_positions_reached_two_ways_share_a_key():
+    first = engine_with(("Monarch", PLAYER_1, 8, 8), ("Monarch", PLAYER_2, 0, 0))
+    second = first.copy()
+    first.apply_action((PLACE, "Official", to_index(7, 8)))
+    first.apply_action((MOVE, 0, 1))
+    first.apply_action((MOVE, to_index(8, 8), to_index(8, 7)))
+    second.apply_action((MOVE, to_index(8, 8), to_index(8, 7)))
+    second.apply_action((MOVE, 0, 1))
+    second.apply_action((PLACE, "Official", to_index(7, 8)))
+    assert describe(first.board) == describe(second.board)
+    assert first.key == second.key
+
+
+def test_mask_squares_lists_every_bit_in_index_order():
+    rng = random.Random(3)
+    for mask in [0, 1, 1 << 80, (1 << 81) - 1] + [rng.getrandbits(81) for _ in range(50)]:
+        expected = tuple(COORDS[index] for index in iter_bits(mask))
+        assert mask_squares(mask) == expected
+        assert mask_square_set(mask) == frozenset(expected)
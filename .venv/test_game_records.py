@@ -0,0 +1,132 @@
+"""Game record tests: ply packing, the file round trip and replaying recorded games."""
+import random
+
+import pytest
+
+from constants import EMPTY, PLAYER_1, PLAYER_2
+from engine import GameEngine, MOVE, PLACE, MONARCH, to_index
+from game_records import (RecordReader, RecordWriter, decode_ply, encode_game, encode_ply, parse_action,
+                          FILE_HEADER, PLY, MONARCH_CAPTURED, RESIGNED, PLY_LIMIT, MAX_SEED, MAX_PLIES)
+from protocol import RESIGN
+from selfplay import RandomPolicy, GreedyPolicy, main as selfplay_main, play_game
+
+
+@pytest.mark.parametrize("action, captured, promoted", [
+    ((MOVE, 10, 11), None, ()),
+    ((MOVE, 80, 0), "Advisor", ("Official", "Monarch")),
+    ((MOVE, 40, 41), "Monarch", ()),
+    ((PLACE, "Palace", 5), None, ()),
+    ((PLACE, "Official", 6), None, ("Official", "Official")),
+    ((MONARCH, None, 7), None, ()),
+    ((RESIGN, PLAYER_2, None), None, ()),
+])
+def test_ply_round_trip(action, captured, promoted):
+    ply = encode_ply(action, captured, promoted)
+    assert len(ply) == PLY.size
+    counts = {name: promoted.count(name) for name in promoted}
+    assert decode_ply(*PLY.unpack(ply)) == (action, captured, counts)
+
+
+def test_promotion_counts_saturate():
+    _, _, counts = decode_ply(*PLY.unpack(encode_ply((MOVE, 0, 1), None, ["Official"] * 5 + ["Advisor"])))
+    assert counts == {"Official": 3, "Advisor": 1}
+
+
+def test_header_holds_the_largest_seed_and_length():
+    game = encode_game(MAX_SEED, None, PLY_LIMIT, encode_ply((MONARCH, None, 3)) * MAX_PLIES)
+    assert len(game) == len(encode_game(0, None, PLY_LIMIT, b"")) + MAX_PLIES * PLY.size
+
+
+@pytest.mark.parametrize("argv", [
+    ["--seed", str(MAX_SEED), "--games", "2"],
+    ["--seed", "-1"],
+    ["--max-plies", str(MAX_PLIES + 1)],
+    ["--max-plies", "0"],
+])
+def test_selfplay_refuses_what_the_header_cannot_hold(monkeypatch, capsys, argv):
+    monkeypatch.setattr("sys.argv", ["selfplay.py"] + argv)
+    with pytest.raises(SystemExit) as exit_info:
+        selfplay_main()
+    assert exit_info.value.code == 2
+    assert argv[0] in capsys.readouterr().err
+
+
+def write_games(path, games):
+    with RecordWriter(path) as writer:
+        writer.write(b"".join(encode_game(seed, winner, reason, b"".join(plies))
+                              for seed, winner, reason, plies in games))
+
+
+def read_games(path):
+    with RecordReader(path) as reader:
+        return [(seed, winner, reason, list(reader.plies(plies))) for seed, winner, reason, plies in reader]
+
+
+def test_file_round_trip(tmp_path):
+    path = tmp_path / "games.rec"
+    first = [encode_ply((MONARCH, None, 3)), encode_ply((MONARCH, None, 77)), encode_ply((RESIGN, PLAYER_1, None))]
+    second = [encode_ply((MOVE, 1, 2), "Palace", ("Monarch",))]
+    write_games(path, [(7, PLAYER_2, RESIGNED, first), (8, None, PLY_LIMIT, second)])
+    # A second writer appends after the existing games instead of starting over
+    write_games(path, [(9, PLAYER_1, MONARCH_CAPTURED, [])])
+
+    games = read_games(path)
+    assert [(seed, winner, reason) for seed, winner, reason, _ in games] == [
+        (7, PLAYER_2, RESIGNED), (8, None, PLY_LIMIT), (9, PLAYER_1, MONARCH_CAPTURED)]
+    assert games[0][3] == [((MONARCH, None, 3), None, {}), ((MONARCH, None, 77), None, {}),
+                           ((RESIGN, PLAYER_1, None), None, {})]
+    assert games[1][3] == [((MOVE, 1, 2), "Palace", {"Monarch": 1})]
+    assert games[2][3] == []
+
+
+def test_truncated_game_is_ignored(tmp_path):
+    path = tmp_path / "games.rec"
+    write_games(path, [(1, PLAYER_1, RESIGNED, [encode_ply((MONARCH, None, 3))] * 4)])
+    with open(path, "ab") as file:
+        file.write(encode_game(2, None, PLY_LIMIT, encode_ply((MONARCH, None, 3)) * 4)[:-3])
+    assert [seed for seed, *_ in read_games(path)] == [1]
+
+
+@pytest.mark.parametrize("contents", [b"", b"SEIJI", b"NOTAREC!\x01", b"SEIJIREC\x63"],
+                         ids=["empty", "short", "magic", "version"])
+def test_other_files_are_refused(tmp_path, contents):
+    path = tmp_path / "other.rec"
+    path.write_bytes(contents)
+    with pytest.raises(ValueError):
+        RecordReader(path)
+    if len(contents) >= FILE_HEADER.size:
+        with pytest.raises(ValueError):
+            RecordWriter(path)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_recorded_games_replay(tmp_path, seed):
+    policies = {PLAYER_1: GreedyPolicy(), PLAYER_2: RandomPolicy()}
+    winner, reason, plies = play_game(GameEngine(), policies, random.Random(seed), max_plies=300)
+    path = tmp_path / "games.rec"
+    write_games(path, [(seed, winner, reason, [bytes(plies)])])
+
+    [(read_seed, read_winner, read_reason, read_plies)] = read_games(path)
+    assert (read_seed, read_winner, read_reason) == (seed, winner, reason)
+    assert len(read_plies) == len(plies) // PLY.size
+
+    # Replaying the stored actions reproduces every capture, every promotion and the result
+    engine = GameEngine()
+    for action, captured, promotions in read_plies:
+        if action[0] == RESIGN:
+            engine.resign(action[1])
+            continue
+        taken = engine.apply_action(action)
+        assert (taken.name if action[0] == MOVE and taken != EMPTY else None) == captured
+        names = [engine.cells[index].name for index in engine.promoted]
+        assert {name: min(names.count(name), 3) for name in names} == promotions
+    assert engine.winner == winner
+
+
+def test_parse_action_mirrors_rows_for_player_2():
+    assert parse_action("monarch 5,1") == (MONARCH, None, to_index(8, 4))
+    assert parse_action("monarch 5,1", PLAYER_2) == (MONARCH, None, to_index(0, 4))
+    assert parse_action("place Palace 5,2") == (PLACE, "Palace", to_index(7, 4))
+    assert parse_action("move 5,2 5,3", PLAYER_2) == (MOVE, to_index(1, 4), to_index(2, 4))
+    with pytest.raises(ValueError):
+        parse_action("castle 5,1")
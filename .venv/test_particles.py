@@ -0,0 +1,106 @@
+"""Particle system tests: the packed arrays stay oldest first through spawning and culling, and drawing culls."""
+import numpy as np
+import pygame
+import pytest
+
+from particles import ParticleSystem, MAX_RADIUS
+
+
+class RecordingSurface(pygame.Surface):
+    """Surface that remembers where blits() put each sprite"""
+
+    def blits(self, blit_sequence, doreturn=True):
+        self.blitted = [(sprite, tuple(position)) for sprite, position in blit_sequence]
+        return super().blits(self.blitted, doreturn)
+
+
+def spawn_row(system, xs, velocity=(0, 0), **kwargs):
+    """Spawn one particle per x at y=10, coloured by x so they can be told apart"""
+    count = len(xs)
+    system.spawn(np.column_stack([xs, np.full(count, 10)]), np.tile(velocity, (count, 1)),
+                 np.column_stack([xs, xs, xs]).astype(np.uint8), **kwargs)
+
+
+def live_xs(system):
+    return system.position[:len(system), 0].tolist()
+
+
+def test_overflow_drops_the_oldest():
+    system = ParticleSystem(5, (100, 100))
+    spawn_row(system, [0, 1, 2])
+    spawn_row(system, [10, 11, 12, 13])
+    assert live_xs(system) == [2, 10, 11, 12, 13]
+    assert system.color[:len(system), 0].tolist() == [2, 10, 11, 12, 13]
+
+    # A batch bigger than the whole system keeps its newest particles
+    spawn_row(system, list(range(20, 28)))
+    assert live_xs(system) == [23, 24, 25, 26, 27]
+
+
+def test_culling_keeps_the_survivors_oldest_first():
+    system = ParticleSystem(8, (100, 100))
+    spawn_row(system, [10, 99, 20, 100, 30], velocity=(2, 0))
+    system.update()
+    assert live_xs(system) == [12, 22, 32]
+    # Every array is compacted together
+    assert system.color[:len(system), 0].tolist() == [10, 20, 30]
+    assert system.origin[:len(system), 0].tolist() == [10, 20, 30]
+
+    spawn_row(system, [40])
+    assert live_xs(system) == [12, 22, 32, 40]
+
+
+def test_particles_expire_after_their_lifetime():
+    system = ParticleSystem(8, (100, 100))
+    spawn_row(system, [1, 2], lifetime=2)
+    spawn_row(system, [3])
+    spawn_row(system, [4], lifetime=1)
+    system.update()
+    assert live_xs(system) == [1, 2, 3]
+    system.update()
+    assert live_xs(system) == [3]
+    for _ in range(50):
+        system.update()
+    assert live_xs(system) == [3]
+
+
+def test_growth_is_capped():
+    system = ParticleSystem(2, (1000, 1000), start_size=1, growth=0.5, max_size=4)
+    spawn_row(system, [0, 0], velocity=(3, 0))
+    system.update()
+    assert system.size[0] == pytest.approx(2.5)
+    for _ in range(5):
+        system.update()
+    assert system.size[:2].tolist() == [4, 4]
+
+
+def test_draw_skips_particles_outside_the_clip_rect():
+    system = ParticleSystem(8, (100, 100), start_size=2)
+    spawn_row(system, [5, 18, 30, 60])  # The second one straddles the clip edge
+    surface = RecordingSurface((100, 100))
+    surface.set_clip(pygame.Rect(0, 0, 20, 20))
+    system.draw(surface)
+    assert [position for _, position in surface.blitted] == [(3, 8), (16, 8)]
+    assert surface.get_at((5, 10))[:3] == (5, 5, 5)
+
+    surface.set_clip(pygame.Rect(50, 50, 10, 10))
+    del surface.blitted
+    system.draw(surface)
+    assert not hasattr(surface, "blitted")
+
+
+def test_draw_shares_one_sprite_per_size_and_colour():
+    system = ParticleSystem(8, (100, 100), start_size=2)
+    system.spawn(np.array([[10, 10], [30, 10], [50, 10]]), np.zeros((3, 2)), (200, 0, 0))
+    surface = RecordingSurface((100, 100))
+    system.draw(surface)
+    sprites = [sprite for sprite, _ in surface.blitted]
+    assert len(sprites) == 3 and sprites[0] is sprites[1] is sprites[2]
+
+
+def test_sizes_beyond_the_sprite_key_are_refused():
+    ParticleSystem(4, (10, 10), max_size=MAX_RADIUS)
+    with pytest.raises(ValueError):
+        ParticleSystem(4, (10, 10), max_size=MAX_RADIUS + 1)
+    with pytest.raises(ValueError):
+        ParticleSystem(4, (10, 10), start_size=300, growth=0.0)
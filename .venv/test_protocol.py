@@ -0,0 +1,196 @@
+"""Wire protocol tests: encoding round trips, frame validation and stream framing."""
+import pytest
+
+from constants import EMPTY, PLAYER_1, PLAYER_2
+from engine import GameEngine, MOVE as MOVE_ACTION, PLACE as PLACE_ACTION, MONARCH as MONARCH_ACTION, to_index
+from protocol import (FrameDecoder, ProtocolError, check_game_frame, checksum, decode_frame, encode_action,
+                      encode_error, encode_frame, encode_join, encode_joined, encode_snapshot, unpack_position,
+                      HEADER, MOVE_PAYLOAD, SNAPSHOT_HEADER, POSITION_SIZE, MOVE, SNAPSHOT, JOIN, JOINED, ERROR,
+                      PING, PING_FRAME, PROTOCOL_VERSION, RESIGN, NO_SQUARE, MAX_RESERVE)
+
+
+def played_engine():
+    """Engine a few actions into a game, with pieces of both players on the board"""
+    engine = GameEngine()
+    for action in [(MONARCH_ACTION, None, to_index(8, 4)), (MONARCH_ACTION, None, to_index(0, 4)),
+                   (PLACE_ACTION, "Official", to_index(7, 4)), (PLACE_ACTION, "Advisor", to_index(1, 3)),
+                   (MOVE_ACTION, to_index(7, 4), to_index(6, 4))]:
+        engine.apply_action(action)
+    return engine
+
+
+def describe(engine):
+    return [None if piece == EMPTY else (piece.name, piece.owner, piece.promoted) for piece in engine.cells]
+
+
+def move_frame(code, source, target, seq=1):
+    return encode_frame(MOVE, MOVE_PAYLOAD.pack(seq, code, source, target, 0))
+
+
+def snapshot_frame(position):
+    return encode_frame(SNAPSHOT, SNAPSHOT_HEADER.pack(1, 0) + bytes(position))
+
+
+def feed_all(decoder, chunks):
+    """Feed chunks one at a time, collecting every frame as (type, bytes)"""
+    frames = []
+    for chunk in chunks:
+        decoder.feed(chunk)
+        frames += [(kind, bytes(frame)) for kind, frame in decoder.frames()]
+    return frames
+
+
+# --- Encoding ---
+
+@pytest.mark.parametrize("action", [
+    (MOVE_ACTION, to_index(6, 4), to_index(5, 4)),
+    (PLACE_ACTION, "Palace", to_index(2, 2)),
+    (MONARCH_ACTION, None, to_index(3, 3)),
+    (RESIGN, PLAYER_2, None),
+])
+def test_action_round_trip(action):
+    engine = played_engine()
+    message = decode_frame(encode_action(42, action, engine))
+    assert message == {"type": MOVE, "seq": 42, "check": checksum(engine), "action": action}
+
+
+def test_snapshot_rebuilds_the_position():
+    engine = played_engine()
+    message = decode_frame(encode_snapshot(7, engine))
+    assert (message["type"], message["seq"], message["check"]) == (SNAPSHOT, 7, checksum(engine))
+    assert len(message["position"]) == POSITION_SIZE
+
+    copy = GameEngine()
+    unpack_position(message["position"], copy)
+    assert checksum(copy) == checksum(engine)
+    assert copy.key == engine.key
+    assert describe(copy) == describe(engine)
+
+
+def test_text_frames_round_trip():
+    assert decode_frame(encode_join("ABCDE")) == {"type": JOIN, "room": "ABCDE"}
+    assert decode_frame(encode_joined("ABCDE", PLAYER_1)) == {"type": JOINED, "player": PLAYER_1, "room": "ABCDE"}
+    assert decode_frame(encode_error("full")) == {"type": ERROR, "reason": "full"}
+
+
+# --- Validation ---
+
+@pytest.mark.parametrize("frame", [
+    encode_frame(MOVE, b"\x00\x01"),
+    encode_frame(MOVE, MOVE_PAYLOAD.pack(1, 0, 1, 2, 0) + b"\x00"),
+    move_frame(9, 0, 0),
+    move_frame(0, 81, 3),
+    move_frame(0, 3, 81),
+    move_frame(1, 1, 3),  # Monarchs are never dropped from the reserve
+    move_frame(1, 7, 3),
+    move_frame(2, 0, NO_SQUARE),
+    move_frame(3, 5, NO_SQUARE),
+    move_frame(3, PLAYER_1, 4),
+], ids=["short", "long", "action code", "source", "target", "place monarch", "piece code", "monarch square",
+        "resign player", "resign target"])
+def test_bad_move_frames_are_rejected(frame):
+    with pytest.raises(ProtocolError):
+        check_game_frame(MOVE, frame)
+    with pytest.raises(ProtocolError):
+        decode_frame(frame)
+
+
+def bad_position(offset, value):
+    position = bytearray(POSITION_SIZE)
+    position[81] = PLAYER_1
+    position[offset] = value
+    return position
+
+
+@pytest.mark.parametrize("frame", [
+    encode_frame(SNAPSHOT, SNAPSHOT_HEADER.pack(1, 0) + bytes(10)),
+    encode_frame(SNAPSHOT, SNAPSHOT_HEADER.pack(1, 0) + bytes(POSITION_SIZE + 1)),
+    snapshot_frame(bad_position(5, 7)),
+    snapshot_frame(bad_position(81, 3)),
+    snapshot_frame(bad_position(82, 0x80)),
+    snapshot_frame(bad_position(83, 3)),
+    snapshot_frame(bad_position(84, MAX_RESERVE + 1)),
+], ids=["short", "long", "piece code", "side to move", "flags", "winner", "reserve"])
+def test_bad_snapshot_frames_are_rejected(frame):
+    with pytest.raises(ProtocolError):
+        check_game_frame(SNAPSHOT, frame)
+    with pytest.raises(ProtocolError):
+        decode_frame(frame)
+
+
+def test_valid_frames_pass_the_check():
+    engine = played_engine()
+    check_game_frame(MOVE, encode_action(3, (MOVE_ACTION, 0, 80), engine))
+    check_game_frame(SNAPSHOT, encode_snapshot(3, engine))
+
+
+@pytest.mark.parametrize("frame", [
+    encode_frame(JOINED),
+    encode_frame(ERROR, b"\xff\xfe"),
+], ids=["empty joined", "bad text"])
+def test_malformed_frames_raise_protocol_error(frame):
+    with pytest.raises(ProtocolError):
+        decode_frame(frame)
+
+
+# --- Framing ---
+
+def test_frames_split_across_reads():
+    engine = played_engine()
+    frames = [encode_snapshot(1, engine), PING_FRAME, encode_action(2, (MOVE_ACTION, 0, 1), engine)]
+    stream = b"".join(frames)
+    assert feed_all(FrameDecoder(), [stream[i:i + 1] for i in range(len(stream))]) == [
+        (SNAPSHOT, frames[0]), (PING, PING_FRAME), (MOVE, frames[2])]
+
+
+def test_coalesced_frames_come_out_one_by_one():
+    frames = [encode_join(str(number)) for number in range(50)]
+    received = feed_all(FrameDecoder(), [b"".join(frames)])
+    assert received == [(JOIN, frame) for frame in frames]
+
+
+def test_partial_frame_is_kept_while_the_buffer_wraps():
+    decoder = FrameDecoder(size=64)
+    frame = encode_error("x" * 20)
+    stream = frame * 20
+    # Chunks that never line up with frame edges make the decoder move leftovers to the front
+    chunks = [stream[i:i + 17] for i in range(0, len(stream), 17)]
+    assert feed_all(decoder, chunks) == [(ERROR, frame)] * 20
+    assert len(decoder.buffer) == 64
+
+
+def test_buffer_grows_for_a_frame_bigger_than_itself():
+    decoder = FrameDecoder(size=16)
+    frame = encode_error("y" * 1000)
+    assert feed_all(decoder, [frame[:10], frame[10:600], frame[600:]]) == [(ERROR, frame)]
+    assert len(decoder.buffer) >= len(frame)
+    # The grown buffer keeps working for later frames
+    assert feed_all(decoder, [PING_FRAME]) == [(PING, PING_FRAME)]
+
+
+def test_unknown_version_is_rejected():
+    decoder = FrameDecoder()
+    decoder.feed(HEADER.pack(0, PROTOCOL_VERSION + 1, JOIN))
+    with pytest.raises(ProtocolError):
+        list(decoder.frames())
+
+
+def test_recv_into_reads_from_a_socket():
+    class Socket:
+        def __init__(self, chunks):
+            self.chunks = list(chunks)
+
+        def recv_into(self, view):
+            chunk = self.chunks.pop(0) if self.chunks else b""
+            view[:len(chunk)] = chunk
+            return len(chunk)
+
+    frame = encode_join("ROOM1")
+    decoder = FrameDecoder()
+    sock = Socket([frame[:4], frame[4:]])
+    assert decoder.recv_into(sock) == 4
+    assert list(decoder.frames()) == []
+    assert decoder.recv_into(sock) == len(frame) - 4
+    assert [(kind, bytes(view)) for kind, view in decoder.frames()] == [(JOIN, frame)]
+    assert decoder.recv_into(sock) == 0
+
@@ -0,0 +1,117 @@
+"""Server tests: the per-room action log used for catch-up, and what handle_frame relays."""
+import pytest
+
+from engine import GameEngine
+from protocol import (ProtocolError, encode_action, encode_frame, encode_snapshot, MOVE, SNAPSHOT, RESYNC,
+                      MOVE_PAYLOAD)
+from server import GameServer, Room, MAX_MOVE_LOG
+
+
+class FakeConnection:
+    """Stands in for a Connection: remembers what was sent instead of writing to a socket"""
+
+    def __init__(self, room=None, player=None, spectating=False):
+        self.room = room
+        self.player = player
+        self.spectating = spectating
+        self.sent = []
+
+    def send(self, data):
+        self.sent.append(data)
+
+
+def action_frames(count):
+    """count MOVE frames (seq 1..count) from the same game"""
+    engine = GameEngine()
+    frames = []
+    for seq in range(1, count + 1):
+        action = engine.legal_actions()[-1]
+        engine.apply_action(action)
+        frames.append(encode_action(seq, action, engine))
+    return frames, engine
+
+
+def seated_room():
+    room = Room("ROOM1")
+    players = {player: FakeConnection(room, player) for player in (1, 2)}
+    room.players.update(players)
+    spectator = FakeConnection(room, spectating=True)
+    room.spectators.add(spectator)
+    return room, players, spectator
+
+
+def test_catch_up_is_the_snapshot_plus_later_actions():
+    frames, engine = action_frames(6)
+    snapshot = encode_snapshot(4, engine)
+    room = Room("ROOM1")
+    for frame in frames[:4]:
+        room.record(MOVE, frame)
+    assert room.catch_up() == b"".join(frames[:4])
+
+    room.record(SNAPSHOT, snapshot)
+    assert room.catch_up() == snapshot
+    for frame in frames[4:]:
+        room.record(MOVE, frame)
+    assert room.catch_up() == snapshot + b"".join(frames[4:])
+
+
+def test_catch_up_is_built_once_per_position():
+    frames, _ = action_frames(2)
+    room = Room("ROOM1")
+    room.record(MOVE, frames[0])
+    first = room.catch_up()
+    assert room.catch_up() is first
+    room.record(MOVE, frames[1])
+    assert room.catch_up() is not first
+
+
+def test_first_action_of_a_new_game_clears_the_log():
+    frames, engine = action_frames(3)
+    room = Room("ROOM1")
+    room.record(SNAPSHOT, encode_snapshot(2, engine))
+    room.record(MOVE, frames[2])
+    room.record(MOVE, frames[0])  # seq 1 again: a rematch started
+    assert room.catch_up() == frames[0]
+
+
+def test_action_log_is_capped():
+    frame = action_frames(2)[0][1]
+    room = Room("ROOM1")
+    for _ in range(MAX_MOVE_LOG + 10):
+        room.record(MOVE, frame)
+    assert len(room.moves) == MAX_MOVE_LOG
+
+
+def test_game_frames_are_relayed_and_recorded():
+    server = GameServer(verbose=False)
+    room, players, spectator = seated_room()
+    frames, _ = action_frames(1)
+    server.handle_frame(players[1], MOVE, memoryview(frames[0]))
+    assert players[2].sent == [frames[0]]
+    assert spectator.sent == [frames[0]]
+    assert players[1].sent == []
+    assert room.catch_up() == frames[0]
+
+
+@pytest.mark.parametrize("kind, frame", [
+    (MOVE, encode_frame(MOVE, b"\x00\x01")),
+    (MOVE, encode_frame(MOVE, MOVE_PAYLOAD.pack(1, 9, 0, 0, 0))),
+    (SNAPSHOT, encode_frame(SNAPSHOT, bytes(20))),
+], ids=["short move", "action code", "short snapshot"])
+def test_bad_game_frames_are_neither_relayed_nor_recorded(kind, frame):
+    server = GameServer(verbose=False)
+    room, players, spectator = seated_room()
+    with pytest.raises(ProtocolError):
+        server.handle_frame(players[1], kind, memoryview(frame))
+    assert players[2].sent == [] and spectator.sent == []
+    assert room.catch_up() == b""
+
+
+def test_resync_sends_the_catch_up():
+    server = GameServer(verbose=False)
+    room, players, _ = seated_room()
+    frames, _ = action_frames(3)
+    for frame in frames:
+        room.record(MOVE, frame)
+    server.handle_frame(players[2], RESYNC, memoryview(encode_frame(RESYNC)))
+    assert players[2].sent == [b"".join(frames)]
@@ -0,0 +1,129 @@
+"""Spectator tests: watchers cannot play, and a slow watcher's queue stays bounded until it is dropped."""
+import asyncio
+
+from engine import GameEngine, MONARCH as MONARCH_ACTION
+from protocol import encode_action, MOVE
+from server import Connection, GameServer, Room, SPECTATOR_QUEUE_SIZE, SPECTATOR_LAG_LIMIT
+from test_server import seated_room
+
+
+class FakeWriter:
+    """Stands in for a StreamWriter; drain() blocks until the test lets the spectator read"""
+
+    def __init__(self):
+        self.written = []
+        self.readable = asyncio.Event()
+        self.closed = False
+
+    def get_extra_info(self, name):
+        return ("127.0.0.1", 0) if name == "peername" else None
+
+    def write(self, data):
+        self.written.append(data)
+
+    async def drain(self):
+        await self.readable.wait()
+
+    def close(self):
+        self.closed = True
+
+
+def watcher(room):
+    conn = Connection(None, FakeWriter())
+    conn.room = room
+    conn.spectating = True
+    room.spectators.add(conn)
+    return conn
+
+
+def relayed_frames(count):
+    """count distinct MOVE frames (seq 1..count); spectators never look inside them"""
+    engine = GameEngine()
+    return [encode_action(seq, (MONARCH_ACTION, None, seq % 81), engine) for seq in range(1, count + 1)]
+
+
+def queued(conn):
+    return list(conn.outbox._queue)
+
+
+def recorded_room(frames):
+    room = Room("ROOM1")
+    for frame in frames:
+        room.record(MOVE, frame)
+    return room
+
+
+def test_spectators_cannot_play():
+    server = GameServer(verbose=False)
+    room, players, spectator = seated_room()
+    engine = GameEngine()
+    engine.apply_action((MONARCH_ACTION, None, 0))
+    server.handle_frame(spectator, MOVE, memoryview(encode_action(1, (MONARCH_ACTION, None, 0), engine)))
+    assert players[1].sent == [] and players[2].sent == []
+    assert room.catch_up() == b""
+
+
+def test_full_queue_is_replaced_by_the_catch_up():
+    async def run():
+        frames = relayed_frames(SPECTATOR_QUEUE_SIZE + 20)
+        room = Room("ROOM1")
+        conn = watcher(room)
+        for count, frame in enumerate(frames, 1):
+            room.record(MOVE, frame)
+            conn.send(frame)
+            assert conn.outbox.qsize() <= SPECTATOR_QUEUE_SIZE
+            if count == SPECTATOR_QUEUE_SIZE + 1:
+                # The frame that overflowed is already part of the catch-up
+                assert queued(conn) == [room.catch_up()]
+        assert queued(conn) == [b"".join(frames[:SPECTATOR_QUEUE_SIZE + 1])] + frames[SPECTATOR_QUEUE_SIZE + 1:]
+        assert not conn.closed and conn.behind_since is not None
+    asyncio.run(run())
+
+
+def test_watcher_that_catches_up_is_no_longer_behind():
+    async def run():
+        frames = relayed_frames(SPECTATOR_QUEUE_SIZE + 1)
+        room = recorded_room(frames)
+        conn = watcher(room)
+        writer_task = asyncio.create_task(conn.write_loop())
+        for frame in frames:
+            conn.send(frame)
+        assert conn.behind_since is not None
+        conn.writer.readable.set()
+        while not conn.outbox.empty():
+            await asyncio.sleep(0)
+        await asyncio.sleep(0)
+        assert conn.behind_since is None
+        assert b"".join(conn.writer.written).endswith(room.catch_up())
+        conn.close()
+        await writer_task
+    asyncio.run(run())
+
+
+def test_watcher_behind_too_long_is_dropped():
+    async def run():
+        frames = relayed_frames(SPECTATOR_QUEUE_SIZE + 1)
+        room = recorded_room(frames)
+        conn = watcher(room)
+        for frame in frames:
+            conn.send(frame)
+        assert not conn.closed
+        conn.behind_since = asyncio.get_running_loop().time() - SPECTATOR_LAG_LIMIT - 1
+        for frame in frames[:SPECTATOR_QUEUE_SIZE]:
+            conn.send(frame)
+        assert conn.closed and conn.writer.closed
+        assert queued(conn) == [None]
+    asyncio.run(run())
+
+
+def test_watcher_of_a_closed_room_is_dropped():
+    async def run():
+        frames = relayed_frames(SPECTATOR_QUEUE_SIZE + 1)
+        conn = watcher(recorded_room(frames))
+        for frame in frames[:SPECTATOR_QUEUE_SIZE]:
+            conn.send(frame)
+        conn.room = None
+        conn.send(frames[-1])
+        assert conn.closed and conn.writer.closed
+        assert queued(conn) == [None]
+    asyncio.run(run())